@@ -1,18 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import database
+from middleware import ETagMiddleware
 import models
 import routes.experiments as experiments_route
 import routes.results as results_route
 import routes.power_analysis as power_route
+import routes.jobs as jobs_route
+import routes.cache as cache_route
+import routes.dashboard as dashboard_route
+import routes.export as export_route
 from config import settings
+from services import simulation
 
-# Create database tables
-database.Base.metadata.create_all(bind=database.engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables
+    await database.init_models()
+    yield
+    jobs_route.job_manager.shutdown()
+    simulation.shutdown_pool()
+    await database.engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    description="A complete A/B testing platform with statistical services and power analysis."
+    description="A complete A/B testing platform with statistical services and power analysis.",
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -22,7 +37,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Cache", "X-Export-Watermark"],
 )
+# Added last so it runs outermost: ETags hash the uncompressed body, then GZip compresses it
+app.add_middleware(ETagMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
 
 @app.get("/health")
 def health_check():
@@ -32,6 +51,10 @@ def health_check():
 app.include_router(experiments_route.router, prefix=settings.API_V1_STR)
 app.include_router(results_route.router, prefix=settings.API_V1_STR)
 app.include_router(power_route.router, prefix=settings.API_V1_STR)
+app.include_router(jobs_route.router, prefix=settings.API_V1_STR)
+app.include_router(cache_route.router, prefix=settings.API_V1_STR)
+app.include_router(dashboard_route.router, prefix=settings.API_V1_STR)
+app.include_router(export_route.router, prefix=settings.API_V1_STR)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,32 @@
+"""Scaling benchmark for MultipleTestingCorrection.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_correction [max_exponent]
+"""
+import sys
+import time
+import numpy as np
+from services.correction import MultipleTestingCorrection
+
+def bench(method: str, p_values: np.ndarray, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        MultipleTestingCorrection.adjust(p_values, method)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(max_exponent: int = 7):
+    rng = np.random.default_rng(0)
+    sizes = [10**k for k in range(3, max_exponent + 1)]
+    print(f"{'method':<12}" + "".join(f"{n:>14,}" for n in sizes))
+    for method in MultipleTestingCorrection.METHODS:
+        timings = []
+        for n in sizes:
+            p_values = rng.uniform(size=n)
+            timings.append(bench(method, p_values, repeats=1 if n >= 10**7 else 3))
+        print(f"{method:<12}" + "".join(f"{t * 1000:>12.2f}ms" for t in timings))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 7)
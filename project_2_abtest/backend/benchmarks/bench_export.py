@@ -0,0 +1,63 @@
+"""Throughput benchmark for the streaming results export.
+
+Seeds a results table and drains routes.export.stream_rows in every
+format, reporting rows/sec, output size and the process's peak RSS.
+Uses DATABASE_URL when set, otherwise a temporary SQLite file. Run from
+the backend directory:
+
+    python -m benchmarks.bench_export [rows]
+"""
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench_export.db")
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+import database
+import models
+from routes.export import stream_rows, table_fields
+
+SEED_BATCH = 50_000
+
+async def seed(rows: int) -> None:
+    await database.init_models()
+    rng = np.random.default_rng(0)
+    async with database.SessionLocal() as db:
+        await db.execute(delete(models.Result))
+        for start in range(0, rows, SEED_BATCH):
+            size = min(SEED_BATCH, rows - start)
+            p_values = rng.uniform(size=size)
+            await db.execute(insert(models.Result), [
+                {"experiment_id": 1 + i % 100, "metric_name": "revenue", "test_name": "welch",
+                 "t_statistic": float(t), "p_value": float(p), "effect_size": float(t) / 10, "estimate": float(t),
+                 "ci_lower": float(t) - 1, "ci_upper": float(t) + 1, "ci_method": "welch",
+                 "conclusion": "Significant" if p < 0.05 else "Not Significant"}
+                for i, (t, p) in enumerate(zip(rng.normal(size=size), p_values))
+            ])
+        await db.commit()
+
+async def drain(format: str):
+    query = select(*models.Result.__table__.columns).order_by(models.Result.id)
+    size = 0
+    async for chunk in stream_rows(query, table_fields(models.Result), format):
+        size += len(chunk)
+    return size
+
+async def main(rows: int = 1_000_000):
+    await seed(rows)
+    print(f"{'format':<10}{'rows/s':>14}{'MB':>10}{'peak RSS MB':>14}")
+    for format in ("ndjson", "csv", "parquet"):
+        start = time.perf_counter()
+        size = await drain(format)
+        elapsed = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{format:<10}{rows / elapsed:>14,.0f}{size / 1e6:>10.1f}{peak:>14.1f}")
+    await database.engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
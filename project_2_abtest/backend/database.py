@@ -1,16 +1,77 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str):
+    """Map a plain DATABASE_URL onto its async driver (asyncpg, or aiosqlite for tests)."""
+    db_url = make_url(url)
+    db_url = db_url.set(drivername=ASYNC_DRIVERS.get(db_url.drivername, db_url.drivername))
+    if db_url.drivername == "postgresql+asyncpg" and "prepared_statement_cache_size" not in db_url.query:
+        db_url = db_url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+    return db_url
+
+def engine_options(db_url) -> dict:
+    if db_url.get_backend_name() == "sqlite":
+        return {"pool_pre_ping": True}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+database_url = async_database_url(settings.DATABASE_URL)
+engine = create_async_engine(database_url, **engine_options(database_url))
+# expire_on_commit=False keeps loaded rows usable after a commit without another round trip
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+def add_missing_columns(conn) -> list:
+    """Additive upgrade of existing tables to the current models.
+
+    create_all only creates missing tables, so columns and indexes added to
+    a model later are added here with ALTER TABLE / CREATE INDEX. Only
+    nullable or server-defaulted columns can be added this way; anything
+    else (type changes, new constraints) needs a manual migration. Returns
+    the "table.column" names that were added.
+    """
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} automatically")
+            conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN "
+                              f"{preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}"))
+            added.append(f"{table.name}.{column.name}")
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(conn)
+    return added
+
+async def init_models():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,25 @@
+import hashlib
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """Weak ETags on JSON GET responses, answering If-None-Match with 304 Not Modified.
+
+    The tag hashes the uncompressed body, so it is weak: the same
+    representation may be sent gzip-compressed or not. Non-JSON responses
+    (streams, file exports) pass through untouched.
+    """
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        response = await call_next(request)
+        if request.method != "GET" or response.status_code != 200 \
+                or not response.headers.get("content-type", "").startswith("application/json"):
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+        headers["ETag"] = etag
+        if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+            return Response(status_code=304, headers={k: v for k, v in headers.items() if k.lower() != "content-type"})
+        return Response(body, status_code=response.status_code, headers=headers, media_type=response.media_type)
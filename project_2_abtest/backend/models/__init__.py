@@ -1,2 +1,4 @@
 from .experiment import Experiment
 from .result import Result
+from .accumulator import AccumulatorColumns, ArmAccumulator, VariantAccumulator
+from .variant import Variant
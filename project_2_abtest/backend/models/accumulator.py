@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, String, JSON, DateTime, ForeignKey, UniqueConstraint, func
+from database import Base
+
+class AccumulatorColumns:
+    """Running sufficient statistics (count, mean, M2, M3, M4) with an optional covariate and quantile sketch.
+
+    The covariate columns are only filled for arms that stream a pre-period
+    covariate alongside the metric (CUPED).
+    """
+    count = Column(BigInteger, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)
+    m3 = Column(Float)
+    m4 = Column(Float)
+    covariate_mean = Column(Float)
+    covariate_m2 = Column(Float)
+    comoment = Column(Float)
+    sketch = Column(JSON)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class ArmAccumulator(AccumulatorColumns, Base):
+    """Per-arm statistics of a two-arm experiment."""
+    __tablename__ = "arm_accumulators"
+    __table_args__ = (UniqueConstraint("experiment_id", "arm", name="uq_arm_accumulators_experiment_arm"),)
+    id = Column(Integer, primary_key=True, index=True)
+    experiment_id = Column(Integer, ForeignKey("experiments.id"), nullable=False, index=True)
+    arm = Column(String(100), nullable=False)  # 'control', 'treatment'
+
+class VariantAccumulator(AccumulatorColumns, Base):
+    """Per-variant statistics of an N-arm experiment, keyed by variant id so names never collide with two-arm rows."""
+    __tablename__ = "variant_accumulators"
+    id = Column(Integer, primary_key=True, index=True)
+    experiment_id = Column(Integer, ForeignKey("experiments.id"), nullable=False, index=True)
+    variant_id = Column(Integer, ForeignKey("variants.id"), nullable=False, unique=True)
@@ -9,7 +9,7 @@ class Experiment(Base):
     control_group_name = Column(String(100))
     treatment_group_name = Column(String(100))
     metric_name = Column(String(100))
-    metric_type = Column(String(50))  # 'continuous', 'categorical', 'binary'
-    status = Column(String(50), default="running")
-    created_at = Column(DateTime, server_default=func.now())
+    metric_type = Column(String(50), index=True)  # 'continuous', 'categorical', 'binary'
+    status = Column(String(50), default="running", index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
     created_by = Column(String(100))
@@ -1,14 +1,32 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index, func
 from database import Base
 
 class Result(Base):
     __tablename__ = "results"
+    # Serves per-experiment listings (keyset on id) and the latest-result lookup
+    __table_args__ = (Index("ix_results_experiment_id_id", "experiment_id", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     experiment_id = Column(Integer, ForeignKey("experiments.id"))
+    metric_name = Column(String(100))
+    # Pairwise comparisons in N-arm experiments: variant compared against baseline
+    baseline = Column(String(100))
+    variant = Column(String(100))
+    # Segmented analyses: the dimension (country, platform, ...) and the segment within it
+    segment_dimension = Column(String(100))
+    segment = Column(String(255))
+    test_name = Column(String(50))
+    look = Column(Integer)
+    information_fraction = Column(Float)
     t_statistic = Column(Float)
     p_value = Column(Float)
+    adjusted_p_value = Column(Float)
     effect_size = Column(Float)
+    estimate = Column(Float)
     ci_lower = Column(Float)
     ci_upper = Column(Float)
+    ci_method = Column(String(20))
+    boundary = Column(Float)
+    # mSPRT looks: the mixing scale tau, fixed at the first look of the sequence
+    mixture_scale = Column(Float)
     conclusion = Column(String(255))
     computed_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, UniqueConstraint
+from database import Base
+
+class Variant(Base):
+    """One arm of an N-arm experiment; exactly one variant per experiment is the control."""
+    __tablename__ = "variants"
+    __table_args__ = (UniqueConstraint("experiment_id", "name", name="uq_variants_experiment_name"),)
+    id = Column(Integer, primary_key=True, index=True)
+    experiment_id = Column(Integer, ForeignKey("experiments.id"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    description = Column(Text)
+    is_control = Column(Boolean, nullable=False, default=False)
+    position = Column(Integer, nullable=False, default=0)
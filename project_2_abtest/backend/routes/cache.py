@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from config import settings
+from services.cache import AnalysisCache
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+analysis_cache = AnalysisCache(settings.ANALYSIS_CACHE_SIZE, settings.ANALYSIS_CACHE_TTL)
+
+@router.get("/stats")
+def read_cache_stats():
+    """Size, hit/miss/eviction counters and hit rate of the analysis cache."""
+    return analysis_cache.stats()
+
+@router.delete("/")
+def clear_cache():
+    analysis_cache.clear()
+    return analysis_cache.stats()
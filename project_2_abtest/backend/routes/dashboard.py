@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+import database
+import models
+from database import get_db
+from routes.experiments import experiment_filters
+from routes.pagination import NEXT_CURSOR_HEADER
+from routes.results import latest_results
+from services import tabular
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# strftime (SQLite) and to_char (PostgreSQL) patterns per time bucket; weeks are labelled by their Monday
+PERIOD_FORMATS = {
+    "day": ("%Y-%m-%d", "YYYY-MM-DD"),
+    "week": ("%Y-%m-%d", "YYYY-MM-DD"),
+    "month": ("%Y-%m", "YYYY-MM"),
+}
+
+def column_output(columns: Dict[str, List], format: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Column-oriented JSON ({column: [values]}) or an Arrow IPC stream."""
+    if format == "arrow":
+        try:
+            content = tabular.encode_arrow(columns)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Response(content, media_type=tabular.MEDIA_TYPES["arrow"], headers=headers)
+    return JSONResponse(jsonable_encoder(columns), headers=headers)
+
+async def columns_from(db: AsyncSession, query) -> Dict[str, List]:
+    result = await db.execute(query)
+    return tabular.rows_to_columns(list(result.keys()), result.all())
+
+def period_bucket(column, period: str):
+    """Time bucket label; weeks start on Monday on both backends, so they match ISO weeks."""
+    sqlite_format, postgres_format = PERIOD_FORMATS[period]
+    if database.engine.dialect.name == "sqlite":
+        if period == "week":
+            # 'weekday 0' moves forward to the Sunday ending the week; six days earlier is its Monday
+            column = func.date(column, "weekday 0", "-6 days")
+        return func.strftime(sqlite_format, column)
+    if period == "week":
+        column = func.date_trunc("week", column)
+    return func.to_char(column, postgres_format)
+
+@router.get("/counts")
+async def read_experiment_counts(format: Literal["json", "arrow"] = "json", db: AsyncSession = Depends(get_db)):
+    """Number of experiments per (status, metric_type)."""
+    query = (
+        select(models.Experiment.status, models.Experiment.metric_type, func.count().label("count"))
+        .group_by(models.Experiment.status, models.Experiment.metric_type)
+        .order_by(models.Experiment.status, models.Experiment.metric_type)
+    )
+    return column_output(await columns_from(db, query), format)
+
+@router.get("/latest")
+async def read_latest_results(
+    format: Literal["json", "arrow"] = "json",
+    limit: int = Query(10_000, ge=1, le=100_000),
+    cursor: Optional[int] = None,
+    conditions: List = Depends(experiment_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """One row per experiment with its result count and latest result, newest experiment first."""
+    latest = latest_results()
+    query = (
+        select(models.Experiment.id.label("experiment_id"), models.Experiment.name, models.Experiment.status,
+               models.Experiment.metric_name, models.Experiment.metric_type, models.Experiment.created_at,
+               func.coalesce(latest.c.result_count, 0).label("result_count"), models.Result.test_name,
+               models.Result.p_value, models.Result.adjusted_p_value, models.Result.effect_size,
+               models.Result.estimate, models.Result.conclusion, models.Result.computed_at)
+        .outerjoin(latest, latest.c.experiment_id == models.Experiment.id)
+        .outerjoin(models.Result, models.Result.id == latest.c.result_id)
+        .where(*conditions)
+    )
+    if cursor is not None:
+        query = query.where(models.Experiment.id < cursor)
+    columns = await columns_from(db, query.order_by(models.Experiment.id.desc()).limit(limit))
+    ids = columns["experiment_id"]
+    headers = {NEXT_CURSOR_HEADER: str(ids[-1])} if len(ids) == limit else None
+    return column_output(columns, format, headers)
+
+@router.get("/significance")
+async def read_significance_rates(
+    period: Literal["day", "week", "month"] = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    test_name: Optional[str] = None,
+    format: Literal["json", "arrow"] = "json",
+    db: AsyncSession = Depends(get_db)
+):
+    """Results and the share of significant ones per day, week or month."""
+    bucket = period_bucket(models.Result.computed_at, period).label("period")
+    significant = func.sum(case((models.Result.conclusion == "Significant", 1), else_=0))
+    query = select(bucket, func.count().label("results"), significant.label("significant"))
+    if since is not None:
+        query = query.where(models.Result.computed_at >= since)
+    if until is not None:
+        query = query.where(models.Result.computed_at < until)
+    if test_name is not None:
+        query = query.where(models.Result.test_name == test_name)
+    columns = await columns_from(db, query.group_by(bucket).order_by(bucket))
+    columns["significance_rate"] = [s / n if n else 0.0 for s, n in zip(columns["significant"], columns["results"])]
+    return column_output(columns, format)
+
@@ -1,62 +1,1140 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, File, Query, Response, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import database
 import models
 import schemas
+from config import settings
 from database import get_db
-from services import statistics
+from routes.cache import analysis_cache
+from routes.jobs import submit_job
+from routes.pagination import NEXT_CURSOR_HEADER, fetch_page
+from routes.results import latest_results
+from services import statistics, ingest, sequential
+from services.ratio import ratio_test, ratio_test_from_stats
+from services.proportions import proportion_test, proportion_test_from_samples
+from services.multiarm import multiarm_test
+from services.segments import segmented_analysis
+from services.quantiles import quantile_summary, quantile_test, quantile_test_from_sketches
+from services.ranks import mann_whitney, mann_whitney_from_histograms, mann_whitney_from_sketches
+from services.sketch import QuantileSketch
+from services.variance_reduction import BivariateStats, bivariate_statistics, merge_bivariate, cuped_from_stats
+from services.cache import fingerprint
+from services.correction import MultipleTestingCorrection
 
 router = APIRouter(prefix="/experiments", tags=["experiments"])
 
+ARMS = ("control", "treatment")
+
+# Result columns filled from a statistics dict when present
+RESULT_FIELDS = ("t_statistic", "p_value", "effect_size", "estimate", "ci_lower", "ci_upper", "conclusion")
+
+RUN_TESTS = ("welch", "mannwhitney", "mannwhitney_sketch")
+
+PROPORTION_TEST_NAMES = {"ztest": "two_proportion_z", "chisquare": "chi_square", "fisher": "fisher_exact"}
+
+async def get_experiment_or_404(db: AsyncSession, experiment_id: int) -> models.Experiment:
+    db_experiment = await db.get(models.Experiment, experiment_id)
+    if db_experiment is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    return db_experiment
+
+async def offload(db: AsyncSession, fn, *args):
+    """Run CPU-bound statistics in the threadpool, off the event loop.
+
+    The open read transaction is ended first so no pooled connection is held
+    while computing.
+    """
+    await db.commit()
+    try:
+        return await run_in_threadpool(fn, *args)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def accumulator_stats(row: models.AccumulatorColumns) -> statistics.SufficientStats:
+    return statistics.SufficientStats(row.count, row.mean, row.m2, row.m3, row.m4)
+
+def variant_rows(variants: List[schemas.VariantCreate], start: int = 0) -> List[Dict]:
+    names = [variant.name for variant in variants]
+    if len(set(names)) != len(names):
+        raise ValueError("Variant names must be unique")
+    return [{**variant.model_dump(), "position": start + i} for i, variant in enumerate(variants)]
+
+def new_variant_rows(variants: Optional[List[schemas.VariantCreate]]) -> Optional[List[Dict]]:
+    """Variant rows for a new experiment; the first is the control unless one is flagged."""
+    if variants is None:
+        return None
+    if len(variants) < 2:
+        raise ValueError("An experiment needs at least two variants")
+    controls = sum(variant.is_control for variant in variants)
+    if controls > 1:
+        raise ValueError("Only one variant can be the control")
+    rows = variant_rows(variants)
+    if controls == 0:
+        rows[0]["is_control"] = True
+    return rows
+
 @router.post("/", response_model=schemas.Experiment)
-def create_experiment(experiment: schemas.ExperimentCreate, db: Session = Depends(get_db)):
-    db_experiment = models.Experiment(**experiment.model_dump())
+async def create_experiment(experiment: schemas.ExperimentCreate, db: AsyncSession = Depends(get_db)):
+    try:
+        rows = new_variant_rows(experiment.variants)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db_experiment = models.Experiment(**experiment.model_dump(exclude={"variants"}))
     db.add(db_experiment)
-    db.commit()
-    db.refresh(db_experiment)
+    if rows is not None:
+        await db.flush()
+        db.add_all(models.Variant(experiment_id=db_experiment.id, **row) for row in rows)
+    await db.commit()
+    await db.refresh(db_experiment)
     return db_experiment
 
+BULK_CREATED, BULK_UPDATED, BULK_COMPLETED, BULK_FAILED = "created", "updated", "completed", "failed"
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}" for e in error.errors())
+
+def check_bulk_size(items: List):
+    if not items:
+        raise HTTPException(status_code=400, detail="Need at least one item")
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_ITEMS} items per request")
+
+@router.post("/bulk", response_model=List[schemas.BulkExperimentStatus])
+async def create_experiments_bulk(experiments: List[schemas.ExperimentCreate], db: AsyncSession = Depends(get_db)):
+    """Create many experiments in one transaction with batched INSERT ... RETURNING.
+
+    Items that fail validation are reported as failed and the rest are
+    created; a database error fails the whole batch.
+    """
+    check_bulk_size(experiments)
+    statuses = [schemas.BulkExperimentStatus(index=i, status=BULK_CREATED) for i in range(len(experiments))]
+    valid, variants = [], []
+    for i, experiment in enumerate(experiments):
+        try:
+            variants.append(new_variant_rows(experiment.variants))
+            valid.append(i)
+        except ValueError as e:
+            statuses[i].status, statuses[i].error = BULK_FAILED, str(e)
+    if not valid:
+        return statuses
+
+    try:
+        db_experiments = (await db.scalars(
+            insert(models.Experiment).returning(models.Experiment, sort_by_parameter_order=True),
+            [experiments[i].model_dump(exclude={"variants"}) for i in valid],
+        )).all()
+        variant_params = [
+            {"experiment_id": db_experiment.id, **row}
+            for db_experiment, rows in zip(db_experiments, variants) if rows is not None for row in rows
+        ]
+        if variant_params:
+            await db.execute(insert(models.Variant), variant_params)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        for i in valid:
+            statuses[i].status, statuses[i].error = BULK_FAILED, str(e)
+        return statuses
+    for i, db_experiment in zip(valid, db_experiments):
+        statuses[i].experiment = schemas.Experiment.model_validate(db_experiment)
+    return statuses
+
+@router.patch("/bulk", response_model=List[schemas.BulkExperimentStatus])
+async def update_experiments_bulk(items: List[Dict] = Body(...), db: AsyncSession = Depends(get_db)):
+    """Update many experiments by id with one executemany UPDATE; only the fields sent are changed.
+
+    Each item is validated as an ExperimentUpdate on its own, so an invalid
+    item is reported as failed instead of rejecting the whole request.
+    """
+    check_bulk_size(items)
+    statuses = [schemas.BulkExperimentStatus(index=i, status=BULK_UPDATED) for i in range(len(items))]
+    updates: List[Optional[schemas.ExperimentUpdate]] = []
+    for i, item in enumerate(items):
+        try:
+            updates.append(schemas.ExperimentUpdate.model_validate(item))
+        except ValidationError as e:
+            updates.append(None)
+            statuses[i].status, statuses[i].error = BULK_FAILED, validation_message(e)
+    ids = [change.id for change in updates if change is not None]
+    existing = set((await db.scalars(select(models.Experiment.id).where(models.Experiment.id.in_(ids)))).all())
+    valid, seen = [], set()
+    for i, change in enumerate(updates):
+        if change is None:
+            continue
+        if change.id not in existing:
+            statuses[i].status, statuses[i].error = BULK_FAILED, "Experiment not found"
+        elif change.id in seen:
+            statuses[i].status, statuses[i].error = BULK_FAILED, "Experiment updated twice in one request"
+        else:
+            seen.add(change.id)
+            valid.append(i)
+    if not valid:
+        return statuses
+
+    try:
+        # ORM bulk UPDATE by primary key, batched per distinct set of changed fields
+        await db.execute(update(models.Experiment), [updates[i].model_dump(exclude_unset=True) for i in valid])
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        for i in valid:
+            statuses[i].status, statuses[i].error = BULK_FAILED, str(e)
+        return statuses
+    rows = (await db.scalars(select(models.Experiment).where(models.Experiment.id.in_(seen))
+                             .execution_options(populate_existing=True))).all()
+    by_id = {row.id: row for row in rows}
+    for i in valid:
+        statuses[i].experiment = schemas.Experiment.model_validate(by_id[updates[i].id])
+    return statuses
+
+def analyse_runs(tasks: List[tuple], workers: int) -> List[Dict]:
+    """analysis_fields for every task on a thread pool; each item is {"fields": ...} or {"error": ...}.
+
+    numpy and scipy release the GIL in their array loops, so the threads
+    overlap the per-experiment statistics without copying data to other
+    processes.
+    """
+    def run(task):
+        try:
+            return {"fields": analysis_fields(*task)}
+        except Exception as e:
+            # One bad item (bad input or malformed stored data) is reported on its own, never aborting the batch
+            return {"error": str(e) or type(e).__name__}
+    if workers <= 1 or len(tasks) <= 1:
+        return [run(task) for task in tasks]
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(run, tasks))
+
+@router.post("/bulk/run", response_model=List[schemas.BulkRunStatus])
+async def run_experiments_bulk(bulk: schemas.BulkRun, db: AsyncSession = Depends(get_db)):
+    """Analyse many experiments' datasets in one request.
+
+    Experiments are loaded with one query, the statistics run in parallel,
+    and every successful result is written with one batched INSERT ...
+    RETURNING. Each run reports its own status, so one bad dataset does not
+    fail the others.
+    """
+    runs = bulk.runs
+    check_bulk_size(runs)
+    ids = {run.experiment_id for run in runs}
+    db_experiments = {row.id: row for row in (await db.scalars(
+        select(models.Experiment).where(models.Experiment.id.in_(ids)))).all()}
+    statuses = [schemas.BulkRunStatus(index=i, experiment_id=run.experiment_id, status=BULK_COMPLETED)
+                for i, run in enumerate(runs)]
+    pending, tasks = [], []
+    for i, run in enumerate(runs):
+        db_experiment = db_experiments.get(run.experiment_id)
+        if db_experiment is None:
+            statuses[i].status, statuses[i].error = BULK_FAILED, "Experiment not found"
+            continue
+        pending.append(i)
+        tasks.append((db_experiment.metric_type, run.test, run.control_data, run.treatment_data, run.presorted,
+                      bulk.relative_accuracy))
+
+    outcomes = await offload(db, analyse_runs, tasks, settings.BULK_RUN_WORKERS)
+    done, rows = [], []
+    for i, outcome in zip(pending, outcomes):
+        if "error" in outcome:
+            statuses[i].status, statuses[i].error = BULK_FAILED, outcome["error"]
+        else:
+            done.append(i)
+            rows.append({"experiment_id": runs[i].experiment_id, **outcome["fields"]})
+    if not rows:
+        return statuses
+
+    try:
+        db_results = (await db.scalars(insert(models.Result).returning(models.Result, sort_by_parameter_order=True),
+                                       rows)).all()
+        completed = {runs[i].experiment_id for i in done}
+        await db.execute(update(models.Experiment).where(models.Experiment.id.in_(completed)).values(status="completed"))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        for i in done:
+            statuses[i].status, statuses[i].error = BULK_FAILED, str(e)
+        return statuses
+    for i, db_result in zip(done, db_results):
+        statuses[i].result = schemas.Result.model_validate(db_result)
+    return statuses
+
+def experiment_filters(status: Optional[str] = None, metric_type: Optional[str] = None,
+                       created_after: Optional[datetime] = None, created_before: Optional[datetime] = None) -> List:
+    conditions = []
+    if status is not None:
+        conditions.append(models.Experiment.status == status)
+    if metric_type is not None:
+        conditions.append(models.Experiment.metric_type == metric_type)
+    if created_after is not None:
+        conditions.append(models.Experiment.created_at >= created_after)
+    if created_before is not None:
+        conditions.append(models.Experiment.created_at < created_before)
+    return conditions
+
 @router.get("/", response_model=List[schemas.Experiment])
-def read_experiments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    experiments = db.query(models.Experiment).order_by(models.Experiment.created_at.desc()).offset(skip).limit(limit).all()
-    return experiments
+async def read_experiments(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=10_000),
+    cursor: Optional[int] = None,
+    fields: Optional[List[str]] = Query(None),
+    conditions: List = Depends(experiment_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """Experiments newest first; pass the X-Next-Cursor header back as cursor for the next page."""
+    return await fetch_page(db, models.Experiment, schemas.Experiment, conditions, response, cursor, limit, fields, skip)
+
+@router.get("/summary", response_model=List[schemas.ExperimentSummary])
+async def read_experiment_summaries(
+    response: Response,
+    limit: int = Query(100, ge=1, le=10_000),
+    cursor: Optional[int] = None,
+    conditions: List = Depends(experiment_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """Each experiment with its result count and latest result, in one query."""
+    latest = latest_results()
+    query = (
+        select(models.Experiment, models.Result, latest.c.result_count)
+        .outerjoin(latest, latest.c.experiment_id == models.Experiment.id)
+        .outerjoin(models.Result, models.Result.id == latest.c.result_id)
+        .where(*conditions)
+    )
+    if cursor is not None:
+        query = query.where(models.Experiment.id < cursor)
+    rows = (await db.execute(query.order_by(models.Experiment.id.desc()).limit(limit))).all()
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1][0].id)
+    return [
+        schemas.ExperimentSummary(**schemas.Experiment.model_validate(experiment).model_dump(),
+                                  result_count=result_count or 0, latest_result=result)
+        for experiment, result, result_count in rows
+    ]
 
 @router.get("/{experiment_id}", response_model=schemas.Experiment)
-def read_experiment(experiment_id: int, db: Session = Depends(get_db)):
-    db_experiment = db.query(models.Experiment).filter(models.Experiment.id == experiment_id).first()
-    if db_experiment is None:
-        raise HTTPException(status_code=404, detail="Experiment not found")
-    return db_experiment
+async def read_experiment(experiment_id: int, db: AsyncSession = Depends(get_db)):
+    return await get_experiment_or_404(db, experiment_id)
+
+def result_fields(stats_results: Dict, **extra) -> Dict:
+    return {**{k: stats_results[k] for k in RESULT_FIELDS if k in stats_results}, **extra}
+
+async def save_result(db: AsyncSession, db_experiment: models.Experiment, stats_results: Dict,
+                      complete: bool = True, **extra) -> models.Result:
+    try:
+        db_result = models.Result(experiment_id=db_experiment.id, **result_fields(stats_results, **extra))
+        if complete:
+            db_experiment.status = "completed"
+        db.add(db_result)
+        await db.commit()
+        await db.refresh(db_result)
+        return db_result
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+def sketch_rank_test(control_data, treatment_data, relative_accuracy: float) -> Dict:
+    return mann_whitney_from_sketches(QuantileSketch.from_data(control_data, relative_accuracy),
+                                      QuantileSketch.from_data(treatment_data, relative_accuracy))
+
+def analysis_fields(metric_type: str, test: str, control_data, treatment_data, presorted: bool = False,
+                    relative_accuracy: float = 0.01) -> Dict:
+    """Result columns for one two-arm analysis, dispatched on metric_type and test.
+
+    Binary metrics are reduced to counts; other metrics get Welch's t-test
+    or a Mann-Whitney U test, exact on merged ranks or approximate on
+    quantile sketches. Pure computation, so it can run on any thread.
+    """
+    if metric_type == "binary":
+        return result_fields(proportion_test_from_samples(control_data, treatment_data),
+                             test_name=PROPORTION_TEST_NAMES["ztest"])
+    if test not in RUN_TESTS:
+        raise ValueError(f"test must be one of {', '.join(RUN_TESTS)}")
+    if test == "welch":
+        return result_fields(statistics.welch_ttest(control_data, treatment_data), test_name="welch")
+    if test == "mannwhitney":
+        stats_results = mann_whitney(control_data, treatment_data, presorted)
+    else:
+        stats_results = sketch_rank_test(control_data, treatment_data, relative_accuracy)
+    return result_fields(stats_results, test_name=test.replace("mannwhitney", "mann_whitney"),
+                         t_statistic=stats_results["z_statistic"])
+
+async def run_analysis(db: AsyncSession, db_experiment: models.Experiment, control_data, treatment_data,
+                       test: str = "welch", presorted: bool = False, relative_accuracy: float = 0.01) -> models.Result:
+    fields = await offload(db, analysis_fields, db_experiment.metric_type, test, control_data, treatment_data,
+                           presorted, relative_accuracy)
+    return await save_result(db, db_experiment, {}, **fields)
+
+async def persist_result(experiment_id: int, stats_results: Dict, **extra) -> schemas.Result:
+    """Store a Result computed by a background job, in a session of its own."""
+    async with database.SessionLocal() as db:
+        db_result = models.Result(experiment_id=experiment_id, **result_fields(stats_results, **extra))
+        db.add(db_result)
+        db_experiment = await db.get(models.Experiment, experiment_id)
+        if db_experiment is not None:
+            db_experiment.status = "completed"
+        await db.commit()
+        await db.refresh(db_result)
+        return schemas.Result.model_validate(db_result)
+
+def submit_analysis_job(db_experiment: models.Experiment, control_data, treatment_data, test: str = "welch",
+                        presorted: bool = False, relative_accuracy: float = 0.01) -> Dict:
+    """Queue analysis_fields on the job pool; the job's kind is the test that runs."""
+    if len(control_data) == 0 or len(treatment_data) == 0:
+        raise HTTPException(status_code=400, detail="Groups cannot be empty")
+    if db_experiment.metric_type == "binary":
+        kind = "proportions"
+    elif test in RUN_TESTS:
+        kind = test
+    else:
+        raise HTTPException(status_code=400, detail=f"test must be one of {', '.join(RUN_TESTS)}")
+    experiment_id = db_experiment.id
+    return submit_job(
+        kind, analysis_fields,
+        (db_experiment.metric_type, test, np.asarray(control_data, dtype=np.float64),
+         np.asarray(treatment_data, dtype=np.float64), presorted, relative_accuracy),
+        experiment_id, lambda fields: persist_result(experiment_id, {}, **fields),
+    )
+
+def batch_statistics(control_data, treatment_data, control_covariate=None, treatment_covariate=None) -> List:
+    """Per-arm (SufficientStats, BivariateStats or None, QuantileSketch) for one incoming batch."""
+    return [
+        (statistics.sufficient_statistics(data, higher_moments=True),
+         None if covariate is None else bivariate_statistics(data, covariate),
+         QuantileSketch.from_data(data, settings.SKETCH_RELATIVE_ACCURACY))
+        for data, covariate in ((control_data, control_covariate), (treatment_data, treatment_covariate))
+    ]
+
+def covariate_stats(row: models.AccumulatorColumns) -> BivariateStats:
+    return BivariateStats(row.count, row.mean, row.covariate_mean, row.m2, row.covariate_m2, row.comoment)
+
+def fold_batch(row: models.AccumulatorColumns, stats: statistics.SufficientStats, bivariate: Optional[BivariateStats],
+               sketch: QuantileSketch, arm: str) -> None:
+    """Merge one batch's reductions into an accumulator row: moments, covariate co-moments and sketch."""
+    if stats.n == 0:
+        return
+    tracks_covariate = row.covariate_mean is not None
+    if bivariate is not None:
+        if row.count > 0 and not tracks_covariate:
+            raise ValueError(f"The {arm} arm has observations without a covariate; covariates must be sent from the first batch")
+        previous = covariate_stats(row) if tracks_covariate else BivariateStats(0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        merged = merge_bivariate(previous, bivariate)
+        row.covariate_mean, row.covariate_m2, row.comoment = merged.mean_x, merged.m2_x, merged.c_xy
+    elif tracks_covariate:
+        raise ValueError(f"The {arm} arm tracks a covariate; send covariate values with every batch")
+    # Arms that already hold observations without a sketch cannot get an accurate one any more
+    if row.count == 0:
+        row.sketch = sketch.to_dict()
+    elif row.sketch is not None:
+        row.sketch = QuantileSketch.from_dict(row.sketch).merge(sketch).to_dict()
+    row.count, row.mean, row.m2, row.m3, row.m4 = statistics.merge_stats(accumulator_stats(row), stats)
+
+async def fold_batches(db: AsyncSession, model, conditions: List, key, batches: Dict, new_row, labels: Dict) -> Dict:
+    """Lock the matching accumulator rows, creating missing ones, and fold each key's batch into its row.
+
+    Nothing is committed, so the caller can persist the rows together with
+    anything else in the same transaction; a ValueError leaves the session
+    to be rolled back.
+    """
+    result = await db.scalars(select(model).where(*conditions).with_for_update())
+    rows = {getattr(row, key): row for row in result}
+    for name, (stats, bivariate, sketch) in batches.items():
+        row = rows.get(name)
+        if row is None:
+            row = new_row(name)
+            db.add(row)
+            rows[name] = row
+        fold_batch(row, stats, bivariate, sketch, labels[name])
+    return rows
+
+async def commit_accumulators(db: AsyncSession, rows) -> None:
+    try:
+        await db.commit()
+        for row in rows:
+            # updated_at is set server-side
+            await db.refresh(row)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+def new_accumulator(model, **keys):
+    return model(**keys, count=0, mean=0.0, m2=0.0, m3=0.0, m4=0.0)
+
+async def stage_arm_batches(db: AsyncSession, experiment_id: int, control_data, treatment_data,
+                            control_covariate=None, treatment_covariate=None) -> List[models.ArmAccumulator]:
+    """Fold a two-arm batch into the locked arm accumulators without committing."""
+    # Reduce the batch before taking row locks, so the locked section is O(1)
+    batch_stats = await offload(db, batch_statistics, control_data, treatment_data, control_covariate, treatment_covariate)
+    try:
+        rows = await fold_batches(
+            db, models.ArmAccumulator, [models.ArmAccumulator.experiment_id == experiment_id], "arm",
+            dict(zip(ARMS, batch_stats)),
+            lambda arm: new_accumulator(models.ArmAccumulator, experiment_id=experiment_id, arm=arm),
+            {arm: arm for arm in ARMS},
+        )
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return [rows[arm] for arm in ARMS]
+
+async def append_to_accumulators(db: AsyncSession, experiment_id: int, control_data, treatment_data,
+                                 control_covariate=None, treatment_covariate=None) -> List[models.ArmAccumulator]:
+    rows = await stage_arm_batches(db, experiment_id, control_data, treatment_data, control_covariate, treatment_covariate)
+    await commit_accumulators(db, rows)
+    return rows
+
+async def read_upload(upload: Optional[UploadFile], format: Optional[str], column: Optional[str]) -> np.ndarray:
+    if upload is None:
+        return np.empty(0)
+    payload = await upload.read()
+    try:
+        return await run_in_threadpool(ingest.decode_array, payload, format, column, upload.content_type, upload.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{upload.filename or 'upload'}: {e}")
+
+def keyed_inputs(control_data, treatment_data, **params):
+    """Inputs as float64 buffers, converted once, with their cache key."""
+    control, treatment = statistics.as_float64(control_data), statistics.as_float64(treatment_data)
+    return fingerprint(control, treatment, **params), control, treatment
+
+async def cached_analysis(db: AsyncSession, db_experiment: models.Experiment, response: Response, control_data,
+                          treatment_data, test: str, presorted: bool, relative_accuracy: float, force: bool):
+    """run_analysis behind the content-addressed cache.
+
+    Identical inputs and parameters on the same experiment return the stored
+    result without recomputing or writing a new row; force=True recomputes
+    and refreshes the entry. The X-Cache header reports hit or miss.
+    """
+    params = {"experiment_id": db_experiment.id, "metric_type": db_experiment.metric_type, "test": test,
+              "presorted": presorted, "relative_accuracy": relative_accuracy}
+    key, control, treatment = await offload(db, lambda: keyed_inputs(control_data, treatment_data, **params))
+    cached = None if force else analysis_cache.get(key)
+    response.headers["X-Cache"] = "hit" if cached is not None else "miss"
+    if cached is not None:
+        return cached
+    db_result = await run_analysis(db, db_experiment, control, treatment, test, presorted, relative_accuracy)
+    result = schemas.Result.model_validate(db_result)
+    analysis_cache.put(key, result)
+    return result
 
 @router.post("/{experiment_id}/run", response_model=schemas.Result)
-def run_experiment(
+async def run_experiment(
     experiment_id: int, 
     control_data: List[float], 
     treatment_data: List[float], 
-    db: Session = Depends(get_db)
+    response: Response,
+    test: str = "welch",
+    presorted: bool = False,
+    relative_accuracy: float = 0.01,
+    force: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    db_experiment = db.query(models.Experiment).filter(models.Experiment.id == experiment_id).first()
-    if db_experiment is None:
-        raise HTTPException(status_code=404, detail="Experiment not found")
-        
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    return await cached_analysis(db, db_experiment, response, control_data, treatment_data, test, presorted,
+                                 relative_accuracy, force)
+
+@router.post("/{experiment_id}/run/upload", response_model=schemas.Result)
+async def run_experiment_upload(
+    experiment_id: int,
+    response: Response,
+    control: UploadFile = File(...),
+    treatment: UploadFile = File(...),
+    format: Optional[str] = None,
+    column: Optional[str] = None,
+    test: str = "welch",
+    presorted: bool = False,
+    relative_accuracy: float = 0.01,
+    force: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Run the analysis on binary uploads (raw little-endian float64, .npy, Arrow IPC or Parquet)."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    control_data = await read_upload(control, format, column)
+    treatment_data = await read_upload(treatment, format, column)
+    return await cached_analysis(db, db_experiment, response, control_data, treatment_data, test, presorted,
+                                 relative_accuracy, force)
+
+def check_bootstrap_options(options: schemas.BootstrapOptions):
+    if not 2 <= options.n_resamples <= settings.MAX_BOOTSTRAP_RESAMPLES:
+        raise HTTPException(status_code=400, detail=f"n_resamples must be between 2 and {settings.MAX_BOOTSTRAP_RESAMPLES}")
+
+def bootstrap_args(control_data, treatment_data, options: schemas.BootstrapOptions, n_jobs: int) -> tuple:
+    return (control_data, treatment_data, options.statistic, options.effect, options.method, options.resampling,
+            options.n_resamples, options.alpha, options.trim, options.seed, n_jobs, options.decimals)
+
+def bootstrap_extra(boot: Dict) -> Dict:
+    return {"test_name": f"bootstrap_{boot['statistic']}_{boot['effect']}", "ci_method": boot["method"]}
+
+async def run_bootstrap(db: AsyncSession, db_experiment: models.Experiment, control_data, treatment_data,
+                        options: schemas.BootstrapOptions) -> models.Result:
+    check_bootstrap_options(options)
+    boot = await offload(db, statistics.bootstrap_ci,
+                         *bootstrap_args(control_data, treatment_data, options, settings.BOOTSTRAP_WORKERS))
+    return await save_result(db, db_experiment, boot, **bootstrap_extra(boot))
+
+def submit_bootstrap_job(db_experiment: models.Experiment, control_data, treatment_data,
+                         options: schemas.BootstrapOptions) -> Dict:
+    """Queue bootstrap_ci on the job pool; each job resamples serially, the pool supplies the parallelism."""
+    check_bootstrap_options(options)
+    if len(control_data) == 0 or len(treatment_data) == 0:
+        raise HTTPException(status_code=400, detail="Groups cannot be empty")
+    experiment_id = db_experiment.id
+    return submit_job(
+        "bootstrap", statistics.bootstrap_ci,
+        bootstrap_args(np.asarray(control_data, dtype=np.float64), np.asarray(treatment_data, dtype=np.float64),
+                       options, 1),
+        experiment_id, lambda boot: persist_result(experiment_id, boot, **bootstrap_extra(boot)),
+    )
+
+@router.post("/{experiment_id}/run/counts", response_model=schemas.Result)
+async def run_experiment_counts(experiment_id: int, run: schemas.ProportionRun, db: AsyncSession = Depends(get_db)):
+    """Analyse a binary metric from (successes, trials) per arm, whatever the traffic."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    if db_experiment.metric_type != "binary":
+        raise HTTPException(status_code=400, detail="Count-based runs are only available for binary metrics")
+    stats_results = await offload(
+        db, proportion_test, run.control_successes, run.control_trials,
+        run.treatment_successes, run.treatment_trials, run.test, run.alpha
+    )
+    return await save_result(db, db_experiment, stats_results, test_name=PROPORTION_TEST_NAMES[run.test])
+
+@router.post("/{experiment_id}/run/histogram", response_model=schemas.Result)
+async def run_experiment_histogram(experiment_id: int, run: schemas.HistogramRun, db: AsyncSession = Depends(get_db)):
+    """Mann-Whitney U test from per-arm counts over shared ordered bins."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    stats_results = await offload(db, mann_whitney_from_histograms, run.control_counts, run.treatment_counts, run.alpha)
+    return await save_result(db, db_experiment, stats_results, test_name="mann_whitney_binned",
+                             t_statistic=stats_results["z_statistic"])
+
+@router.post("/{experiment_id}/run/bootstrap", response_model=schemas.Result)
+async def run_experiment_bootstrap(experiment_id: int, run: schemas.BootstrapRun, db: AsyncSession = Depends(get_db)):
+    """Percentile or BCa bootstrap interval for the median, mean or trimmed mean."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    return await run_bootstrap(db, db_experiment, run.control_data, run.treatment_data, run)
+
+@router.post("/{experiment_id}/run/bootstrap/upload", response_model=schemas.Result)
+async def run_experiment_bootstrap_upload(
+    experiment_id: int,
+    control: UploadFile = File(...),
+    treatment: UploadFile = File(...),
+    format: Optional[str] = None,
+    column: Optional[str] = None,
+    options: schemas.BootstrapOptions = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    """Binary-upload variant of the bootstrap endpoint; options are query parameters."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    control_data = await read_upload(control, format, column)
+    treatment_data = await read_upload(treatment, format, column)
+    return await run_bootstrap(db, db_experiment, control_data, treatment_data, options)
+
+@router.post("/{experiment_id}/run/jobs", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+async def submit_run_job(
+    experiment_id: int,
+    control_data: List[float],
+    treatment_data: List[float],
+    test: str = "welch",
+    presorted: bool = False,
+    relative_accuracy: float = 0.01,
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue the analysis on the worker pool and return the job right away; poll /jobs/{id} for the Result."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    await db.commit()
+    return submit_analysis_job(db_experiment, control_data, treatment_data, test, presorted, relative_accuracy)
+
+@router.post("/{experiment_id}/run/upload/jobs", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+async def submit_run_upload_job(
+    experiment_id: int,
+    control: UploadFile = File(...),
+    treatment: UploadFile = File(...),
+    format: Optional[str] = None,
+    column: Optional[str] = None,
+    test: str = "welch",
+    presorted: bool = False,
+    relative_accuracy: float = 0.01,
+    db: AsyncSession = Depends(get_db)
+):
+    """Binary-upload variant of the job submission endpoint."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    await db.commit()
+    control_data = await read_upload(control, format, column)
+    treatment_data = await read_upload(treatment, format, column)
+    return submit_analysis_job(db_experiment, control_data, treatment_data, test, presorted, relative_accuracy)
+
+@router.post("/{experiment_id}/run/bootstrap/jobs", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+async def submit_bootstrap_run_job(experiment_id: int, run: schemas.BootstrapRun, db: AsyncSession = Depends(get_db)):
+    """Queue a bootstrap interval on the worker pool; poll /jobs/{id} for the Result."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    await db.commit()
+    return submit_bootstrap_job(db_experiment, run.control_data, run.treatment_data, run)
+
+@router.post("/{experiment_id}/observations", response_model=List[schemas.ArmAccumulator])
+async def append_observations(experiment_id: int, batch: schemas.ObservationBatch, db: AsyncSession = Depends(get_db)):
+    """Fold a new batch of observations into the persisted per-arm accumulators."""
+    await get_experiment_or_404(db, experiment_id)
+    return await append_to_accumulators(db, experiment_id, batch.control_data, batch.treatment_data,
+                                        batch.control_covariate, batch.treatment_covariate)
+
+@router.post("/{experiment_id}/observations/upload", response_model=List[schemas.ArmAccumulator])
+async def append_observations_upload(
+    experiment_id: int,
+    control: Optional[UploadFile] = File(None),
+    treatment: Optional[UploadFile] = File(None),
+    control_covariate: Optional[UploadFile] = File(None),
+    treatment_covariate: Optional[UploadFile] = File(None),
+    format: Optional[str] = None,
+    column: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Binary-upload variant of the observations append endpoint."""
+    await get_experiment_or_404(db, experiment_id)
+    control_data = await read_upload(control, format, column)
+    treatment_data = await read_upload(treatment, format, column)
+    covariates = [None if upload is None else await read_upload(upload, format, column)
+                  for upload in (control_covariate, treatment_covariate)]
+    return await append_to_accumulators(db, experiment_id, control_data, treatment_data, *covariates)
+
+async def read_variants(db: AsyncSession, experiment_id: int) -> List[models.Variant]:
+    variants = await db.scalars(
+        select(models.Variant).where(models.Variant.experiment_id == experiment_id).order_by(models.Variant.position)
+    )
+    return variants.all()
+
+async def variants_or_400(db: AsyncSession, experiment_id: int, names) -> List[models.Variant]:
+    """The experiment's variants, checking that every name in names is one of them."""
+    variants = await read_variants(db, experiment_id)
+    if not variants:
+        raise HTTPException(status_code=400, detail="Experiment has no variants")
+    unknown = set(names) - {variant.name for variant in variants}
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown variants: {', '.join(sorted(unknown))}")
+    return variants
+
+@router.get("/{experiment_id}/variants", response_model=List[schemas.Variant])
+async def list_variants(experiment_id: int, db: AsyncSession = Depends(get_db)):
+    await get_experiment_or_404(db, experiment_id)
+    return await read_variants(db, experiment_id)
+
+@router.post("/{experiment_id}/variants", response_model=schemas.Variant)
+async def add_variant(experiment_id: int, variant: schemas.VariantCreate, db: AsyncSession = Depends(get_db)):
+    await get_experiment_or_404(db, experiment_id)
+    variants = await read_variants(db, experiment_id)
+    if any(existing.name == variant.name for existing in variants):
+        raise HTTPException(status_code=400, detail=f"Variant '{variant.name}' already exists")
+    if variant.is_control and any(existing.is_control for existing in variants):
+        raise HTTPException(status_code=400, detail="Only one variant can be the control")
+    db_variant = models.Variant(experiment_id=experiment_id, **variant_rows([variant], start=len(variants))[0])
+    if not variants:
+        db_variant.is_control = True
+    db.add(db_variant)
+    await db.commit()
+    await db.refresh(db_variant)
+    return db_variant
+
+def variant_statistics(data: Dict[str, List[float]]) -> Dict[str, statistics.SufficientStats]:
+    return {name: statistics.sufficient_statistics(values, higher_moments=True) for name, values in data.items()}
+
+def variant_batch_statistics(data: Dict[str, List[float]]) -> Dict[str, tuple]:
+    """Per-variant (SufficientStats, None, QuantileSketch) for one incoming batch; variants have no covariate."""
+    return {name: (stats, None, QuantileSketch.from_data(data[name], settings.SKETCH_RELATIVE_ACCURACY))
+            for name, stats in variant_statistics(data).items()}
+
+def variant_accumulator_out(row: models.VariantAccumulator, name: str) -> schemas.ArmAccumulator:
+    fields = {field: getattr(row, field) for field in schemas.ArmAccumulator.model_fields if field != "arm"}
+    return schemas.ArmAccumulator(arm=name, **fields)
+
+def multiarm_from_stats(variants: List[models.Variant], arm_stats: Dict[str, statistics.SufficientStats],
+                        options: schemas.MultiArmOptions) -> Dict:
+    names = [variant.name for variant in variants if variant.name in arm_stats]
+    control = next(variant.name for variant in variants if variant.is_control)
+    return multiarm_test(names, [arm_stats[name] for name in names], control, options.omnibus,
+                         options.comparisons, options.correction, options.alpha)
+
+def multiarm_from_data(variants: List[models.Variant], data: Dict[str, List[float]], options: schemas.MultiArmOptions) -> Dict:
+    return multiarm_from_stats(variants, variant_statistics(data), options)
+
+async def save_multiarm_results(db: AsyncSession, db_experiment: models.Experiment, analysis: Dict,
+                                options: schemas.MultiArmOptions, complete: bool = True) -> List[models.Result]:
+    """Store the omnibus test and every pairwise comparison with one bulk insert."""
+    omnibus = analysis["omnibus"]
+    rows = [{
+        "experiment_id": db_experiment.id,
+        "test_name": "welch_anova" if options.omnibus == "welch" else "anova",
+        "t_statistic": omnibus["statistic"],
+        "p_value": omnibus["p_value"],
+        "conclusion": omnibus["conclusion"],
+    }] + [
+        {"experiment_id": db_experiment.id, "test_name": "welch", **result_fields(comparison),
+         "baseline": comparison["baseline"], "variant": comparison["variant"],
+         "adjusted_p_value": comparison["adjusted_p_value"]}
+        for comparison in analysis["comparisons"]
+    ]
+    try:
+        db_results = (await db.scalars(insert(models.Result).returning(models.Result, sort_by_parameter_order=True),
+                                       rows)).all()
+        if complete:
+            db_experiment.status = "completed"
+        await db.commit()
+        return db_results
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/{experiment_id}/run/variants", response_model=List[schemas.Result])
+async def run_experiment_variants(experiment_id: int, run: schemas.MultiArmRun, db: AsyncSession = Depends(get_db)):
+    """Omnibus test and corrected pairwise comparisons across the variants of an N-arm experiment."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    variants = await variants_or_400(db, experiment_id, run.data)
+    analysis = await offload(db, multiarm_from_data, variants, run.data, run)
+    return await save_multiarm_results(db, db_experiment, analysis, run)
+
+@router.post("/{experiment_id}/variants/observations", response_model=List[schemas.ArmAccumulator])
+async def append_variant_observations(experiment_id: int, batch: schemas.VariantObservations, db: AsyncSession = Depends(get_db)):
+    """Fold a batch of observations per variant into the variant accumulators."""
+    await get_experiment_or_404(db, experiment_id)
+    variants = await variants_or_400(db, experiment_id, batch.data)
+    batch_stats = await offload(db, variant_batch_statistics, batch.data)
+    ids = {variant.name: variant.id for variant in variants}
+    try:
+        rows = await fold_batches(
+            db, models.VariantAccumulator, [models.VariantAccumulator.experiment_id == experiment_id], "variant_id",
+            {ids[name]: batch for name, batch in batch_stats.items()},
+            lambda variant_id: new_accumulator(models.VariantAccumulator, experiment_id=experiment_id, variant_id=variant_id),
+            {variant.id: variant.name for variant in variants},
+        )
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    await commit_accumulators(db, rows.values())
+    return [variant_accumulator_out(rows[variant.id], variant.name) for variant in variants if variant.id in rows]
+
+@router.post("/{experiment_id}/variants/analyze", response_model=List[schemas.Result])
+async def analyze_variant_observations(experiment_id: int, options: schemas.MultiArmOptions = Depends(),
+                                       db: AsyncSession = Depends(get_db)):
+    """N-arm analysis from the accumulated per-variant statistics, without raw data."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    variants = await variants_or_400(db, experiment_id, [])
+    names = {variant.id: variant.name for variant in variants}
+    result = await db.scalars(select(models.VariantAccumulator).where(models.VariantAccumulator.experiment_id == experiment_id))
+    arm_stats = {names[row.variant_id]: accumulator_stats(row) for row in result if row.count > 0}
+    analysis = await offload(db, multiarm_from_stats, variants, arm_stats, options)
+    return await save_multiarm_results(db, db_experiment, analysis, options, complete=False)
+
+def segments_from_run(run: schemas.SegmentRun, binary: bool) -> Dict:
+    return segmented_analysis(run.control_data, run.treatment_data, run.control_segments, run.treatment_segments,
+                              binary, run.correction, run.alpha, run.min_count)
+
+@router.post("/{experiment_id}/run/segments", response_model=List[schemas.Result])
+async def run_experiment_segments(experiment_id: int, run: schemas.SegmentRun, db: AsyncSession = Depends(get_db)):
+    """Per-segment results with a cross-segment correction and a heterogeneity test per dimension."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    binary = db_experiment.metric_type == "binary"
+    analysis = await offload(db, segments_from_run, run, binary)
+    test_name = PROPORTION_TEST_NAMES["ztest"] if binary else "welch"
+    rows = [
+        {"experiment_id": experiment_id, "test_name": test_name, "segment_dimension": segment["dimension"],
+         "segment": segment["segment"], "adjusted_p_value": segment.get("adjusted_p_value"), **result_fields(segment)}
+        for segment in analysis["segments"]
+    ] + [
+        {"experiment_id": experiment_id, "test_name": "cochran_q", "segment_dimension": q["dimension"],
+         "t_statistic": q["statistic"], "p_value": q["p_value"], "conclusion": q["conclusion"]}
+        for q in analysis["heterogeneity"]
+    ]
+    try:
+        db_results = (await db.scalars(insert(models.Result).returning(models.Result, sort_by_parameter_order=True),
+                                       rows)).all()
+        db_experiment.status = "completed"
+        await db.commit()
+        return db_results
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+def metric_matrix(rows: List[List[Optional[float]]]) -> np.ndarray:
+    """Stack per-metric observation lists into a NaN-padded matrix."""
+    width = max((len(row) for row in rows), default=0)
+    matrix = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = np.array(row, dtype=np.float64)
+    return matrix
+
+def analyse_metric_batch(batch: schemas.MetricBatchRun):
+    tests = statistics.welch_ttest_batch(metric_matrix(batch.control_data), metric_matrix(batch.treatment_data), batch.alpha)
+    if batch.correction == "none":
+        adjusted = tests["p_value"]
+    else:
+        adjusted = MultipleTestingCorrection.adjust(tests["p_value"], batch.correction, batch.alpha)["adjusted_p_values"]
+    return tests, adjusted
+
+@router.post("/{experiment_id}/run/batch", response_model=List[schemas.Result])
+async def run_experiment_batch(experiment_id: int, batch: schemas.MetricBatchRun, db: AsyncSession = Depends(get_db)):
+    """Analyse many metrics at once with a family-wide multiple testing correction."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    n_metrics = len(batch.metric_names)
+    if n_metrics == 0 or len(batch.control_data) != n_metrics or len(batch.treatment_data) != n_metrics:
+        raise HTTPException(status_code=400, detail="Need one control and one treatment row per metric")
+
+    tests, adjusted = await offload(db, analyse_metric_batch, batch)
+    p_values = tests["p_value"].tolist()
+    try:
+
+        rows = [
+            {
+                "experiment_id": experiment_id,
+                "test_name": "welch",
+                "metric_name": metric_name,
+                "t_statistic": float(tests["t_statistic"][i]),
+                "p_value": p_values[i],
+                "adjusted_p_value": float(adjusted[i]),
+                "effect_size": float(tests["effect_size"][i]),
+                "ci_lower": float(tests["ci_lower"][i]),
+                "ci_upper": float(tests["ci_upper"][i]),
+                "conclusion": "Significant" if adjusted[i] < batch.alpha else "Not Significant",
+            }
+            for i, metric_name in enumerate(batch.metric_names)
+        ]
+        db_results = (await db.scalars(insert(models.Result).returning(models.Result, sort_by_parameter_order=True),
+                                       rows)).all()
+        db_experiment.status = "completed"
+        await db.commit()
+        return db_results
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{experiment_id}/observations", response_model=List[schemas.ArmAccumulator])
+async def read_observations(experiment_id: int, db: AsyncSession = Depends(get_db)):
+    await get_experiment_or_404(db, experiment_id)
+    rows = await db.scalars(
+        select(models.ArmAccumulator).where(models.ArmAccumulator.experiment_id == experiment_id).order_by(models.ArmAccumulator.arm)
+    )
+    return rows.all()
+
+@router.post("/{experiment_id}/observations/analyze", response_model=schemas.Result)
+async def analyze_observations(experiment_id: int, db: AsyncSession = Depends(get_db)):
+    """Run Welch's t-test from the accumulated statistics without touching raw data."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    result = await db.scalars(select(models.ArmAccumulator).where(models.ArmAccumulator.experiment_id == experiment_id))
+    rows = {row.arm: row for row in result}
+    if any(arm not in rows or rows[arm].count == 0 for arm in ARMS):
+        raise HTTPException(status_code=400, detail="Both arms need observations before analysis")
+    stats_results = await offload(db, statistics.welch_ttest_from_stats, accumulator_stats(rows["control"]),
+                                  accumulator_stats(rows["treatment"]))
+    return await save_result(db, db_experiment, stats_results, test_name="welch")
+
+async def read_sketches(db: AsyncSession, experiment_id: int) -> Dict[str, QuantileSketch]:
+    result = await db.scalars(select(models.ArmAccumulator).where(models.ArmAccumulator.experiment_id == experiment_id))
+    return {row.arm: QuantileSketch.from_dict(row.sketch) for row in result if row.count > 0 and row.sketch is not None}
+
+@router.get("/{experiment_id}/observations/quantiles", response_model=List[schemas.ArmQuantiles])
+async def read_observation_quantiles(
+    experiment_id: int,
+    q: List[float] = Query([0.5, 0.9, 0.95, 0.99]),
+    alpha: float = 0.05,
+    db: AsyncSession = Depends(get_db)
+):
+    """Per-arm quantiles with order-statistic intervals, from the persisted sketches."""
+    await get_experiment_or_404(db, experiment_id)
+    if any(not 0 <= p <= 1 for p in q):
+        raise HTTPException(status_code=400, detail="Quantiles must be in [0, 1]")
+    sketches = await read_sketches(db, experiment_id)
+    return [{"arm": arm, **quantile_summary(sketches[arm], q, alpha)} for arm in ARMS if arm in sketches]
+
+@router.post("/{experiment_id}/observations/analyze/quantile", response_model=schemas.Result)
+async def analyze_observations_quantile(experiment_id: int, q: float = 0.5, alpha: float = 0.05,
+                                        db: AsyncSession = Depends(get_db)):
+    """Quantile difference (treatment - control) from the persisted sketches."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    sketches = await read_sketches(db, experiment_id)
+    if any(arm not in sketches for arm in ARMS):
+        raise HTTPException(status_code=400, detail="Both arms need sketched observations before a quantile analysis")
+    stats_results = await offload(db, quantile_test_from_sketches, sketches["control"], sketches["treatment"], q, alpha)
+    return await save_result(db, db_experiment, stats_results, complete=False, test_name="quantile_difference",
+                             ci_method="order_statistic")
+
+@router.post("/{experiment_id}/run/quantile", response_model=schemas.Result)
+async def run_experiment_quantile(experiment_id: int, run: schemas.QuantileRun, db: AsyncSession = Depends(get_db)):
+    """Compare the arms at one quantile, e.g. median or p99 latency."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    stats_results = await offload(db, quantile_test, run.control_data, run.treatment_data, run.quantile, run.alpha,
+                                  settings.SKETCH_RELATIVE_ACCURACY)
+    return await save_result(db, db_experiment, stats_results, test_name="quantile_difference",
+                             ci_method="order_statistic")
+
+def cuped_from_arrays(run: schemas.CupedRun) -> Dict:
+    return cuped_from_stats(bivariate_statistics(run.control_data, run.control_covariate),
+                            bivariate_statistics(run.treatment_data, run.treatment_covariate), run.alpha)
+
+@router.post("/{experiment_id}/run/cuped", response_model=schemas.Result)
+async def run_experiment_cuped(experiment_id: int, run: schemas.CupedRun, db: AsyncSession = Depends(get_db)):
+    """Welch's t-test on CUPED-adjusted metrics, using a pre-period covariate per unit."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    stats_results = await offload(db, cuped_from_arrays, run)
+    return await save_result(db, db_experiment, stats_results, test_name="cuped")
+
+@router.post("/{experiment_id}/observations/analyze/cuped", response_model=schemas.Result)
+async def analyze_observations_cuped(experiment_id: int, db: AsyncSession = Depends(get_db)):
+    """CUPED analysis from the accumulated metric and covariate statistics."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    result = await db.scalars(select(models.ArmAccumulator).where(models.ArmAccumulator.experiment_id == experiment_id))
+    rows = {row.arm: row for row in result}
+    if any(arm not in rows or rows[arm].count == 0 or rows[arm].covariate_mean is None for arm in ARMS):
+        raise HTTPException(status_code=400, detail="Both arms need observations with covariates before a CUPED analysis")
+    try:
+        stats_results = cuped_from_stats(covariate_stats(rows["control"]), covariate_stats(rows["treatment"]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await save_result(db, db_experiment, stats_results, complete=False, test_name="cuped")
+
+def ratio_arm_stats(numerator, denominator, sums: Optional[schemas.RatioSums], arm: str) -> BivariateStats:
+    if sums is not None:
+        if numerator is not None or denominator is not None:
+            raise ValueError(f"Send either per-unit arrays or sums for the {arm} arm, not both")
+        return BivariateStats.from_sums(sums.n, sums.sum_numerator, sums.sum_denominator,
+                                        sums.sum_numerator_sq, sums.sum_denominator_sq, sums.sum_cross)
+    if numerator is None or denominator is None:
+        raise ValueError(f"The {arm} arm needs numerator and denominator arrays or sums")
+    return bivariate_statistics(numerator, denominator)
+
+def ratio_from_run(run: schemas.RatioRun) -> Dict:
+    control = ratio_arm_stats(run.control_numerator, run.control_denominator, run.control_sums, "control")
+    treatment = ratio_arm_stats(run.treatment_numerator, run.treatment_denominator, run.treatment_sums, "treatment")
+    return ratio_test_from_stats(control, treatment, run.alpha)
+
+async def run_ratio(db: AsyncSession, db_experiment: models.Experiment, fn, *args) -> models.Result:
+    stats_results = await offload(db, fn, *args)
+    return await save_result(db, db_experiment, stats_results, test_name="ratio_delta")
+
+@router.post("/{experiment_id}/run/ratio", response_model=schemas.Result)
+async def run_experiment_ratio(experiment_id: int, run: schemas.RatioRun, db: AsyncSession = Depends(get_db)):
+    """Delta-method test for a ratio metric (e.g. clicks per session) from per-unit arrays or aggregated sums."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    return await run_ratio(db, db_experiment, ratio_from_run, run)
+
+@router.post("/{experiment_id}/run/ratio/upload", response_model=schemas.Result)
+async def run_experiment_ratio_upload(
+    experiment_id: int,
+    control_numerator: UploadFile = File(...),
+    control_denominator: UploadFile = File(...),
+    treatment_numerator: UploadFile = File(...),
+    treatment_denominator: UploadFile = File(...),
+    format: Optional[str] = None,
+    column: Optional[str] = None,
+    alpha: float = 0.05,
+    db: AsyncSession = Depends(get_db)
+):
+    """Binary-upload variant of the ratio endpoint, one per-unit array per file."""
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    arrays = [await read_upload(upload, format, column)
+              for upload in (control_numerator, control_denominator, treatment_numerator, treatment_denominator)]
+    return await run_ratio(db, db_experiment, ratio_test, *arrays, alpha)
+
+def sequential_statistics(control: statistics.SufficientStats, treatment: statistics.SufficientStats,
+                          look: schemas.SequentialLook, previous: List[models.Result]) -> Dict:
+    """Statistics for the next look, carrying the always-valid state of earlier looks forward."""
+    fraction = None
+    if look.max_sample_size:
+        fraction = sequential.information_fraction(control, treatment, look.max_sample_size)
+
+    if look.method == "msprt":
+        if previous and previous[0].mixture_scale is not None:
+            tau = previous[0].mixture_scale
+        else:
+            pooled_sd = np.sqrt((control.m2 + treatment.m2) / (control.n + treatment.n - 2))
+            tau = float(look.mixture_effect_size * pooled_sd)
+        current = {k: float(v) for k, v in sequential.msprt(control, treatment, tau, look.alpha).items()}
+        current["mixture_scale"] = tau
+        if previous:
+            # Always-valid p-value is the running minimum; the confidence sequence is intersected
+            last = previous[-1]
+            current["p_value"] = min(current["p_value"], last.p_value)
+            current["ci_lower"] = max(current["ci_lower"], last.ci_lower)
+            current["ci_upper"] = min(current["ci_upper"], last.ci_upper)
+        current["reject"] = current["p_value"] < look.alpha
+        current["boundary"] = None
+        current["ci_method"] = "confidence_sequence"
+    else:
+        fractions = [row.information_fraction for row in previous] + [fraction]
+        if previous and fraction <= previous[-1].information_fraction:
+            raise ValueError("No new information since the previous look")
+        current = sequential.group_sequential_look(control, treatment, fractions, look.alpha, look.spending)
+        current["ci_method"] = "repeated"
+
+    current["information_fraction"] = fraction
+    current["effect_size"] = statistics.cohens_d_from_stats(control, treatment)
+    return current
+
+@router.post("/{experiment_id}/sequential", response_model=schemas.Result)
+async def sequential_look(experiment_id: int, look: schemas.SequentialLook, db: AsyncSession = Depends(get_db)):
+    """Fold in an optional batch and take an interim look (mSPRT or group-sequential).
+
+    Each look is recorded in results; a rejection stops the experiment early
+    when stop_on_reject is set, and a group-sequential design completes at
+    information fraction 1.
+    """
+    db_experiment = await get_experiment_or_404(db, experiment_id)
+    if db_experiment.status != "running":
+        raise HTTPException(status_code=400, detail=f"Experiment is {db_experiment.status}, not running")
+    if look.method == "group_sequential" and not look.max_sample_size:
+        raise HTTPException(status_code=400, detail="Group-sequential looks need max_sample_size")
+
+    # The batch is folded in without committing: it is only persisted together with the look's Result,
+    # so a look that fails leaves the accumulators untouched and can be retried with the same batch
+    if look.control_data or look.treatment_data:
+        rows = await stage_arm_batches(db, experiment_id, look.control_data, look.treatment_data,
+                                       look.control_covariate, look.treatment_covariate)
+    else:
+        result = await db.scalars(select(models.ArmAccumulator).where(models.ArmAccumulator.experiment_id == experiment_id))
+        by_arm = {row.arm: row for row in result}
+        rows = [by_arm.get(arm) for arm in ARMS]
+    if any(row is None or row.count < 2 for row in rows):
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Both arms need at least two observations before a look")
+
+    previous = (await db.scalars(
+        select(models.Result)
+        .where(models.Result.experiment_id == experiment_id, models.Result.test_name == look.method)
+        .order_by(models.Result.look)
+    )).all()
+    try:
+        # Not offload: that would commit the staged batch before the look is known to succeed
+        current = await run_in_threadpool(sequential_statistics, accumulator_stats(rows[0]), accumulator_stats(rows[1]),
+                                          look, previous)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        stats_results = statistics.welch_ttest(control_data, treatment_data)
-        
         db_result = models.Result(
             experiment_id=experiment_id,
-            t_statistic=stats_results["t_statistic"],
-            p_value=stats_results["p_value"],
-            effect_size=stats_results["effect_size"],
-            ci_lower=stats_results["ci_lower"],
-            ci_upper=stats_results["ci_upper"],
-            conclusion=stats_results["conclusion"]
+            test_name=look.method,
+            look=len(previous) + 1,
+            information_fraction=current["information_fraction"],
+            t_statistic=current["z_statistic"],
+            p_value=current["p_value"],
+            effect_size=current["effect_size"],
+            estimate=current["estimate"],
+            ci_lower=current["ci_lower"],
+            ci_upper=current["ci_upper"],
+            ci_method=current["ci_method"],
+            boundary=current["boundary"],
+            mixture_scale=current.get("mixture_scale"),
+            conclusion="Significant" if current["reject"] else "Not Significant"
         )
-        
-        db_experiment.status = "completed"
+        if current["reject"] and look.stop_on_reject:
+            db_experiment.status = "stopped_early"
+        elif look.method == "group_sequential" and current["information_fraction"] >= 1.0:
+            db_experiment.status = "completed"
         db.add(db_result)
-        db.commit()
-        db.refresh(db_result)
+        await db.commit()
+        await db.refresh(db_result)
         return db_result
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,111 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Literal, Optional, Sequence, Tuple
+import database
+import models
+from database import get_db
+from routes.experiments import experiment_filters
+from services import tabular
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows fetched per round trip from the server-side cursor (and per Parquet row group)
+EXPORT_CHUNK_ROWS = 10_000
+# Highest id included in an export; pass it back as since_id for the next incremental run
+WATERMARK_HEADER = "X-Export-Watermark"
+
+ExportFormat = Literal["ndjson", "csv", "parquet"]
+
+def table_fields(model) -> List[Tuple[str, type]]:
+    """(name, python type) for every column of a model's table."""
+    return [(column.name, column.type.python_type) for column in model.__table__.columns]
+
+async def stream_rows(query, fields: Sequence[Tuple[str, type]], format: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Encode query rows chunk by chunk from a server-side cursor, on a connection of its own.
+
+    Only one chunk is held in memory at a time, so memory stays flat whatever
+    the table size. The request's session is closed before a streaming
+    body is sent, hence the dedicated connection; rows are plain Core rows,
+    skipping the ORM's per-row processing.
+    """
+    names = [name for name, _ in fields]
+    parquet = tabular.ParquetStream(tabular.arrow_schema(fields)) if format == "parquet" else None
+    first = True
+    async with database.engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_rows))
+        async for rows in result.partitions():
+            if parquet is not None:
+                yield parquet.write(rows)
+            elif format == "ndjson":
+                yield tabular.encode_ndjson(rows, names)
+            else:
+                yield tabular.encode_csv(rows, names if first else None)
+            first = False
+    if parquet is not None:
+        yield parquet.close()
+    elif first and format == "csv":
+        yield tabular.encode_csv([], names)
+
+async def export_response(db: AsyncSession, model, format: str, conditions: List, filename: str,
+                          since_id: Optional[int] = None) -> StreamingResponse:
+    """Stream every model row matching conditions with an id above since_id, in id order.
+
+    The export is bounded by the highest id at request time, returned in the
+    watermark header, so rows inserted while it streams are left for the
+    next incremental export instead of being half-included.
+    """
+    if format == "parquet":
+        try:
+            tabular.arrow_schema([])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    watermark = await db.scalar(select(func.max(model.id)))
+    query = select(*model.__table__.columns).where(*conditions).order_by(model.id)
+    if since_id is not None:
+        query = query.where(model.id > since_id)
+    query = query.where(model.id <= (watermark or 0))
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{format}"',
+        WATERMARK_HEADER: str(watermark if watermark is not None else since_id or 0),
+    }
+    return StreamingResponse(stream_rows(query, table_fields(model), format), media_type=tabular.MEDIA_TYPES[format],
+                             headers=headers)
+
+@router.get("/experiments")
+async def export_experiments(
+    format: ExportFormat = "ndjson",
+    since_id: Optional[int] = Query(None, description="Export experiments with a higher id (an earlier watermark)"),
+    since: Optional[datetime] = None,
+    conditions: List = Depends(experiment_filters),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream experiments as NDJSON, CSV or Parquet."""
+    if since is not None:
+        conditions = [*conditions, models.Experiment.created_at >= since]
+    return await export_response(db, models.Experiment, format, conditions, "experiments", since_id)
+
+@router.get("/results")
+async def export_results(
+    format: ExportFormat = "ndjson",
+    since_id: Optional[int] = Query(None, description="Export results with a higher id (an earlier watermark)"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    experiment_id: Optional[int] = None,
+    test_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream results as NDJSON, CSV or Parquet, optionally incremental on id or computed_at."""
+    conditions = []
+    if experiment_id is not None:
+        conditions.append(models.Result.experiment_id == experiment_id)
+    if test_name is not None:
+        conditions.append(models.Result.test_name == test_name)
+    if since is not None:
+        conditions.append(models.Result.computed_at >= since)
+    if until is not None:
+        conditions.append(models.Result.computed_at < until)
+    filename = f"results_{experiment_id}" if experiment_id is not None else "results"
+    return await export_response(db, models.Result, format, conditions, filename, since_id)
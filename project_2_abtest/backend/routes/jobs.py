@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException
+from typing import Dict, List, Optional
+import schemas
+from config import settings
+from services.jobs import JobManager, QueueFullError
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+job_manager = JobManager(settings.JOB_WORKERS, settings.JOB_MAX_PENDING, settings.JOB_HISTORY)
+
+def submit_job(kind: str, fn, args, experiment_id: Optional[int] = None, on_success=None) -> Dict:
+    """Queue fn(*args) on the shared job pool, answering 429 when the queue is full."""
+    try:
+        job = job_manager.submit(kind, fn, args, experiment_id=experiment_id, on_success=on_success)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_dict()
+
+def get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/", response_model=List[schemas.Job])
+def read_jobs(status: Optional[str] = None):
+    return [job.to_dict() for job in job_manager.list(status)]
+
+@router.get("/metrics")
+def read_job_metrics():
+    """Queue depth, per-status counts and mean queue/run times of retained jobs."""
+    return job_manager.metrics()
+
+@router.get("/{job_id}", response_model=schemas.Job)
+def read_job(job_id: str):
+    return get_job_or_404(job_id).to_dict()
+
+@router.delete("/{job_id}", response_model=schemas.Job)
+def cancel_job(job_id: str):
+    """Cancel a queued job; a job already running is marked cancelled and its result discarded."""
+    get_job_or_404(job_id)
+    return job_manager.cancel(job_id).to_dict()
@@ -0,0 +1,46 @@
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Type
+
+# Header carrying the keyset cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def projected_columns(model, schema: Type[BaseModel], fields: Optional[List[str]]) -> Optional[List]:
+    """Columns for a fields=... projection (the id is always included), or None for whole rows."""
+    if not fields:
+        return None
+    unknown = set(fields) - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [getattr(model, name) for name in dict.fromkeys(["id", *fields])]
+
+async def fetch_page(db: AsyncSession, model, schema: Type[BaseModel], conditions: List, response: Response,
+                     cursor: Optional[int] = None, limit: int = 100, fields: Optional[List[str]] = None,
+                     offset: int = 0):
+    """One page of model rows, newest first, using keyset pagination on the primary key.
+
+    cursor is the last id of the previous page, so every page is an index
+    range scan whatever its depth. A projection returns plain column dicts
+    directly, skipping the response model.
+    """
+    columns = projected_columns(model, schema, fields)
+    query = select(*columns) if columns else select(model)
+    query = query.where(*conditions)
+    if cursor is not None:
+        query = query.where(model.id < cursor)
+    query = query.order_by(model.id.desc()).offset(offset).limit(limit)
+    if columns:
+        rows = [dict(row._mapping) for row in await db.execute(query)]
+        ids = [row["id"] for row in rows]
+    else:
+        rows = (await db.scalars(query)).all()
+        ids = [row.id for row in rows]
+    headers = {NEXT_CURSOR_HEADER: str(ids[-1])} if len(ids) == limit else {}
+    if columns:
+        return JSONResponse(jsonable_encoder(rows), headers=headers)
+    response.headers.update(headers)
+    return rows
@@ -1,20 +1,147 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from typing import List, Dict
+import numpy as np
+import schemas
+from config import settings
+from routes.jobs import submit_job
 from services.power import PowerAnalyzer
+from services.simulation import BaselineSampler, SimulationPowerAnalyzer
+from services.sequential import SPENDING_FUNCTIONS, alpha_spent, group_sequential_bounds
 
 router = APIRouter(prefix="/power", tags=["power"])
 
+MAX_BATCH_SCENARIOS = 1_000_000
+
+def scenario_columns(*columns) -> List[np.ndarray]:
+    """Broadcast scenario columns (lists or shared scalars) to a common 1-D length."""
+    try:
+        arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(c, dtype=np.float64)) for c in columns))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Scenario columns must have equal lengths")
+    if arrays[0].ndim != 1 or arrays[0].size > MAX_BATCH_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"Expected at most {MAX_BATCH_SCENARIOS:,} scenarios")
+    return arrays
+
+def check_probabilities(**columns: List[float]):
+    """Reject alpha/power values outside (0, 1), whose normal quantiles are NaN."""
+    for name, values in columns.items():
+        if any(not 0 < v < 1 for v in values):
+            raise HTTPException(status_code=400, detail=f"{name} values must be between 0 and 1 (exclusive)")
+
+def column_response(**columns: np.ndarray) -> JSONResponse:
+    # Plain lists serialize directly; skips the per-element jsonable_encoder walk
+    return JSONResponse({name: values.tolist() for name, values in columns.items()})
+
 @router.get("/sample-size")
-def calculate_sample_size(effect_size: float, alpha: float = 0.05, power: float = 0.8):
+def calculate_sample_size(effect_size: float, alpha: float = Query(0.05, gt=0, lt=1), power: float = Query(0.8, gt=0, lt=1)):
     n = PowerAnalyzer.sample_size(effect_size, alpha, power)
     return {"required_sample_size": n}
 
 @router.get("/power")
-def calculate_power(n: int, effect_size: float, alpha: float = 0.05):
+def calculate_power(n: int, effect_size: float, alpha: float = Query(0.05, gt=0, lt=1)):
     p = PowerAnalyzer.power(n, effect_size, alpha)
     return {"power": p}
 
 @router.get("/mde")
-def calculate_mde(n: int, power: float = 0.8, alpha: float = 0.05):
+def calculate_mde(n: int, power: float = Query(0.8, gt=0, lt=1), alpha: float = Query(0.05, gt=0, lt=1)):
     mde = PowerAnalyzer.minimum_detectable_effect(n, power, alpha)
     return {"mde": mde}
+
+@router.post("/sample-size/batch")
+def calculate_sample_size_batch(batch: schemas.SampleSizeBatch):
+    effect_size, alpha, power = scenario_columns(batch.effect_size, batch.alpha, batch.power)
+    return column_response(required_sample_size=PowerAnalyzer.sample_size_array(effect_size, alpha, power))
+
+@router.post("/power/batch")
+def calculate_power_batch(batch: schemas.PowerBatch):
+    n, effect_size, alpha = scenario_columns(batch.n, batch.effect_size, batch.alpha)
+    return column_response(power=PowerAnalyzer.power_array(n, effect_size, alpha))
+
+@router.post("/mde/batch")
+def calculate_mde_batch(batch: schemas.MDEBatch):
+    n, power, alpha = scenario_columns(batch.n, batch.power, batch.alpha)
+    return column_response(mde=PowerAnalyzer.mde_array(n, power, alpha))
+
+@router.get("/curve")
+def calculate_power_curve(sample_sizes: List[int] = Query(...), effect_size: float = 0.5,
+                          alpha: float = Query(0.05, gt=0, lt=1)):
+    return {"sample_sizes": sample_sizes, "power": PowerAnalyzer.power_curve(sample_sizes, effect_size, alpha)}
+
+@router.get("/sequential-boundaries")
+def calculate_sequential_boundaries(fractions: List[float] = Query(...), alpha: float = Query(0.05, gt=0, lt=1), spending: str = "obrien_fleming"):
+    """Lan-DeMets group-sequential z boundaries for planned looks at the given information fractions."""
+    if spending not in SPENDING_FUNCTIONS:
+        raise HTTPException(status_code=400, detail=f"spending must be one of {', '.join(SPENDING_FUNCTIONS)}")
+    try:
+        bounds = group_sequential_bounds(tuple(fractions), alpha, spending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"fractions": fractions, "boundaries": list(bounds), "alpha_spent": alpha_spent(fractions, alpha, spending).tolist()}
+
+@router.get("/grid")
+def calculate_grid(
+    sample_sizes: List[int] = Query(...),
+    effect_sizes: List[float] = Query(...),
+    alphas: List[float] = Query([0.05]),
+    powers: List[float] = Query([0.8])
+):
+    """Power, required sample size and MDE over a full planning grid in one call.
+
+    power is indexed [n][effect_size][alpha], required_sample_size
+    [effect_size][alpha][power] and mde [n][alpha][power].
+    """
+    check_probabilities(alphas=alphas, powers=powers)
+    if len(sample_sizes) * len(effect_sizes) * len(alphas) > 1_000_000:
+        raise HTTPException(status_code=400, detail="Grid too large (max 1,000,000 power cells)")
+    grid = PowerAnalyzer.grid(sample_sizes, effect_sizes, alphas, powers)
+    return {
+        "sample_sizes": sample_sizes,
+        "effect_sizes": effect_sizes,
+        "alphas": alphas,
+        "powers": powers,
+        "power": grid["power"].tolist(),
+        "required_sample_size": grid["sample_size"].tolist(),
+        "mde": grid["mde"].tolist()
+    }
+
+def simulation_sampler(request: schemas.SimulationRequest) -> BaselineSampler:
+    if request.n_simulations > settings.MAX_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"n_simulations is limited to {settings.MAX_SIMULATIONS:,}")
+    try:
+        if request.fit_distribution:
+            if request.baseline is None or request.distribution is None:
+                raise ValueError("Fitting needs both baseline data and a distribution name")
+            return BaselineSampler.fit(request.baseline, request.distribution, zero_inflated=request.zero_inflation > 0)
+        return BaselineSampler(request.baseline, request.distribution, request.params, request.zero_inflation)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def simulation_output(request: schemas.SimulationRequest, curve: List[Dict]) -> Dict:
+    return {"test": request.test, "alpha": request.alpha, "lift": request.lift, "lift_type": request.lift_type, "results": curve}
+
+@router.post("/simulate")
+def simulate_power(request: schemas.SimulationRequest):
+    """Simulation-based power for non-normal metrics (heavy tails, zero inflation)."""
+    sampler = simulation_sampler(request)
+    try:
+        curve = SimulationPowerAnalyzer.power_curve(
+            sampler, request.sample_sizes, request.lift, request.lift_type, request.test,
+            request.alpha, request.n_simulations, request.seed, n_jobs=settings.SIMULATION_WORKERS
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return simulation_output(request, curve)
+
+@router.post("/simulate/jobs", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+async def submit_simulation_job(request: schemas.SimulationRequest):
+    """Queue a power simulation on the job pool; the curve is the job result, nothing is stored."""
+    sampler = simulation_sampler(request)
+
+    async def output(curve: List[Dict]) -> Dict:
+        return simulation_output(request, curve)
+
+    # One process per job: the job pool already runs simulations side by side
+    return submit_job("simulation", SimulationPowerAnalyzer.power_curve,
+                      (sampler, request.sample_sizes, request.lift, request.lift_type, request.test,
+                       request.alpha, request.n_simulations, request.seed, 1), on_success=output)
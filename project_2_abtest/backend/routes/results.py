@@ -1,13 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
 import models
 import schemas
 from database import get_db
+from routes.pagination import fetch_page
 
 router = APIRouter(prefix="/results", tags=["results"])
 
+def latest_results():
+    """Subquery of (experiment_id, result_id, result_count) with the id of each experiment's latest result.
+
+    One grouped scan of the (experiment_id, id) index replaces a query per experiment.
+    """
+    return (
+        select(models.Result.experiment_id, func.max(models.Result.id).label("result_id"),
+               func.count(models.Result.id).label("result_count"))
+        .group_by(models.Result.experiment_id)
+        .subquery()
+    )
+
 @router.get("/{experiment_id}", response_model=List[schemas.Result])
-def read_results(experiment_id: int, db: Session = Depends(get_db)):
-    results = db.query(models.Result).filter(models.Result.experiment_id == experiment_id).order_by(models.Result.computed_at.desc()).all()
-    return results
+async def read_results(
+    experiment_id: int,
+    response: Response,
+    cursor: Optional[int] = None,
+    limit: int = Query(1000, ge=1, le=10_000),
+    test_name: Optional[str] = None,
+    metric_name: Optional[str] = None,
+    significant: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Results newest first, keyset-paginated via the X-Next-Cursor header, with optional filters and projection."""
+    conditions = [models.Result.experiment_id == experiment_id]
+    if test_name is not None:
+        conditions.append(models.Result.test_name == test_name)
+    if metric_name is not None:
+        conditions.append(models.Result.metric_name == metric_name)
+    if significant is not None:
+        conditions.append((models.Result.conclusion == "Significant") if significant
+                          else (models.Result.conclusion != "Significant"))
+    if since is not None:
+        conditions.append(models.Result.computed_at >= since)
+    if until is not None:
+        conditions.append(models.Result.computed_at < until)
+    return await fetch_page(db, models.Result, schemas.Result, conditions, response, cursor, limit, fields)
@@ -1,2 +1,7 @@
-from .experiment import Experiment, ExperimentCreate
-from .result import Result, ResultCreate
+from .experiment import Experiment, ExperimentCreate, ExperimentSummary
+from .result import Result, ResultCreate, MetricBatchRun, CupedRun, ProportionRun, QuantileRun, MultiArmOptions, MultiArmRun, SegmentRun, HistogramRun, RatioSums, RatioRun, BootstrapOptions, BootstrapRun
+from .accumulator import ArmAccumulator, ObservationBatch, SequentialLook, VariantObservations, QuantileEstimate, ArmQuantiles
+from .power import SampleSizeBatch, PowerBatch, MDEBatch, SimulationRequest
+from .job import Job
+from .variant import Variant, VariantCreate
+from .bulk import ExperimentUpdate, BulkExperimentStatus, ExperimentRun, BulkRun, BulkRunStatus
@@ -0,0 +1,60 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+
+class ObservationBatch(BaseModel):
+    """New observations per arm, with optional pre-period covariates aligned to them."""
+    control_data: List[float] = []
+    treatment_data: List[float] = []
+    control_covariate: Optional[List[float]] = None
+    treatment_covariate: Optional[List[float]] = None
+
+class VariantObservations(BaseModel):
+    """New observations keyed by variant name."""
+    data: Dict[str, List[float]]
+
+class SequentialLook(ObservationBatch):
+    """One interim look, optionally folding in a new batch first.
+
+    mixture_effect_size sets the mSPRT mixing scale in pooled standard
+    deviations at the first look; later looks reuse that scale, since a
+    mixture that moves with the data would void the always-valid
+    guarantee. max_sample_size (per arm) is the planned horizon that
+    group-sequential information fractions are measured against.
+    """
+    method: Literal["msprt", "group_sequential"] = "msprt"
+    alpha: float = 0.05
+    mixture_effect_size: float = 0.1
+    spending: Literal["obrien_fleming", "pocock"] = "obrien_fleming"
+    max_sample_size: Optional[int] = None
+    stop_on_reject: bool = True
+
+class ArmAccumulator(BaseModel):
+    experiment_id: int
+    arm: str
+    count: int
+    mean: float
+    m2: float
+    m3: Optional[float] = None
+    m4: Optional[float] = None
+    covariate_mean: Optional[float] = None
+    covariate_m2: Optional[float] = None
+    comoment: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class QuantileEstimate(BaseModel):
+    quantile: float
+    value: float
+    ci_lower: float
+    ci_upper: float
+
+class ArmQuantiles(BaseModel):
+    """Per-arm quantiles read from the persisted sketch."""
+    arm: str
+    count: int
+    min: float
+    max: float
+    quantiles: List[QuantileEstimate]
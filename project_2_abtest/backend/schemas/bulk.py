@@ -0,0 +1,49 @@
+from pydantic import BaseModel, field_validator
+from typing import List, Optional
+from .experiment import Experiment
+from .result import Result
+
+class ExperimentUpdate(BaseModel):
+    """Fields to change on an existing experiment; fields left out are kept."""
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    control_group_name: Optional[str] = None
+    treatment_group_name: Optional[str] = None
+    metric_name: Optional[str] = None
+    metric_type: Optional[str] = None
+    status: Optional[str] = None
+    created_by: Optional[str] = None
+
+    @field_validator("name", "control_group_name", "treatment_group_name", "metric_name", "metric_type", "status")
+    @classmethod
+    def not_null(cls, value: Optional[str]) -> str:
+        # Optional only so the field can be left out; null is refused because the name column is NOT NULL
+        # and the Experiment response schema requires every one of these fields
+        if value is None:
+            raise ValueError("may be left out but not set to null")
+        return value
+
+class BulkExperimentStatus(BaseModel):
+    index: int
+    status: str  # 'created', 'updated' or 'failed'
+    experiment: Optional[Experiment] = None
+    error: Optional[str] = None
+
+class ExperimentRun(BaseModel):
+    experiment_id: int
+    control_data: List[float]
+    treatment_data: List[float]
+    test: str = "welch"
+    presorted: bool = False
+
+class BulkRun(BaseModel):
+    runs: List[ExperimentRun]
+    relative_accuracy: float = 0.01
+
+class BulkRunStatus(BaseModel):
+    index: int
+    experiment_id: int
+    status: str  # 'completed' or 'failed'
+    result: Optional[Result] = None
+    error: Optional[str] = None
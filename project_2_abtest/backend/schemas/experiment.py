@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from .result import Result
+from .variant import VariantCreate
 
 class ExperimentBase(BaseModel):
     name: str
@@ -12,7 +14,8 @@ class ExperimentBase(BaseModel):
     created_by: Optional[str] = None
 
 class ExperimentCreate(ExperimentBase):
-    pass
+    # N-arm experiments list every arm; the first is the control unless one is flagged
+    variants: Optional[List[VariantCreate]] = None
 
 class Experiment(ExperimentBase):
     id: int
@@ -21,3 +24,8 @@ class Experiment(ExperimentBase):
 
     class Config:
         from_attributes = True
+
+class ExperimentSummary(Experiment):
+    """An experiment with its number of results and the most recent one."""
+    result_count: int = 0
+    latest_result: Optional[Result] = None
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Literal, Optional, Union
+from .result import Result
+
+class Job(BaseModel):
+    """A background analysis; poll until status is completed, failed or cancelled.
+
+    result is the stored Result for experiment analyses and the plain output
+    for jobs that persist nothing, such as power simulations.
+    """
+    id: str
+    kind: str
+    experiment_id: Optional[int] = None
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_seconds: Optional[float] = None
+    run_seconds: Optional[float] = None
+    result: Optional[Union[Result, Dict[str, Any]]] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
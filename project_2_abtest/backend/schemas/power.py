@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, Dict, List, Literal, Optional, Union
+
+# alpha and power outside (0, 1) have no normal quantile (NaN), so they are rejected up front
+Probability = Annotated[float, Field(gt=0, lt=1)]
+FiniteFloat = Annotated[float, Field(allow_inf_nan=False)]
+
+# Each scenario field is either a column (one value per scenario) or a scalar shared by all
+FloatColumn = Union[List[FiniteFloat], FiniteFloat]
+ProbabilityColumn = Union[List[Probability], Probability]
+IntColumn = Union[List[int], int]
+
+# Simulated arrays are (chunk, n) per arm, so n bounds worker memory even at one simulation per chunk
+MAX_SIMULATION_SAMPLE_SIZE = 1_000_000
+MAX_SIMULATION_SAMPLE_SIZES = 100
+SimulationSampleSize = Annotated[int, Field(ge=2, le=MAX_SIMULATION_SAMPLE_SIZE)]
+
+class SampleSizeBatch(BaseModel):
+    effect_size: FloatColumn
+    alpha: ProbabilityColumn = 0.05
+    power: ProbabilityColumn = 0.8
+
+class PowerBatch(BaseModel):
+    n: IntColumn
+    effect_size: FloatColumn
+    alpha: ProbabilityColumn = 0.05
+
+class MDEBatch(BaseModel):
+    n: IntColumn
+    power: ProbabilityColumn = 0.8
+    alpha: ProbabilityColumn = 0.05
+
+class SimulationRequest(BaseModel):
+    """Monte Carlo power scenario.
+
+    Supply either historical baseline observations (resampled with
+    replacement) or a scipy.stats distribution name with its parameters.
+    With fit_distribution set, the named distribution is fitted to the
+    baseline instead of resampling it.
+    """
+    sample_sizes: List[SimulationSampleSize] = Field(min_length=1, max_length=MAX_SIMULATION_SAMPLE_SIZES)
+    lift: float
+    lift_type: Literal["relative", "absolute"] = "relative"
+    test: Literal["welch", "mannwhitney"] = "welch"
+    alpha: Probability = 0.05
+    n_simulations: int = 2000
+    seed: Optional[int] = None
+    baseline: Optional[List[float]] = None
+    distribution: Optional[str] = None
+    params: Dict[str, float] = {}
+    fit_distribution: bool = False
+    zero_inflation: float = 0.0
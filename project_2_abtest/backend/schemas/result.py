@@ -1,14 +1,27 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 class ResultBase(BaseModel):
     experiment_id: int
+    metric_name: Optional[str] = None
+    baseline: Optional[str] = None
+    variant: Optional[str] = None
+    segment_dimension: Optional[str] = None
+    segment: Optional[str] = None
+    test_name: Optional[str] = None
+    look: Optional[int] = None
+    information_fraction: Optional[float] = None
     t_statistic: Optional[float] = None
     p_value: Optional[float] = None
+    adjusted_p_value: Optional[float] = None
     effect_size: Optional[float] = None
+    estimate: Optional[float] = None
     ci_lower: Optional[float] = None
     ci_upper: Optional[float] = None
+    ci_method: Optional[str] = None
+    boundary: Optional[float] = None
+    mixture_scale: Optional[float] = None
     conclusion: Optional[str] = None
 
 class ResultCreate(ResultBase):
@@ -20,3 +33,100 @@ class Result(ResultBase):
 
     class Config:
         from_attributes = True
+
+class MetricBatchRun(BaseModel):
+    """Several metrics observed on the same arms, as metrics x observations matrices.
+
+    Missing observations may be sent as null and are ignored per metric.
+    """
+    metric_names: List[str]
+    control_data: List[List[Optional[float]]]
+    treatment_data: List[List[Optional[float]]]
+    correction: Literal["bonferroni", "holm", "hochberg", "fdr", "by", "storey", "none"] = "fdr"
+    alpha: float = 0.05
+
+class CupedRun(BaseModel):
+    """Metric values and their pre-period covariate, aligned per unit in each arm."""
+    control_data: List[float]
+    control_covariate: List[float]
+    treatment_data: List[float]
+    treatment_covariate: List[float]
+    alpha: float = 0.05
+
+class ProportionRun(BaseModel):
+    """A binary metric as conversion counts per arm."""
+    control_successes: int
+    control_trials: int
+    treatment_successes: int
+    treatment_trials: int
+    test: Literal["ztest", "chisquare", "fisher"] = "ztest"
+    alpha: float = 0.05
+
+class QuantileRun(BaseModel):
+    """Raw arms compared at one quantile (0.5 for the median, 0.99 for p99)."""
+    control_data: List[float]
+    treatment_data: List[float]
+    quantile: float = 0.5
+    alpha: float = 0.05
+
+class MultiArmOptions(BaseModel):
+    """N-arm analysis settings: an omnibus test plus pairwise comparisons against the control or between all pairs."""
+    omnibus: Literal["welch", "anova"] = "welch"
+    comparisons: Literal["control", "all"] = "control"
+    correction: Literal["bonferroni", "holm", "hochberg", "fdr", "by", "storey", "none"] = "holm"
+    alpha: float = 0.05
+
+class MultiArmRun(MultiArmOptions):
+    """Observations keyed by variant name."""
+    data: Dict[str, List[float]]
+
+class SegmentRun(BaseModel):
+    """Observations per arm with one key per observation for each segment dimension (country, platform, ...)."""
+    control_data: List[float]
+    treatment_data: List[float]
+    control_segments: Dict[str, List[str]]
+    treatment_segments: Dict[str, List[str]]
+    correction: Literal["bonferroni", "holm", "hochberg", "fdr", "by", "storey", "none"] = "fdr"
+    alpha: float = 0.05
+    min_count: int = 2
+
+class HistogramRun(BaseModel):
+    """Per-arm counts over the same ordered bins (e.g. latency buckets)."""
+    control_counts: List[float]
+    treatment_counts: List[float]
+    alpha: float = 0.05
+
+class RatioSums(BaseModel):
+    """Per-arm aggregates over units: count, sums, sums of squares and the cross-product."""
+    n: int
+    sum_numerator: float
+    sum_denominator: float
+    sum_numerator_sq: float
+    sum_denominator_sq: float
+    sum_cross: float
+
+class RatioRun(BaseModel):
+    """A ratio metric per arm, as per-unit (numerator, denominator) arrays or as RatioSums."""
+    control_numerator: Optional[List[float]] = None
+    control_denominator: Optional[List[float]] = None
+    treatment_numerator: Optional[List[float]] = None
+    treatment_denominator: Optional[List[float]] = None
+    control_sums: Optional[RatioSums] = None
+    treatment_sums: Optional[RatioSums] = None
+    alpha: float = 0.05
+
+class BootstrapOptions(BaseModel):
+    """Bootstrap settings; effect compares the treatment statistic to control by difference or ratio."""
+    statistic: Literal["mean", "median", "trimmed_mean"] = "median"
+    effect: Literal["difference", "ratio"] = "difference"
+    method: Literal["percentile", "bca"] = "bca"
+    resampling: Literal["poisson", "multinomial"] = "poisson"
+    n_resamples: int = 10_000
+    alpha: float = 0.05
+    trim: float = 0.1
+    seed: Optional[int] = None
+    decimals: Optional[int] = None
+
+class BootstrapRun(BootstrapOptions):
+    control_data: List[float]
+    treatment_data: List[float]
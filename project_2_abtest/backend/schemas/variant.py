@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class VariantCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    is_control: bool = False
+
+class Variant(VariantCreate):
+    id: int
+    experiment_id: int
+    position: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import numpy as np
+from services.statistics import ArrayLike, as_float64
+
+def fingerprint(*arrays: ArrayLike, **params) -> str:
+    """Content hash of float64 input buffers plus analysis parameters.
+
+    blake2b runs over the raw buffers without copying them; each array is
+    prefixed with its length so ([1, 2], [3]) and ([1], [2, 3]) differ.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for data in arrays:
+        arr = as_float64(data)
+        h.update(np.int64(arr.size).tobytes())
+        h.update(memoryview(arr).cast("B"))
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()
+
+class AnalysisCache:
+    """Thread-safe LRU cache with a per-entry time to live.
+
+    Holds at most max_entries values; the least recently used one is
+    evicted first and expired entries are dropped when looked up.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
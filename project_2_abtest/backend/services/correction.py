@@ -1,52 +1,137 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple, Union
 import numpy as np
 
+PValues = Union[List[float], np.ndarray]
+
 class MultipleTestingCorrection:
+    """Multiple testing corrections over arrays of p-values.
+
+    Every procedure is array-native (argsort plus cumulative min/max), so it
+    scales to millions of p-values. Plain lists in give lists out; ndarrays
+    in give ndarrays out. NaN p-values (e.g. from a zero-variance test) are
+    left out of the family: they stay NaN and do not count towards n.
+    """
+
+    METHODS = ("bonferroni", "holm", "hochberg", "fdr", "by", "storey")
+
     @staticmethod
-    def bonferroni(p_values: List[float], alpha: float = 0.05) -> Dict:
-        """Bonferroni correction.
-        Adjusts p-values by multiplying by the number of tests.
-        """
-        n = len(p_values)
-        if n == 0:
-            return {"p_values": [], "adjusted_p_values": [], "significant": [], "alpha": alpha}
-            
-        adjusted_p = [min(p * n, 1.0) for p in p_values]
-        significant = [p < alpha for p in adjusted_p]
+    def _result(p_values: PValues, adjusted: np.ndarray, alpha: float, **extra) -> Dict:
+        significant = adjusted < alpha
+        if not isinstance(p_values, np.ndarray):
+            adjusted = adjusted.tolist()
+            significant = significant.tolist()
         return {
             "p_values": p_values,
-            "adjusted_p_values": adjusted_p,
+            "adjusted_p_values": adjusted,
             "significant": significant,
-            "alpha": alpha
+            "alpha": alpha,
+            **extra
         }
-        
+
+    @staticmethod
+    def _finite(p_values: PValues) -> Tuple[np.ndarray, np.ndarray]:
+        """The p-values as float64 and the mask of finite ones."""
+        p = np.asarray(p_values, dtype=np.float64)
+        return p, np.isfinite(p)
+
+    @staticmethod
+    def _restore(p: np.ndarray, finite: np.ndarray, adjusted: np.ndarray) -> np.ndarray:
+        """Adjusted finite p-values written back in input order, NaN elsewhere."""
+        if finite.all():
+            return adjusted
+        out = np.full(p.shape, np.nan)
+        out[finite] = adjusted
+        return out
+
+    @staticmethod
+    def _step_up(p: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        """Adjusted p-values min_{j >= i} scale_j * p_(j), mapped back to input order."""
+        order = np.argsort(p)
+        adj_sorted = np.minimum.accumulate((scale * p[order])[::-1])[::-1]
+        adjusted = np.empty_like(p)
+        adjusted[order] = np.minimum(adj_sorted, 1.0)
+        return adjusted
+
+    @staticmethod
+    def bonferroni(p_values: PValues, alpha: float = 0.05) -> Dict:
+        """Bonferroni correction.
+        Adjusts p-values by multiplying by the number of tests.
+        """
+        p, finite = MultipleTestingCorrection._finite(p_values)
+        q = p[finite]
+        adjusted = MultipleTestingCorrection._restore(p, finite, np.minimum(q * q.size, 1.0))
+        return MultipleTestingCorrection._result(p_values, adjusted, alpha)
+
     @staticmethod
-    def fdr(p_values: List[float], alpha: float = 0.05) -> Dict:
+    def holm(p_values: PValues, alpha: float = 0.05) -> Dict:
+        """Holm step-down correction.
+        Uniformly more powerful than Bonferroni, same family-wise error control.
+        """
+        p, finite = MultipleTestingCorrection._finite(p_values)
+        q = p[finite]
+        n = q.size
+        order = np.argsort(q)
+        # p_adj(i) = max_{j <= i} (n - j + 1) * p_(j)
+        adj_sorted = np.maximum.accumulate((n - np.arange(n)) * q[order])
+        adjusted = np.empty_like(q)
+        adjusted[order] = np.minimum(adj_sorted, 1.0)
+        adjusted = MultipleTestingCorrection._restore(p, finite, adjusted)
+        return MultipleTestingCorrection._result(p_values, adjusted, alpha)
+
+    @staticmethod
+    def hochberg(p_values: PValues, alpha: float = 0.05) -> Dict:
+        """Hochberg step-up correction.
+        Controls family-wise error for independent or positively dependent tests.
+        """
+        p, finite = MultipleTestingCorrection._finite(p_values)
+        q = p[finite]
+        n = q.size
+        adjusted = MultipleTestingCorrection._restore(
+            p, finite, MultipleTestingCorrection._step_up(q, n - np.arange(n, dtype=np.float64)))
+        return MultipleTestingCorrection._result(p_values, adjusted, alpha)
+
+    @staticmethod
+    def fdr(p_values: PValues, alpha: float = 0.05) -> Dict:
         """False Discovery Rate (Benjamini-Hochberg).
         Controls the expected proportion of false discoveries.
         """
-        n = len(p_values)
-        if n == 0:
-            return {"p_values": [], "adjusted_p_values": [], "significant": [], "alpha": alpha}
-            
-        indexed_p = list(enumerate(p_values))
-        indexed_p.sort(key=lambda x: x[1])
-        
-        adjusted_p = [0.0] * n
-        prev_p = 1.0
+        p, finite = MultipleTestingCorrection._finite(p_values)
+        q = p[finite]
+        n = q.size
         # BH procedure: p_adj = min(p_i * n / i, p_{i+1})
-        for i in range(n - 1, -1, -1):
-            idx, p = indexed_p[i]
-            rank = i + 1
-            adj = (p * n) / rank
-            adj = min(adj, prev_p)
-            adjusted_p[idx] = min(adj, 1.0)
-            prev_p = adj
-            
-        significant = [p < alpha for p in adjusted_p]
-        return {
-            "p_values": p_values,
-            "adjusted_p_values": adjusted_p,
-            "significant": significant,
-            "alpha": alpha
-        }
+        adjusted = MultipleTestingCorrection._restore(
+            p, finite, MultipleTestingCorrection._step_up(q, n / np.arange(1, n + 1, dtype=np.float64)))
+        return MultipleTestingCorrection._result(p_values, adjusted, alpha)
+
+    @staticmethod
+    def by(p_values: PValues, alpha: float = 0.05) -> Dict:
+        """Benjamini-Yekutieli FDR correction.
+        Valid under arbitrary dependence at the cost of a harmonic-sum penalty.
+        """
+        p, finite = MultipleTestingCorrection._finite(p_values)
+        q = p[finite]
+        n = q.size
+        ranks = np.arange(1, n + 1, dtype=np.float64)
+        c_n = np.sum(1.0 / ranks)
+        adjusted = MultipleTestingCorrection._restore(p, finite, MultipleTestingCorrection._step_up(q, n * c_n / ranks))
+        return MultipleTestingCorrection._result(p_values, adjusted, alpha)
+
+    @staticmethod
+    def storey(p_values: PValues, alpha: float = 0.05, lambda_: float = 0.5) -> Dict:
+        """Storey q-values.
+        BH adjusted p-values scaled by an estimate of the true-null proportion pi0.
+        """
+        p, finite = MultipleTestingCorrection._finite(p_values)
+        q = p[finite]
+        n = q.size
+        pi0 = min(1.0, np.count_nonzero(q > lambda_) / (n * (1 - lambda_))) if n else 1.0
+        adjusted = MultipleTestingCorrection._restore(
+            p, finite, MultipleTestingCorrection._step_up(q, pi0 * n / np.arange(1, n + 1, dtype=np.float64)))
+        return MultipleTestingCorrection._result(p_values, adjusted, alpha, pi0=pi0)
+
+    @staticmethod
+    def adjust(p_values: PValues, method: str = "fdr", alpha: float = 0.05) -> Dict:
+        """Apply the named correction (one of METHODS)."""
+        if method not in MultipleTestingCorrection.METHODS:
+            raise ValueError(f"Unknown correction '{method}'. Expected one of {', '.join(MultipleTestingCorrection.METHODS)}")
+        return getattr(MultipleTestingCorrection, method)(p_values, alpha)
@@ -0,0 +1,131 @@
+import io
+import numpy as np
+from typing import Optional
+
+FORMATS = ("f8", "npy", "arrow", "parquet")
+
+CONTENT_TYPES = {
+    "application/octet-stream": "f8",
+    "application/x-npy": "npy",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+}
+
+EXTENSIONS = {
+    ".f8": "f8",
+    ".bin": "f8",
+    ".npy": "npy",
+    ".arrow": "arrow",
+    ".arrows": "arrow",
+    ".feather": "arrow",
+    ".parquet": "parquet",
+}
+
+def detect_format(payload: bytes, content_type: Optional[str] = None, filename: Optional[str] = None) -> str:
+    """Guess the upload format from magic bytes, filename extension or content type.
+
+    Self-describing formats are recognised from their magic bytes first; raw
+    little-endian float64 is the fallback.
+    """
+    head = bytes(payload[:8])
+    if head.startswith(b"\x93NUMPY"):
+        return "npy"
+    if head.startswith(b"PAR1"):
+        return "parquet"
+    if head.startswith(b"ARROW1") or head.startswith(b"\xff\xff\xff\xff"):
+        return "arrow"
+    if filename:
+        for ext, fmt in EXTENSIONS.items():
+            if filename.lower().endswith(ext):
+                return fmt
+    if content_type:
+        fmt = CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+        if fmt:
+            return fmt
+    return "f8"
+
+def _decode_f8(payload: bytes) -> np.ndarray:
+    if len(payload) % 8:
+        raise ValueError("Raw float64 payload length must be a multiple of 8 bytes")
+    return np.frombuffer(payload, dtype="<f8")
+
+def _decode_npy(payload: bytes) -> np.ndarray:
+    buf = io.BytesIO(payload)
+    version = np.lib.format.read_magic(buf)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(buf)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(buf)
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not supported")
+    count = int(np.prod(shape))
+    arr = np.frombuffer(payload, dtype=dtype, count=count, offset=buf.tell())
+    if fortran_order:
+        arr = arr.reshape(shape[::-1]).T
+    return arr.ravel()
+
+def _select_column(table, column: Optional[str]) -> np.ndarray:
+    if column is None:
+        if table.num_columns != 1:
+            raise ValueError("Table has several columns; specify which one to analyse")
+        chunked = table.column(0)
+    else:
+        if column not in table.column_names:
+            raise ValueError(f"Column '{column}' not found")
+        chunked = table.column(column)
+    if chunked.null_count:
+        raise ValueError("Column contains null values")
+    if chunked.num_chunks == 1:
+        # Single null-free chunk: view the Arrow buffer directly
+        return chunked.chunk(0).to_numpy(zero_copy_only=False)
+    return chunked.to_numpy()
+
+def _decode_arrow(payload: bytes, column: Optional[str]) -> np.ndarray:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("Arrow uploads require the 'pyarrow' package")
+    buf = pa.py_buffer(payload)
+    if bytes(payload[:6]) == b"ARROW1":
+        table = pa.ipc.open_file(buf).read_all()
+    else:
+        table = pa.ipc.open_stream(buf).read_all()
+    return _select_column(table, column)
+
+def _decode_parquet(payload: bytes, column: Optional[str]) -> np.ndarray:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet uploads require the 'pyarrow' package")
+    columns = [column] if column is not None else None
+    table = pq.read_table(pa.BufferReader(payload), columns=columns)
+    return _select_column(table, column)
+
+def decode_array(payload: bytes, fmt: Optional[str] = None, column: Optional[str] = None,
+                 content_type: Optional[str] = None, filename: Optional[str] = None) -> np.ndarray:
+    """Decode an uploaded buffer into a 1-D float64 array.
+
+    Raw float64 and .npy payloads (and single-chunk Arrow columns) are viewed
+    in place rather than copied; other dtypes are cast to float64.
+    """
+    if fmt is None:
+        fmt = detect_format(payload, content_type, filename)
+    if fmt == "f8":
+        arr = _decode_f8(payload)
+    elif fmt == "npy":
+        arr = _decode_npy(payload)
+    elif fmt == "arrow":
+        arr = _decode_arrow(payload, column)
+    elif fmt == "parquet":
+        arr = _decode_parquet(payload, column)
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'. Expected one of {', '.join(FORMATS)}")
+
+    if arr.dtype != np.float64:
+        arr = arr.astype(np.float64)
+    if not np.all(np.isfinite(arr)):
+        raise ValueError("Data contains NaN or infinite values")
+    return arr
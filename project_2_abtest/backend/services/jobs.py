@@ -0,0 +1,192 @@
+import asyncio
+import multiprocessing
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+class QueueFullError(Exception):
+    """Raised when the number of queued and running jobs has reached the configured limit."""
+
+def _timed_call(fn: Callable, args: Sequence) -> tuple:
+    # Runs inside the worker process, so the timestamps measure actual execution
+    started = time.time()
+    value = fn(*args)
+    return started, time.time(), value
+
+class Job:
+    def __init__(self, kind: str, experiment_id: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.experiment_id = experiment_id
+        self.state = QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.cancel_requested = False
+        self.future: Optional[Future] = None
+
+    @property
+    def status(self) -> str:
+        if self.state == QUEUED and self.future is not None and self.future.running():
+            return RUNNING
+        return self.state
+
+    @property
+    def done(self) -> bool:
+        return self.state in (COMPLETED, FAILED, CANCELLED)
+
+    @property
+    def queue_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "experiment_id": self.experiment_id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_seconds": self.queue_seconds,
+            "run_seconds": self.run_seconds,
+            "result": self.result,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+        }
+
+class JobManager:
+    """Runs CPU-bound analyses on a local process pool and tracks them by id.
+
+    No external broker is involved: jobs live in this process's memory, the
+    number of unfinished jobs is bounded by max_pending, and only the most
+    recent `history` finished jobs are retained for polling.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, history: int = 1000):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history = history
+        self.rejected = 0
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # The event loop only holds weak references to tasks; keep the watchers alive until they finish
+        self._watchers: Set[asyncio.Task] = set()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn rather than fork: the API server process is multi-threaded
+            ctx = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.done)
+
+    def submit(self, kind: str, fn: Callable, args: Sequence, experiment_id: Optional[int] = None,
+               on_success: Optional[Callable[[Any], Awaitable[Any]]] = None) -> Job:
+        """Queue fn(*args) on the pool; must be called from the event loop.
+
+        on_success receives the worker's return value and its own return
+        value becomes the job result (e.g. the persisted Result row).
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+        job = Job(kind, experiment_id)
+        job.future = self._pool().submit(_timed_call, fn, args)
+        self._jobs[job.id] = job
+        watcher = asyncio.get_running_loop().create_task(self._watch(job, on_success))
+        self._watchers.add(watcher)
+        watcher.add_done_callback(self._watchers.discard)
+        return job
+
+    async def _watch(self, job: Job, on_success: Optional[Callable[[Any], Awaitable[Any]]]):
+        try:
+            job.started_at, job.finished_at, value = await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+            job.finished_at = time.time()
+            return
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e) or type(e).__name__
+            job.finished_at = time.time()
+            return
+        finally:
+            self._trim()
+
+        if job.cancel_requested:
+            # The worker could not be interrupted; discard its result
+            job.state = CANCELLED
+            return
+        try:
+            job.result = await on_success(value) if on_success is not None else value
+            job.state = COMPLETED
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e) or type(e).__name__
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Job]:
+        return [job for job in reversed(self._jobs.values()) if status is None or job.status == status]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job outright; a running job has its result discarded when it finishes."""
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        if not job.future.cancel():
+            job.cancel_requested = True
+        return job
+
+    def metrics(self) -> Dict:
+        jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED)}
+        for job in jobs:
+            counts[job.status] += 1
+        queue_times = [job.queue_seconds for job in jobs if job.queue_seconds is not None]
+        run_times = [job.run_seconds for job in jobs if job.run_seconds is not None]
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": counts[QUEUED] + counts[RUNNING],
+            "rejected": self.rejected,
+            "counts": counts,
+            "mean_queue_seconds": sum(queue_times) / len(queue_times) if queue_times else None,
+            "mean_run_seconds": sum(run_times) / len(run_times) if run_times else None,
+            "max_run_seconds": max(run_times) if run_times else None,
+        }
+
+    def shutdown(self):
+        for watcher in list(self._watchers):
+            watcher.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,95 @@
+import numpy as np
+from scipy import stats
+from typing import Dict, List, Sequence, Tuple
+from services.correction import MultipleTestingCorrection
+from services.statistics import SufficientStats, welch_arrays
+
+OMNIBUS_TESTS = ("welch", "anova")
+COMPARISONS = ("control", "all")
+
+def stack_stats(arms: Sequence[SufficientStats]) -> SufficientStats:
+    """One SufficientStats with array fields (one entry per arm)."""
+    return SufficientStats(*(np.array([getattr(s, field) for s in arms], dtype=np.float64) for field in ("n", "mean", "m2")))
+
+def anova_oneway(s: SufficientStats) -> Dict:
+    """Classic one-way ANOVA F-test (equal variances) from per-arm statistics."""
+    n, mean, m2 = s.n, s.mean, s.m2
+    k, total = n.size, n.sum()
+    grand = np.dot(n, mean) / total
+    between = np.dot(n, (mean - grand)**2) / (k - 1)
+    within = m2.sum() / (total - k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = between / within
+    return {"statistic": float(f), "df_between": float(k - 1), "df_within": float(total - k),
+            "p_value": float(stats.f.sf(f, k - 1, total - k)) if np.isfinite(f) else 0.0}
+
+def welch_anova(s: SufficientStats) -> Dict:
+    """Welch's heteroscedastic one-way ANOVA from per-arm statistics."""
+    n, mean = s.n, s.mean
+    k = n.size
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = n / (s.m2 / (n - 1))
+        weighted_mean = np.dot(w, mean) / w.sum()
+        spread = np.sum((1 - w / w.sum())**2 / (n - 1))
+        f = (np.dot(w, (mean - weighted_mean)**2) / (k - 1)) / (1 + 2 * (k - 2) / (k**2 - 1) * spread)
+        df_within = (k**2 - 1) / (3 * spread)
+    return {"statistic": float(f), "df_between": float(k - 1), "df_within": float(df_within),
+            "p_value": float(stats.f.sf(f, k - 1, df_within)) if np.isfinite(f) else 0.0}
+
+def comparison_pairs(k: int, comparisons: str = "control", control_index: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """(baseline, variant) arm indices: every arm against the control, or all pairs."""
+    if comparisons not in COMPARISONS:
+        raise ValueError(f"Unknown comparisons '{comparisons}'. Expected one of {', '.join(COMPARISONS)}")
+    if comparisons == "all":
+        return np.triu_indices(k, 1)
+    others = np.delete(np.arange(k), control_index)
+    return np.full(others.size, control_index), others
+
+def pairwise_arrays(s: SufficientStats, baseline: np.ndarray, variant: np.ndarray, alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Welch's t-test for every (baseline, variant) pair in one vectorized pass."""
+    pick = lambda idx: SufficientStats(s.n[idx], s.mean[idx], s.m2[idx])
+    result = welch_arrays(pick(baseline), pick(variant), alpha)
+    result["estimate"] = s.mean[variant] - s.mean[baseline]
+    return result
+
+def multiarm_test(names: List[str], arms: Sequence[SufficientStats], control: str, omnibus: str = "welch",
+                  comparisons: str = "control", correction: str = "holm", alpha: float = 0.05) -> Dict:
+    """Omnibus test plus corrected pairwise comparisons for an N-arm experiment.
+
+    Inputs are per-arm sufficient statistics, so the cost is O(arms^2)
+    whatever the number of observations. correction is one of
+    MultipleTestingCorrection.METHODS, or "none", and is applied across the
+    pairwise comparisons.
+    """
+    if omnibus not in OMNIBUS_TESTS:
+        raise ValueError(f"Unknown omnibus test '{omnibus}'. Expected one of {', '.join(OMNIBUS_TESTS)}")
+    if len(names) < 2:
+        raise ValueError("Need at least two variants")
+    if control not in names:
+        raise ValueError(f"Control variant '{control}' has no data")
+    if any(s.n < 2 for s in arms):
+        raise ValueError("Each variant needs at least two observations")
+
+    s = stack_stats(arms)
+    baseline, variant = comparison_pairs(len(names), comparisons, names.index(control))
+    tests = pairwise_arrays(s, baseline, variant, alpha)
+    if correction == "none":
+        adjusted = tests["p_value"]
+    else:
+        adjusted = MultipleTestingCorrection.adjust(tests["p_value"], correction, alpha)["adjusted_p_values"]
+
+    omnibus_result = (welch_anova if omnibus == "welch" else anova_oneway)(s)
+    omnibus_result["conclusion"] = "Significant" if omnibus_result["p_value"] < alpha else "Not Significant"
+    return {
+        "omnibus": omnibus_result,
+        "comparisons": [
+            {
+                "baseline": names[i],
+                "variant": names[j],
+                **{key: float(values[m]) for key, values in tests.items()},
+                "adjusted_p_value": float(adjusted[m]),
+                "conclusion": "Significant" if adjusted[m] < alpha else "Not Significant",
+            }
+            for m, (i, j) in enumerate(zip(baseline, variant))
+        ],
+    }
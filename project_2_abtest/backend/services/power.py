@@ -1,6 +1,41 @@
 import numpy as np
-from scipy import stats
-from typing import List
+from functools import lru_cache
+from scipy import stats, special
+from typing import List, Dict, Sequence, Union
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+@lru_cache(maxsize=4096)
+def z_quantile(q: float) -> float:
+    """Standard normal quantile, cached so repeated alpha/power values skip scipy dispatch."""
+    return float(stats.norm.ppf(q))
+
+def z_alpha(alpha: float) -> float:
+    """Two-sided critical value z_{1 - alpha/2}."""
+    return z_quantile(1 - alpha / 2)
+
+def z_power(power: float) -> float:
+    """Quantile z_{power} used for the type II error term."""
+    return z_quantile(power)
+
+# Beyond this many distinct quantiles a single ndtri ufunc call beats per-value cache lookups
+_CACHE_MAX_UNIQUE = 256
+
+def _z_array(q: ArrayLike) -> np.ndarray:
+    """Normal quantiles for an array of probabilities, via the cache when values repeat."""
+    q = np.asarray(q, dtype=np.float64)
+    unique, inverse = np.unique(q, return_inverse=True)
+    if unique.size <= _CACHE_MAX_UNIQUE:
+        z = np.array([z_quantile(float(v)) for v in unique])
+    else:
+        z = special.ndtri(unique)
+    return z[inverse].reshape(q.shape)
+
+def z_alpha_array(alpha: ArrayLike) -> np.ndarray:
+    return _z_array(1 - np.asarray(alpha, dtype=np.float64) / 2)
+
+def z_power_array(power: ArrayLike) -> np.ndarray:
+    return _z_array(power)
 
 class PowerAnalyzer:
     @staticmethod
@@ -10,11 +45,9 @@ class PowerAnalyzer:
         """
         if effect_size <= 0:
             return 0
-        z_alpha = stats.norm.ppf(1 - alpha / 2)
-        z_beta = stats.norm.ppf(power)
-        n = 2 * ((z_alpha + z_beta) / effect_size)**2
+        n = 2 * ((z_alpha(alpha) + z_power(power)) / effect_size)**2
         return int(np.ceil(n))
-        
+
     @staticmethod
     def power(n: int, effect_size: float, alpha: float = 0.05) -> float:
         """Calculate statistical power given sample size.
@@ -22,23 +55,67 @@ class PowerAnalyzer:
         """
         if n <= 0 or effect_size <= 0:
             return 0.0
-        z_alpha = stats.norm.ppf(1 - alpha / 2)
+        z = z_alpha(alpha)
         # Non-centrality parameter (approx)
         delta = effect_size * np.sqrt(n / 2)
-        power = 1 - stats.norm.cdf(z_alpha - delta) + stats.norm.cdf(-z_alpha - delta)
+        power = 1 - special.ndtr(z - delta) + special.ndtr(-z - delta)
         return float(power)
-        
+
     @staticmethod
     def minimum_detectable_effect(n: int, power: float = 0.8, alpha: float = 0.05) -> float:
         """Calculate MDE given sample size and power."""
         if n <= 0:
             return 0.0
-        z_alpha = stats.norm.ppf(1 - alpha / 2)
-        z_beta = stats.norm.ppf(power)
-        mde = (z_alpha + z_beta) * np.sqrt(2 / n)
+        mde = (z_alpha(alpha) + z_power(power)) * np.sqrt(2 / n)
         return float(mde)
-        
+
     @staticmethod
     def power_curve(sample_sizes: List[int], effect_size: float, alpha: float = 0.05) -> List[float]:
         """Generate power curve data."""
-        return [PowerAnalyzer.power(n, effect_size, alpha) for n in sample_sizes]
+        return PowerAnalyzer.power_array(sample_sizes, effect_size, alpha).tolist()
+
+    @staticmethod
+    def power_array(n: ArrayLike, effect_size: ArrayLike, alpha: ArrayLike = 0.05) -> np.ndarray:
+        """Element-wise power; arguments broadcast against each other."""
+        n, effect_size = np.broadcast_arrays(np.asarray(n, dtype=np.float64), np.asarray(effect_size, dtype=np.float64))
+        z = z_alpha_array(alpha)
+        with np.errstate(invalid="ignore"):
+            delta = effect_size * np.sqrt(n / 2)
+            power = 1 - special.ndtr(z - delta) + special.ndtr(-z - delta)
+        return np.where((n <= 0) | (effect_size <= 0), 0.0, power)
+
+    @staticmethod
+    def sample_size_array(effect_size: ArrayLike, alpha: ArrayLike = 0.05, power: ArrayLike = 0.8) -> np.ndarray:
+        """Element-wise required sample size per group (int64); arguments broadcast."""
+        effect_size = np.asarray(effect_size, dtype=np.float64)
+        z = z_alpha_array(alpha) + z_power_array(power)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = np.ceil(2 * (z / effect_size)**2)
+        return np.where(effect_size <= 0, 0, n).astype(np.int64)
+
+    @staticmethod
+    def mde_array(n: ArrayLike, power: ArrayLike = 0.8, alpha: ArrayLike = 0.05) -> np.ndarray:
+        """Element-wise minimum detectable effect; arguments broadcast."""
+        n = np.asarray(n, dtype=np.float64)
+        z = z_alpha_array(alpha) + z_power_array(power)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mde = z * np.sqrt(2 / n)
+        return np.where(n <= 0, 0.0, mde)
+
+    @staticmethod
+    def grid(sample_sizes: Sequence[int], effect_sizes: Sequence[float],
+             alphas: Sequence[float] = (0.05,), powers: Sequence[float] = (0.8,)) -> Dict[str, np.ndarray]:
+        """Evaluate power, sample size and MDE over a full planning grid with broadcasting.
+
+        Shapes: power is (n, effect_size, alpha), sample_size is
+        (effect_size, alpha, power) and mde is (n, alpha, power).
+        """
+        n = np.asarray(sample_sizes, dtype=np.float64)
+        es = np.asarray(effect_sizes, dtype=np.float64)
+        a = np.asarray(alphas, dtype=np.float64)
+        pw = np.asarray(powers, dtype=np.float64)
+        return {
+            "power": PowerAnalyzer.power_array(n[:, None, None], es[None, :, None], a[None, None, :]),
+            "sample_size": PowerAnalyzer.sample_size_array(es[:, None, None], a[None, :, None], pw[None, None, :]),
+            "mde": PowerAnalyzer.mde_array(n[:, None, None], pw[None, None, :], a[None, :, None]),
+        }
@@ -0,0 +1,92 @@
+import numpy as np
+from scipy import special, stats
+from typing import Dict, Tuple
+from services.statistics import ArrayLike, as_float64
+
+PROPORTION_TESTS = ("ztest", "chisquare", "fisher")
+
+def wilson_interval(successes: ArrayLike, trials: ArrayLike, alpha: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval for a binomial proportion, element-wise."""
+    x = np.asarray(successes, dtype=np.float64)
+    n = np.asarray(trials, dtype=np.float64)
+    z = special.ndtri(1 - alpha / 2)
+    p = x / n
+    denom = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denom
+    half = z / denom * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2))
+    return center - half, center + half
+
+def proportion_arrays(control_successes: ArrayLike, control_trials: ArrayLike, treatment_successes: ArrayLike,
+                      treatment_trials: ArrayLike, alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Pooled two-proportion z-test with a Newcombe interval, vectorized over metrics.
+
+    Inputs are counts, so the cost is O(1) per metric however many users
+    the arms contain. The statistic has the same orientation as the Welch
+    test (control - treatment); the interval is for the treatment - control
+    difference (Newcombe's hybrid score method) and effect_size is Cohen's h.
+    """
+    xc, nc = np.asarray(control_successes, dtype=np.float64), np.asarray(control_trials, dtype=np.float64)
+    xt, nt = np.asarray(treatment_successes, dtype=np.float64), np.asarray(treatment_trials, dtype=np.float64)
+    pc, pt = xc / nc, xt / nt
+    pooled = (xc + xt) / (nc + nt)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se = np.sqrt(pooled * (1 - pooled) * (1 / nc + 1 / nt))
+        z = np.where(se > 0, (pc - pt) / se, 0.0)
+    lc, uc = wilson_interval(xc, nc, alpha)
+    lt, ut = wilson_interval(xt, nt, alpha)
+    diff = pt - pc
+    return {
+        "t_statistic": z,
+        "p_value": 2 * special.ndtr(-np.abs(z)),
+        "effect_size": 2 * np.arcsin(np.sqrt(pt)) - 2 * np.arcsin(np.sqrt(pc)),
+        "estimate": diff,
+        "ci_lower": diff - np.sqrt((pt - lt)**2 + (uc - pc)**2),
+        "ci_upper": diff + np.sqrt((ut - pt)**2 + (pc - lc)**2),
+        "control_rate": pc,
+        "treatment_rate": pt,
+    }
+
+def proportion_test(control_successes: int, control_trials: int, treatment_successes: int, treatment_trials: int,
+                    test: str = "ztest", alpha: float = 0.05) -> Dict:
+    """Compare two conversion rates from (successes, trials) per arm.
+
+    test selects the p-value: the pooled z-test, Pearson's chi-square on
+    the 2x2 table (Yates-corrected, as scipy does) or Fisher's exact test.
+    The estimate, Newcombe interval and Cohen's h are reported for all three.
+    """
+    if test not in PROPORTION_TESTS:
+        raise ValueError(f"Unknown test '{test}'. Expected one of {', '.join(PROPORTION_TESTS)}")
+    for successes, trials in ((control_successes, control_trials), (treatment_successes, treatment_trials)):
+        if trials <= 0 or not 0 <= successes <= trials:
+            raise ValueError("Each arm needs trials > 0 and 0 <= successes <= trials")
+
+    result = {k: float(v) for k, v in proportion_arrays(control_successes, control_trials,
+                                                         treatment_successes, treatment_trials, alpha).items()}
+    table = np.array([[control_successes, control_trials - control_successes],
+                      [treatment_successes, treatment_trials - treatment_successes]])
+    if test == "chisquare":
+        if np.any(table.sum(axis=0) == 0):
+            result["t_statistic"], result["p_value"] = 0.0, 1.0
+        else:
+            chi2 = stats.chi2_contingency(table)
+            result["t_statistic"], result["p_value"] = float(chi2.statistic), float(chi2.pvalue)
+    elif test == "fisher":
+        # statistic is the sample odds ratio
+        odds_ratio, p_value = stats.fisher_exact(table)
+        result["t_statistic"], result["p_value"] = float(odds_ratio), float(p_value)
+    result["conclusion"] = "Significant" if result["p_value"] < alpha else "Not Significant"
+    return result
+
+def check_binary(arr: np.ndarray) -> np.ndarray:
+    if not np.all((arr == 0) | (arr == 1)):
+        raise ValueError("Binary metrics take 0/1 values only")
+    return arr
+
+def counts_from_samples(data: ArrayLike) -> Tuple[int, int]:
+    """(successes, trials) from a 0/1 sample."""
+    arr = check_binary(as_float64(data))
+    return int(np.count_nonzero(arr)), int(arr.size)
+
+def proportion_test_from_samples(control: ArrayLike, treatment: ArrayLike, test: str = "ztest", alpha: float = 0.05) -> Dict:
+    """proportion_test on raw 0/1 observations, reduced to counts first."""
+    return proportion_test(*counts_from_samples(control), *counts_from_samples(treatment), test, alpha)
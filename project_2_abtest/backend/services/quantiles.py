@@ -0,0 +1,79 @@
+import numpy as np
+from scipy import special
+from typing import Dict, Tuple
+from services.statistics import ArrayLike
+from services.sketch import QuantileSketch
+
+def quantile_interval(sketch: QuantileSketch, q: ArrayLike, alpha: float = 0.05) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Quantile estimates with distribution-free order-statistic intervals.
+
+    The rank of the true q-quantile is Binomial(n, q), so the interval takes
+    the sketch quantiles at q -/+ z * sqrt(q (1 - q) / n), widened by one
+    order statistic on the upper side for the discreteness of ranks. Every
+    bound is read from the sketch, which costs O(buckets) whatever the
+    sample size.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    n = sketch.count
+    half = special.ndtri(1 - alpha / 2) * np.sqrt(q * (1 - q) / n)
+    return sketch.quantile(q), sketch.quantile(np.clip(q - half, 0, 1)), sketch.quantile(np.clip(q + half + 1 / n, 0, 1))
+
+def quantile_summary(sketch: QuantileSketch, q: ArrayLike, alpha: float = 0.05) -> Dict:
+    """Count, range and per-quantile estimates with intervals for one arm."""
+    values, lower, upper = quantile_interval(sketch, q, alpha)
+    return {
+        "count": sketch.count,
+        "min": sketch.min,
+        "max": sketch.max,
+        "quantiles": [
+            {"quantile": float(p), "value": float(v), "ci_lower": float(lo), "ci_upper": float(hi)}
+            for p, v, lo, hi in zip(np.atleast_1d(q), np.atleast_1d(values), np.atleast_1d(lower), np.atleast_1d(upper))
+        ],
+    }
+
+def quantile_difference_arrays(control: QuantileSketch, treatment: QuantileSketch, q: ArrayLike,
+                               alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Difference in quantiles (treatment - control), vectorized over q.
+
+    Each arm's standard error is recovered from the width of its
+    order-statistic interval, so the difference gets a normal interval and
+    a z statistic with the Welch orientation (control - treatment).
+    """
+    z_crit = special.ndtri(1 - alpha / 2)
+    value_c, lower_c, upper_c = quantile_interval(control, q, alpha)
+    value_t, lower_t, upper_t = quantile_interval(treatment, q, alpha)
+    diff = value_t - value_c
+    se = np.sqrt(((upper_c - lower_c) / (2 * z_crit))**2 + ((upper_t - lower_t) / (2 * z_crit))**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(se > 0, (value_c - value_t) / se, np.where(diff == 0, 0.0, np.copysign(np.inf, -diff)))
+        relative = diff / value_c
+    return {
+        "t_statistic": z,
+        "p_value": 2 * special.ndtr(-np.abs(z)),
+        "estimate": diff,
+        "ci_lower": diff - z_crit * se,
+        "ci_upper": diff + z_crit * se,
+        "control_quantile": value_c,
+        "treatment_quantile": value_t,
+        "relative_difference": relative,
+    }
+
+def quantile_test_from_sketches(control: QuantileSketch, treatment: QuantileSketch, q: float = 0.5,
+                                alpha: float = 0.05) -> Dict:
+    """Scalar quantile difference test with a conclusion, like welch_ttest_from_stats."""
+    if not 0 < q < 1:
+        raise ValueError("Quantile must be in (0, 1)")
+    if control.count == 0 or treatment.count == 0:
+        raise ValueError("Groups cannot be empty")
+    if control.gamma != treatment.gamma:
+        raise ValueError("Sketches must have the same relative accuracy")
+
+    result = {k: float(v) for k, v in quantile_difference_arrays(control, treatment, q, alpha).items()}
+    result["conclusion"] = "Significant" if result["p_value"] < alpha else "Not Significant"
+    return result
+
+def quantile_test(control: ArrayLike, treatment: ArrayLike, q: float = 0.5, alpha: float = 0.05,
+                  relative_accuracy: float = 0.01) -> Dict:
+    """Quantile difference test on raw arms, sketched first."""
+    return quantile_test_from_sketches(QuantileSketch.from_data(control, relative_accuracy),
+                                       QuantileSketch.from_data(treatment, relative_accuracy), q, alpha)
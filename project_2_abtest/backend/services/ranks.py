@@ -0,0 +1,101 @@
+import numpy as np
+from scipy import special
+from typing import Dict, Tuple
+from services.statistics import ArrayLike, as_float64
+from services.sketch import QuantileSketch
+
+def value_counts(data: ArrayLike, presorted: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct values in ascending order with their counts.
+
+    Pre-sorted input is run-length encoded in O(n) without sorting again.
+    """
+    arr = as_float64(data)
+    if not presorted:
+        return np.unique(arr, return_counts=True)
+    if arr.size and np.any(arr[1:] < arr[:-1]):
+        raise ValueError("Data flagged as pre-sorted is not in ascending order")
+    starts = np.flatnonzero(np.concatenate([[True], arr[1:] != arr[:-1]])) if arr.size else np.empty(0, dtype=np.int64)
+    return arr[starts], np.diff(np.append(starts, arr.size))
+
+def merge_ranks(control_values: np.ndarray, control_counts: np.ndarray, treatment_values: np.ndarray,
+                treatment_counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Align two (value, count) tables on their union of values.
+
+    Returns the per-value control and treatment counts and the midrank of
+    each value in the combined sample. Costs O(distinct values), whatever
+    the number of observations behind the counts.
+    """
+    values = np.union1d(control_values, treatment_values)
+    c = np.zeros(values.size)
+    t = np.zeros(values.size)
+    np.add.at(c, np.searchsorted(values, control_values), control_counts)
+    np.add.at(t, np.searchsorted(values, treatment_values), treatment_counts)
+    total = c + t
+    midranks = np.cumsum(total) - total + (total + 1) / 2
+    return c, t, midranks
+
+def mann_whitney_from_counts(control_values: ArrayLike, control_counts: ArrayLike, treatment_values: ArrayLike,
+                             treatment_counts: ArrayLike, alpha: float = 0.05, use_continuity: bool = True) -> Dict:
+    """Two-sided Mann-Whitney U test (normal approximation with tie correction) on value counts.
+
+    Matches scipy.stats.mannwhitneyu(control, treatment, method="asymptotic").
+    u_statistic is the control U, effect_size the rank-biserial correlation
+    (positive when treatment tends to be larger) and estimate the
+    probability of superiority P(T > C) + P(T = C) / 2.
+    """
+    c, t, midranks = merge_ranks(*(np.asarray(a, dtype=np.float64) for a in
+                                   (control_values, control_counts, treatment_values, treatment_counts)))
+    n1, n2 = c.sum(), t.sum()
+    if n1 == 0 or n2 == 0:
+        raise ValueError("Groups cannot be empty")
+    n = n1 + n2
+    u1 = float(np.dot(c, midranks) - n1 * (n1 + 1) / 2)
+    ties = c + t
+    tie_term = float(np.sum(ties**3 - ties)) / (n * (n - 1)) if n > 1 else 0.0
+    sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    mu = n1 * n2 / 2
+    u = max(u1, n1 * n2 - u1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (u - mu - (0.5 if use_continuity else 0.0)) / sigma
+    p_value = float(min(1.0, 2 * special.ndtr(-z))) if sigma > 0 else 1.0
+    superiority = float(1 - u1 / (n1 * n2))
+    return {
+        "u_statistic": u1,
+        # Signed like the Welch statistic: positive when control ranks higher
+        "z_statistic": float(np.sign(u1 - mu) * z) if sigma > 0 else 0.0,
+        "p_value": p_value,
+        "effect_size": 2 * superiority - 1,
+        "estimate": superiority,
+        "conclusion": "Significant" if p_value < alpha else "Not Significant",
+    }
+
+def mann_whitney(control: ArrayLike, treatment: ArrayLike, presorted: bool = False, alpha: float = 0.05) -> Dict:
+    """Mann-Whitney U from raw arms; each arm is sorted (or run-length encoded) on its own, never concatenated."""
+    return mann_whitney_from_counts(*value_counts(control, presorted), *value_counts(treatment, presorted), alpha)
+
+def mann_whitney_from_histograms(control_counts: ArrayLike, treatment_counts: ArrayLike, alpha: float = 0.05) -> Dict:
+    """Mann-Whitney U on counts over shared ordered bins; observations in one bin count as ties."""
+    control_counts = np.asarray(control_counts, dtype=np.float64)
+    treatment_counts = np.asarray(treatment_counts, dtype=np.float64)
+    if control_counts.shape != treatment_counts.shape or control_counts.ndim != 1:
+        raise ValueError("Histograms must share the same bins")
+    if np.any(control_counts < 0) or np.any(treatment_counts < 0):
+        raise ValueError("Histogram counts cannot be negative")
+    bins = np.arange(control_counts.size, dtype=np.float64)
+    return mann_whitney_from_counts(bins, control_counts, bins, treatment_counts, alpha)
+
+def mann_whitney_from_sketches(control: QuantileSketch, treatment: QuantileSketch, alpha: float = 0.05) -> Dict:
+    """Approximate Mann-Whitney U from two quantile sketches of the same accuracy.
+
+    Observations sharing a bucket are treated as ties, so only pairs within
+    one bucket can be misordered: u_error_bound = sum over buckets of
+    c_b * t_b / 2 bounds the absolute error of the U statistic.
+    """
+    if control.gamma != treatment.gamma:
+        raise ValueError("Sketches must have the same relative accuracy")
+    control_values, control_counts = control.buckets()
+    treatment_values, treatment_counts = treatment.buckets()
+    result = mann_whitney_from_counts(control_values, control_counts, treatment_values, treatment_counts, alpha)
+    c, t, _ = merge_ranks(control_values, control_counts, treatment_values, treatment_counts)
+    result["u_error_bound"] = float(np.dot(c, t) / 2)
+    return result
@@ -0,0 +1,66 @@
+import numpy as np
+from scipy import special
+from typing import Dict
+from services.statistics import ArrayLike
+from services.variance_reduction import BivariateStats, bivariate_statistics
+
+def _ratio_and_variance(s: BivariateStats):
+    """Ratio of means and its delta-method variance, plus the per-unit linearized variance."""
+    n = np.asarray(s.n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.asarray(s.mean_y, dtype=np.float64) / s.mean_x
+        # Sample (co)variances of numerator and denominator across units
+        var_y, var_x, cov = (np.asarray(m, dtype=np.float64) / (n - 1) for m in (s.m2_y, s.m2_x, s.c_xy))
+        unit_variance = np.maximum(var_y - 2 * ratio * cov + ratio**2 * var_x, 0.0) / np.asarray(s.mean_x, dtype=np.float64)**2
+    return ratio, unit_variance / n, unit_variance
+
+def ratio_arrays(control: BivariateStats, treatment: BivariateStats, alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Delta-method z-test for a ratio metric sum(numerator) / sum(denominator) per arm.
+
+    Units (users, sessions) are the independent observations, so metrics
+    such as CTR or revenue per session are analysed from per-unit sums
+    instead of event-level rows. Vectorized like welch_arrays; the statistic
+    has the same orientation (control - treatment) and the CI is for the
+    treatment - control difference, with a relative-lift CI alongside.
+    """
+    r_c, v_c, unit_c = _ratio_and_variance(control)
+    r_t, v_t, unit_t = _ratio_and_variance(treatment)
+    z_crit = special.ndtri(1 - alpha / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff = r_t - r_c
+        se = np.sqrt(v_c + v_t)
+        z = (r_c - r_t) / se
+        lift = r_t / r_c - 1
+        lift_se = np.sqrt(v_t / r_c**2 + r_t**2 * v_c / r_c**4)
+        effect_size = diff / np.sqrt((unit_c + unit_t) / 2)
+    p_value = np.where(np.isinf(z), 0.0, 2 * special.ndtr(-np.abs(z)))
+    return {
+        "t_statistic": z,
+        "p_value": p_value,
+        "effect_size": effect_size,
+        "estimate": diff,
+        "ci_lower": diff - z_crit * se,
+        "ci_upper": diff + z_crit * se,
+        "control_ratio": r_c,
+        "treatment_ratio": r_t,
+        "relative_lift": lift,
+        "relative_ci_lower": lift - z_crit * lift_se,
+        "relative_ci_upper": lift + z_crit * lift_se,
+    }
+
+def ratio_test_from_stats(control: BivariateStats, treatment: BivariateStats, alpha: float = 0.05) -> Dict:
+    """Scalar delta-method ratio test with a conclusion, like welch_ttest_from_stats."""
+    if control.n < 2 or treatment.n < 2:
+        raise ValueError("Each arm needs at least two units")
+    if control.mean_x == 0 or treatment.mean_x == 0:
+        raise ValueError("Denominator sums must be non-zero")
+
+    result = {k: float(v) for k, v in ratio_arrays(control, treatment, alpha).items()}
+    result["conclusion"] = "Significant" if result["p_value"] < alpha else "Not Significant"
+    return result
+
+def ratio_test(control_numerator: ArrayLike, control_denominator: ArrayLike, treatment_numerator: ArrayLike,
+               treatment_denominator: ArrayLike, alpha: float = 0.05) -> Dict:
+    """Delta-method ratio test from per-unit (numerator, denominator) arrays."""
+    return ratio_test_from_stats(bivariate_statistics(control_numerator, control_denominator),
+                                 bivariate_statistics(treatment_numerator, treatment_denominator), alpha)
@@ -0,0 +1,118 @@
+import numpy as np
+from scipy import stats
+from typing import Dict, List, Sequence, Tuple
+from services.correction import MultipleTestingCorrection
+from services.proportions import check_binary, proportion_arrays
+from services.statistics import ArrayLike, SufficientStats, as_float64, welch_arrays, welch_se_df
+
+def segment_codes(control_keys: Sequence, treatment_keys: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Shared segment labels and an integer code per observation in each arm."""
+    control_keys, treatment_keys = np.asarray(control_keys), np.asarray(treatment_keys)
+    labels, codes = np.unique(np.concatenate([control_keys, treatment_keys]), return_inverse=True)
+    return labels, codes[:control_keys.size], codes[control_keys.size:]
+
+def grouped_statistics(data: ArrayLike, codes: np.ndarray, n_groups: int) -> SufficientStats:
+    """Per-group (n, mean, M2) in two bincount passes, with no Python loop over groups."""
+    arr = as_float64(data)
+    n = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(codes, weights=arr, minlength=n_groups) / n
+    dev = arr - mean[codes]
+    return SufficientStats(n, mean, np.bincount(codes, weights=dev * dev, minlength=n_groups))
+
+def segment_arrays(control: SufficientStats, treatment: SufficientStats, binary: bool = False,
+                   alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Vectorized per-segment test with the estimate and its standard error.
+
+    Continuous metrics get Welch's t-test; binary metrics (0/1 values) the
+    two-proportion z-test on the counts implied by the segment means.
+    """
+    estimate = np.asarray(treatment.mean) - control.mean
+    if binary:
+        result = proportion_arrays(control.n * control.mean, control.n, treatment.n * treatment.mean, treatment.n, alpha)
+        with np.errstate(invalid="ignore"):
+            rates = [(s.mean * (1 - s.mean)) / s.n for s in (control, treatment)]
+        result["standard_error"] = np.sqrt(rates[0] + rates[1])
+        return result
+    result = welch_arrays(control, treatment, alpha)
+    result["estimate"] = estimate
+    result["standard_error"] = welch_se_df(control, treatment)[0]
+    return result
+
+def cochran_q(estimate: np.ndarray, standard_error: np.ndarray) -> Dict:
+    """Cochran's Q test that the segment effects are equal, with the I^2 share of heterogeneity."""
+    with np.errstate(divide="ignore"):
+        w = 1 / standard_error**2
+    usable = np.isfinite(w)
+    k = int(np.count_nonzero(usable))
+    if k < 2:
+        return {"statistic": 0.0, "df": 0, "p_value": 1.0, "i_squared": 0.0}
+    w, estimate = w[usable], estimate[usable]
+    pooled = np.dot(w, estimate) / w.sum()
+    q = float(np.dot(w, (estimate - pooled)**2))
+    return {
+        "statistic": q,
+        "df": k - 1,
+        "p_value": float(stats.chi2.sf(q, k - 1)),
+        "i_squared": max(0.0, (q - (k - 1)) / q) if q > 0 else 0.0,
+    }
+
+def segmented_analysis(control: ArrayLike, treatment: ArrayLike, control_segments: Dict[str, Sequence],
+                       treatment_segments: Dict[str, Sequence], binary: bool = False, correction: str = "fdr",
+                       alpha: float = 0.05, min_count: int = 2) -> Dict:
+    """Per-segment results for every segmentation dimension (country, platform, ...).
+
+    Each dimension is reduced with one grouped aggregation per arm and tested
+    in one vectorized pass. Segments with fewer than min_count observations
+    in an arm are reported without a test. correction (or "none") is applied
+    across the tested segments of all dimensions, and Cochran's Q checks
+    each dimension for heterogeneous effects.
+    """
+    control, treatment = as_float64(control), as_float64(treatment)
+    if binary:
+        check_binary(control)
+        check_binary(treatment)
+    if set(control_segments) != set(treatment_segments):
+        raise ValueError("Both arms need keys for the same segment dimensions")
+    if not control_segments:
+        raise ValueError("Need at least one segment dimension")
+
+    dimensions = []
+    for dimension in control_segments:
+        control_keys, treatment_keys = control_segments[dimension], treatment_segments[dimension]
+        if len(control_keys) != control.size or len(treatment_keys) != treatment.size:
+            raise ValueError(f"Segment '{dimension}' needs one key per observation")
+        labels, control_codes, treatment_codes = segment_codes(control_keys, treatment_keys)
+        control_stats = grouped_statistics(control, control_codes, labels.size)
+        treatment_stats = grouped_statistics(treatment, treatment_codes, labels.size)
+        tested = (control_stats.n >= min_count) & (treatment_stats.n >= min_count)
+        tests = segment_arrays(control_stats, treatment_stats, binary, alpha)
+        dimensions.append((dimension, labels, control_stats.n, treatment_stats.n, tested, tests))
+
+    p_values = np.concatenate([tests["p_value"][tested] for *_, tested, tests in dimensions])
+    if correction == "none" or p_values.size == 0:
+        adjusted = p_values
+    else:
+        adjusted = MultipleTestingCorrection.adjust(p_values, correction, alpha)["adjusted_p_values"]
+
+    segments: List[Dict] = []
+    heterogeneity: List[Dict] = []
+    offset = 0
+    for dimension, labels, control_n, treatment_n, tested, tests in dimensions:
+        dimension_adjusted = np.full(labels.size, np.nan)
+        dimension_adjusted[tested] = adjusted[offset:offset + np.count_nonzero(tested)]
+        offset += np.count_nonzero(tested)
+        for i, label in enumerate(labels.tolist()):
+            segment = {"dimension": dimension, "segment": str(label),
+                       "control_count": int(control_n[i]), "treatment_count": int(treatment_n[i])}
+            if tested[i]:
+                segment.update({key: float(values[i]) for key, values in tests.items()})
+                segment["adjusted_p_value"] = float(dimension_adjusted[i])
+                segment["conclusion"] = "Significant" if dimension_adjusted[i] < alpha else "Not Significant"
+            else:
+                segment["conclusion"] = "Insufficient data"
+            segments.append(segment)
+        q = cochran_q(tests["estimate"][tested], tests["standard_error"][tested])
+        q["conclusion"] = "Significant" if q["p_value"] < alpha else "Not Significant"
+        heterogeneity.append({"dimension": dimension, **q})
+    return {"segments": segments, "heterogeneity": heterogeneity}
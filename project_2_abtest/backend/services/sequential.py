@@ -0,0 +1,125 @@
+import numpy as np
+from functools import lru_cache
+from scipy import optimize, special, stats
+from typing import Dict, Sequence, Tuple
+from services.statistics import SufficientStats, welch_se_df
+
+SPENDING_FUNCTIONS = ("obrien_fleming", "pocock")
+
+def _difference_and_variance(control: SufficientStats, treatment: SufficientStats) -> Tuple[np.ndarray, np.ndarray]:
+    se, _ = welch_se_df(control, treatment)
+    return np.asarray(treatment.mean, dtype=np.float64) - control.mean, se**2
+
+def msprt(control: SufficientStats, treatment: SufficientStats, tau: float, alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Mixture SPRT for the difference of means (treatment - control) at the current look.
+
+    Uses a N(0, tau^2) mixture over the true difference (Johari et al.). The
+    p-value and confidence interval returned are for this look only; the
+    always-valid versions are the running minimum of the p-values and the
+    running intersection of the intervals over all looks. Works element-wise
+    when the statistics hold arrays.
+    """
+    diff, v = _difference_and_variance(control, treatment)
+    tau2 = tau**2
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        log_lr = 0.5 * np.log(v / (v + tau2)) + diff**2 * tau2 / (2 * v * (v + tau2))
+        p_value = np.minimum(1.0, np.exp(-log_lr))
+        half_width = np.sqrt(v * (v + tau2) / tau2 * (np.log((v + tau2) / v) - 2 * np.log(alpha)))
+        z = diff / np.sqrt(v)
+    return {
+        "estimate": diff,
+        "z_statistic": z,
+        "p_value": p_value,
+        "ci_lower": diff - half_width,
+        "ci_upper": diff + half_width,
+    }
+
+def alpha_spent(t: Sequence[float], alpha: float = 0.05, spending: str = "obrien_fleming") -> np.ndarray:
+    """Cumulative two-sided type I error spent at information fractions t (Lan-DeMets)."""
+    t = np.clip(np.asarray(t, dtype=np.float64), 0.0, 1.0)
+    with np.errstate(divide="ignore"):
+        if spending == "obrien_fleming":
+            return np.where(t > 0, 2 - 2 * special.ndtr(special.ndtri(1 - alpha / 2) / np.sqrt(t)), 0.0)
+        if spending == "pocock":
+            return alpha * np.log1p((np.e - 1) * t)
+    raise ValueError(f"Unknown spending function '{spending}'. Expected one of {', '.join(SPENDING_FUNCTIONS)}")
+
+# Boundaries are capped here; a look that spends no alpha effectively never stops
+BOUNDARY_CAP = 12.0
+# Simpson grid size for the recursive integration over the continuation region (odd)
+GRID_POINTS = 401
+
+def _simpson_grid(half_width: float) -> Tuple[np.ndarray, np.ndarray]:
+    grid = np.linspace(-half_width, half_width, GRID_POINTS)
+    weights = np.ones(GRID_POINTS)
+    weights[1:-1:2] = 4
+    weights[2:-1:2] = 2
+    return grid, weights * (grid[1] - grid[0]) / 3
+
+@lru_cache(maxsize=256)
+def group_sequential_bounds(fractions: Tuple[float, ...], alpha: float = 0.05,
+                            spending: str = "obrien_fleming") -> Tuple[float, ...]:
+    """Two-sided z boundaries for looks at the given increasing information fractions.
+
+    Each look spends alpha(t_k) - alpha(t_{k-1}) given that no earlier
+    boundary was crossed. The sub-density of the score statistic on the
+    continuation region is carried from look to look by numerical
+    integration (Armitage, McPherson and Rowe), so k looks cost
+    O(k * GRID_POINTS^2) rather than k-dimensional normal integrals.
+    """
+    fractions = tuple(float(t) for t in fractions)
+    if any(b <= a for a, b in zip(fractions, fractions[1:])) or fractions[0] <= 0:
+        raise ValueError("Information fractions must be positive and strictly increasing")
+    spent = alpha_spent(fractions, alpha, spending)
+
+    bounds = [min(BOUNDARY_CAP, float(special.ndtri(1 - spent[0] / 2)))]
+    # Score statistic S_k = Z_k * sqrt(t_k) is Brownian motion in t
+    grid, weights = _simpson_grid(bounds[0] * np.sqrt(fractions[0]))
+    mass = weights * stats.norm.pdf(grid, scale=np.sqrt(fractions[0]))
+    for k in range(1, len(fractions)):
+        t, sd = fractions[k], np.sqrt(fractions[k] - fractions[k - 1])
+        increment = spent[k] - spent[k - 1]
+
+        def crossing(c: float) -> float:
+            edge = c * np.sqrt(t)
+            return float(np.dot(mass, special.ndtr((-edge - grid) / sd) + special.ndtr((grid - edge) / sd)))
+
+        if increment <= 0 or crossing(BOUNDARY_CAP) >= increment:
+            c = BOUNDARY_CAP
+        else:
+            c = float(optimize.brentq(lambda c: crossing(c) - increment, 0.0, BOUNDARY_CAP, xtol=1e-8))
+        bounds.append(c)
+        new_grid, new_weights = _simpson_grid(c * np.sqrt(t))
+        density = stats.norm.pdf(new_grid[:, None] - grid[None, :], scale=sd) @ mass
+        grid, mass = new_grid, new_weights * density
+    return tuple(bounds)
+
+def information_fraction(control: SufficientStats, treatment: SufficientStats, max_sample_size: int) -> float:
+    """Current over planned information, with max_sample_size observations per arm planned.
+
+    Information is the inverse variance of the difference of means, so
+    unequal arms and variances are accounted for.
+    """
+    v_now = control.variance / control.n + treatment.variance / treatment.n
+    v_planned = (control.variance + treatment.variance) / max_sample_size
+    return float(min(1.0, v_planned / v_now))
+
+def group_sequential_look(control: SufficientStats, treatment: SufficientStats, fractions: Sequence[float],
+                          alpha: float = 0.05, spending: str = "obrien_fleming") -> Dict:
+    """Test the current look, the last of the given information fractions, against its spending boundary."""
+    if spending not in SPENDING_FUNCTIONS:
+        raise ValueError(f"Unknown spending function '{spending}'. Expected one of {', '.join(SPENDING_FUNCTIONS)}")
+    boundary = group_sequential_bounds(tuple(fractions), alpha, spending)[-1]
+    diff, v = _difference_and_variance(control, treatment)
+    se = float(np.sqrt(v))
+    z = float(diff / se)
+    return {
+        "estimate": float(diff),
+        "z_statistic": z,
+        "p_value": float(2 * special.ndtr(-abs(z))),
+        "boundary": boundary,
+        # Repeated confidence interval: valid jointly over all looks of the design
+        "ci_lower": float(diff - boundary * se),
+        "ci_upper": float(diff + boundary * se),
+        "reject": bool(abs(z) >= boundary),
+    }
@@ -0,0 +1,180 @@
+import multiprocessing
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from scipy import stats
+from typing import List, Dict, Optional, Sequence, Tuple
+from services.statistics import welch_ttest_batch
+
+TESTS = ("welch", "mannwhitney")
+
+# Upper bound on simulated observations held in memory per chunk (per arm)
+CHUNK_ELEMENTS = 4_000_000
+# Cap on simulations per chunk so work splits across workers even for small n
+CHUNK_SIMULATIONS = 1000
+
+class BaselineSampler:
+    """Draws synthetic arms from historical data or a fitted scipy distribution.
+
+    Either resamples a stored baseline array with replacement, or draws from
+    scipy.stats.<distribution>(**params). zero_inflation replaces that share
+    of draws with zeros, e.g. for revenue metrics where most users spend nothing.
+    """
+
+    def __init__(self, baseline: Optional[Sequence[float]] = None, distribution: Optional[str] = None,
+                 params: Optional[Dict[str, float]] = None, zero_inflation: float = 0.0):
+        if (baseline is None) == (distribution is None):
+            raise ValueError("Provide exactly one of baseline data or a distribution")
+        if not 0.0 <= zero_inflation < 1.0:
+            raise ValueError("zero_inflation must be in [0, 1)")
+        self.baseline = None if baseline is None else np.ascontiguousarray(baseline, dtype=np.float64)
+        if self.baseline is not None and self.baseline.size == 0:
+            raise ValueError("Baseline data cannot be empty")
+        self.dist = None
+        if distribution is not None:
+            dist = getattr(stats, distribution, None)
+            if not isinstance(dist, stats.rv_continuous) and not isinstance(dist, stats.rv_discrete):
+                raise ValueError(f"Unknown distribution '{distribution}'")
+            self.dist = dist(**(params or {}))
+        self.zero_inflation = zero_inflation
+
+    @classmethod
+    def fit(cls, data: Sequence[float], distribution: str, zero_inflated: bool = False) -> "BaselineSampler":
+        """Fit a scipy distribution to historical data (optionally to its non-zero part)."""
+        arr = np.asarray(data, dtype=np.float64)
+        zero_inflation = 0.0
+        if zero_inflated:
+            zero_inflation = float(np.mean(arr == 0))
+            arr = arr[arr != 0]
+        dist = getattr(stats, distribution, None)
+        if not isinstance(dist, stats.rv_continuous):
+            raise ValueError(f"Unknown continuous distribution '{distribution}'")
+        shape_names = [name.strip() for name in dist.shapes.split(",")] if dist.shapes else []
+        fitted = dist.fit(arr)
+        params = dict(zip(shape_names + ["loc", "scale"], fitted))
+        return cls(distribution=distribution, params=params, zero_inflation=zero_inflation)
+
+    def sample(self, rng: np.random.Generator, size: Tuple[int, int]) -> np.ndarray:
+        if self.baseline is not None:
+            draws = self.baseline[rng.integers(0, self.baseline.size, size=size)]
+        else:
+            draws = np.asarray(self.dist.rvs(size=size, random_state=rng), dtype=np.float64)
+        if self.zero_inflation > 0:
+            draws[rng.random(size) < self.zero_inflation] = 0.0
+        return draws
+
+def _count_rejections(sampler: BaselineSampler, n: int, n_sims: int, lift: float, lift_type: str,
+                      test: str, alpha: float, seed_seq: np.random.SeedSequence) -> int:
+    """Simulate n_sims experiments at once as (n_sims, n) matrices and count rejections."""
+    rng = np.random.default_rng(seed_seq)
+    control = sampler.sample(rng, (n_sims, n))
+    treatment = sampler.sample(rng, (n_sims, n))
+    if lift_type == "relative":
+        treatment *= 1 + lift
+    else:
+        treatment += lift
+
+    if test == "welch":
+        p_values = welch_ttest_batch(control, treatment, alpha)["p_value"]
+    else:
+        p_values = stats.mannwhitneyu(control, treatment, axis=1, method="asymptotic").pvalue
+    return int(np.count_nonzero(p_values < alpha))
+
+def _worker_chunks(sampler: BaselineSampler, tasks: List[tuple]) -> List[int]:
+    # One call per worker and request, so the baseline is pickled once per worker rather than per chunk
+    return [_count_rejections(sampler, *task) for task in tasks]
+
+# Worker processes are started once and reused: spawning them costs more than a small simulation
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _process_pool(n_jobs: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != n_jobs:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn rather than fork: the API server process is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = n_jobs
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+class SimulationPowerAnalyzer:
+    @staticmethod
+    def _chunks(n: int, n_simulations: int) -> List[int]:
+        """Deterministic chunk sizes, so results do not depend on the number of workers."""
+        per_chunk = max(1, min(n_simulations, CHUNK_SIMULATIONS, CHUNK_ELEMENTS // max(n, 1)))
+        sizes = [per_chunk] * (n_simulations // per_chunk)
+        if n_simulations % per_chunk:
+            sizes.append(n_simulations % per_chunk)
+        return sizes
+
+    @staticmethod
+    def power(sampler: BaselineSampler, n: int, lift: float, lift_type: str = "relative", test: str = "welch",
+              alpha: float = 0.05, n_simulations: int = 2000, seed: Optional[int] = None, n_jobs: int = 1) -> Dict:
+        """Monte Carlo power of a two-arm test with n observations per arm.
+
+        Every chunk of simulations gets its own child SeedSequence, so a given
+        seed reproduces the same estimate for any n_jobs.
+        """
+        return SimulationPowerAnalyzer.power_curve(sampler, [n], lift, lift_type, test, alpha, n_simulations, seed, n_jobs)[0]
+
+    @staticmethod
+    def power_curve(sampler: BaselineSampler, sample_sizes: Sequence[int], lift: float, lift_type: str = "relative",
+                    test: str = "welch", alpha: float = 0.05, n_simulations: int = 2000,
+                    seed: Optional[int] = None, n_jobs: int = 1) -> List[Dict]:
+        """Simulated power for each sample size (per arm)."""
+        if test not in TESTS:
+            raise ValueError(f"Unknown test '{test}'. Expected one of {', '.join(TESTS)}")
+        if lift_type not in ("relative", "absolute"):
+            raise ValueError("lift_type must be 'relative' or 'absolute'")
+        if n_simulations < 1 or any(n < 2 for n in sample_sizes):
+            raise ValueError("Need at least one simulation and two observations per arm")
+
+        tasks, owners = [], []
+        root = np.random.SeedSequence(seed)
+        for i, (n, n_seq) in enumerate(zip(sample_sizes, root.spawn(len(sample_sizes)))):
+            chunks = SimulationPowerAnalyzer._chunks(n, n_simulations)
+            for size, chunk_seq in zip(chunks, n_seq.spawn(len(chunks))):
+                tasks.append((n, size, lift, lift_type, test, alpha, chunk_seq))
+                owners.append(i)
+
+        if n_jobs > 1 and len(tasks) > 1:
+            groups = [list(range(len(tasks)))[w::n_jobs] for w in range(min(n_jobs, len(tasks)))]
+            try:
+                counts = list(_process_pool(n_jobs).map(_worker_chunks, [sampler] * len(groups),
+                                                        [[tasks[i] for i in group] for group in groups]))
+            except BrokenProcessPool:
+                shutdown_pool()
+                raise
+            rejections = [0] * len(tasks)
+            for group, group_counts in zip(groups, counts):
+                for i, count in zip(group, group_counts):
+                    rejections[i] = count
+        else:
+            rejections = [_count_rejections(sampler, *task) for task in tasks]
+
+        totals = np.bincount(owners, weights=rejections, minlength=len(sample_sizes)).astype(int)
+
+        results = []
+        for n, total in zip(sample_sizes, totals.tolist()):
+            power = total / n_simulations
+            # Monte Carlo standard error of the estimated rejection rate
+            mc_se = np.sqrt(power * (1 - power) / n_simulations)
+            results.append({
+                "n": int(n),
+                "power": power,
+                "mc_standard_error": float(mc_se),
+                "rejections": total,
+                "n_simulations": n_simulations,
+            })
+        return results
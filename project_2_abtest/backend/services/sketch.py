@@ -0,0 +1,119 @@
+import numpy as np
+from typing import Dict, Tuple
+from services.statistics import ArrayLike, as_float64
+
+# Magnitudes below this are counted as zero (they have no finite log bucket)
+MIN_INDEXABLE = 1e-300
+
+def _add_counts(keys_a: np.ndarray, counts_a: np.ndarray, keys_b: np.ndarray, counts_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    keys, inverse = np.unique(np.concatenate([keys_a, keys_b]), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate([counts_a, counts_b]), minlength=keys.size)
+    return keys, counts.astype(np.int64)
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Values fall into logarithmic buckets of ratio gamma = (1 + a) / (1 - a),
+    so every quantile estimate is within relative accuracy a of an actual
+    sample value. Size grows with the log of the value range, not with the
+    number of observations, and two sketches with the same accuracy merge
+    exactly by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        empty = np.empty(0, dtype=np.int64)
+        self.positive = (empty, empty)
+        self.negative = (empty, empty)
+        self.zero_count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    @property
+    def count(self) -> int:
+        return int(self.positive[1].sum() + self.negative[1].sum() + self.zero_count)
+
+    def _keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def update(self, data: ArrayLike) -> "QuantileSketch":
+        """Add a batch of observations in one vectorized pass."""
+        arr = as_float64(data)
+        if arr.size == 0:
+            return self
+        if not np.all(np.isfinite(arr)):
+            raise ValueError("Sketches only accept finite values")
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+        pos = arr[arr >= MIN_INDEXABLE]
+        neg = -arr[arr <= -MIN_INDEXABLE]
+        self.zero_count += int(arr.size - pos.size - neg.size)
+        for store, values in (("positive", pos), ("negative", neg)):
+            keys, counts = np.unique(self._keys(values), return_counts=True)
+            setattr(self, store, _add_counts(*getattr(self, store), keys, counts))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch with the same relative accuracy into this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        self.positive = _add_counts(*self.positive, *other.positive)
+        self.negative = _add_counts(*self.negative, *other.negative)
+        self.zero_count += other.zero_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def buckets(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Representative bucket values in ascending order and their counts.
+
+        Sketches with the same accuracy share representative values, so
+        their buckets can be aligned by value.
+        """
+        def representative(keys):
+            return 2 * self.gamma**keys.astype(np.float64) / (self.gamma + 1)
+        neg_keys, neg_counts = self.negative
+        pos_keys, pos_counts = self.positive
+        values = np.concatenate([-representative(neg_keys[::-1]), [0.0] if self.zero_count else [], representative(pos_keys)])
+        counts = np.concatenate([neg_counts[::-1], [self.zero_count] if self.zero_count else [], pos_counts]).astype(np.int64)
+        return values, counts
+
+    def quantile(self, q: ArrayLike) -> np.ndarray:
+        """Estimated quantiles (lower nearest rank), clipped to the observed min and max."""
+        if self.count == 0:
+            raise ValueError("Cannot take quantiles of an empty sketch")
+        values, counts = self.buckets()
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Quantiles must be in [0, 1]")
+        rank = np.floor(q * (self.count - 1))
+        idx = np.searchsorted(np.cumsum(counts), rank, side="right")
+        return np.clip(values[np.minimum(idx, values.size - 1)], self.min, self.max)
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": [self.positive[0].tolist(), self.positive[1].tolist()],
+            "negative": [self.negative[0].tolist(), self.negative[1].tolist()],
+            "zero_count": self.zero_count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.positive = tuple(np.asarray(a, dtype=np.int64) for a in data["positive"])
+        sketch.negative = tuple(np.asarray(a, dtype=np.int64) for a in data["negative"])
+        sketch.zero_count = int(data["zero_count"])
+        sketch.min = float("inf") if data["min"] is None else float(data["min"])
+        sketch.max = float("-inf") if data["max"] is None else float(data["max"])
+        return sketch
+
+    @classmethod
+    def from_data(cls, data: ArrayLike, relative_accuracy: float = 0.01) -> "QuantileSketch":
+        return cls(relative_accuracy).update(data)
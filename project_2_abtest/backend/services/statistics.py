@@ -1,70 +1,200 @@
+import multiprocessing
 import numpy as np
-from scipy import stats
-from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats, special
+from typing import List, Dict, Tuple, NamedTuple, Optional, Sequence, Union
 
-def cohens_d(group1: List[float], group2: List[float]) -> float:
-    """Calculate Cohen's d effect size."""
-    if len(group1) < 2 or len(group2) < 2:
-        return 0.0
-    n1, n2 = len(group1), len(group2)
-    var1, var2 = np.var(group1, ddof=1), np.var(group2, ddof=1)
-    
-    # Pooled standard deviation
-    pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
-    
-    if pooled_std == 0:
-        return 0.0
-        
-    # Cohen's d
-    d = (np.mean(group2) - np.mean(group1)) / pooled_std
-    return float(d)
-
-def calculate_ci(group1: List[float], group2: List[float], alpha: float = 0.05) -> Tuple[float, float]:
-    """95% confidence interval for the difference of means (treatment - control)."""
-    n1, n2 = len(group1), len(group2)
-    m1, m2 = np.mean(group1), np.mean(group2)
-    v1, v2 = np.var(group1, ddof=1), np.var(group2, ddof=1)
-    
-    # Standard error of the difference
-    se = np.sqrt(v1/n1 + v2/n2)
-    
-    if se == 0:
-        return 0.0, 0.0
-
-    # Degrees of freedom (Welch-Satterthwaite)
-    num = (v1/n1 + v2/n2)**2
-    den = ((v1/n1)**2 / (n1-1)) + ((v2/n2)**2 / (n2-1))
-    df = num / den
-    
-    # Critical t-value
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+class SufficientStats(NamedTuple):
+    """Per-arm sufficient statistics for continuous metrics.
+
+    n is the observation count, mean the sample mean and m2 the sum of
+    squared deviations from the mean. m3 and m4 (third and fourth central
+    moment sums) are optional and only tracked when requested.
+    """
+    n: int
+    mean: float
+    m2: float
+    m3: Optional[float] = None
+    m4: Optional[float] = None
+
+    @property
+    def variance(self) -> float:
+        """Unbiased sample variance (ddof=1)."""
+        if self.n < 2:
+            return float("nan")
+        return self.m2 / (self.n - 1)
+
+def as_float64(data: ArrayLike) -> np.ndarray:
+    """Return data as a contiguous float64 buffer, without copying when it already is one."""
+    return np.ascontiguousarray(data, dtype=np.float64).ravel()
+
+def sufficient_statistics(data: ArrayLike, higher_moments: bool = False) -> SufficientStats:
+    """Compute (n, mean, M2) over a single contiguous float64 buffer.
+
+    With higher_moments=True the third and fourth central moment sums are
+    filled in as well.
+    """
+    arr = as_float64(data)
+    n = arr.size
+    if n == 0:
+        zero = 0.0 if higher_moments else None
+        return SufficientStats(0, float("nan"), 0.0, zero, zero)
+    mean = arr.mean()
+    dev = arr - mean
+    m2 = np.dot(dev, dev)
+    if not higher_moments:
+        return SufficientStats(n, float(mean), float(m2))
+    dev2 = dev * dev
+    return SufficientStats(n, float(mean), float(m2), float(np.dot(dev2, dev)), float(np.dot(dev2, dev2)))
+
+def merge_stats(a: SufficientStats, b: SufficientStats) -> SufficientStats:
+    """Combine the statistics of two disjoint samples (Chan et al. parallel update).
+
+    Higher moments follow Pebay's pairwise formulas and are only kept when
+    both sides carry them.
+    """
+    if a.n == 0:
+        return b
+    if b.n == 0:
+        return a
+
+    na, nb = a.n, b.n
+    n = na + nb
+    delta = b.mean - a.mean
+    mean = a.mean + delta * nb / n
+    m2 = a.m2 + b.m2 + delta**2 * na * nb / n
+
+    if a.m3 is None or b.m3 is None:
+        return SufficientStats(n, mean, m2)
+
+    m3 = (a.m3 + b.m3
+          + delta**3 * na * nb * (na - nb) / n**2
+          + 3 * delta * (na * b.m2 - nb * a.m2) / n)
+    m4 = (a.m4 + b.m4
+          + delta**4 * na * nb * (na**2 - na * nb + nb**2) / n**3
+          + 6 * delta**2 * (na**2 * b.m2 + nb**2 * a.m2) / n**2
+          + 4 * delta * (na * b.m3 - nb * a.m3) / n)
+    return SufficientStats(n, mean, m2, m3, m4)
+
+def sufficient_statistics_matrix(data: ArrayLike) -> SufficientStats:
+    """Row-wise (n, mean, M2) for a 2-D metrics x observations matrix.
+
+    NaN entries are treated as missing, so metrics observed on different
+    subsets of units can share one matrix. Fields are 1-D arrays.
+    """
+    arr = np.ascontiguousarray(data, dtype=np.float64)
+    if arr.ndim != 2:
+        raise ValueError("Expected a 2-D metrics x observations matrix")
+    mask = np.isnan(arr)
+    if mask.any():
+        n = (~mask).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(arr, axis=1) / n
+        dev = np.where(mask, 0.0, arr - mean[:, None])
+    else:
+        n = np.full(arr.shape[0], arr.shape[1])
+        mean = arr.mean(axis=1)
+        dev = arr - mean[:, None]
+    m2 = np.einsum("ij,ij->i", dev, dev)
+    return SufficientStats(n, mean, m2)
+
+def _variance(s: SufficientStats) -> np.ndarray:
+    n = np.asarray(s.n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(n > 1, np.asarray(s.m2, dtype=np.float64) / (n - 1), np.nan)
+
+def _cohens_d(s1: SufficientStats, s2: SufficientStats) -> np.ndarray:
+    n1 = np.asarray(s1.n, dtype=np.float64)
+    n2 = np.asarray(s2.n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Pooled standard deviation
+        pooled_std = np.sqrt((np.asarray(s1.m2) + s2.m2) / (n1 + n2 - 2))
+        d = (np.asarray(s2.mean) - s1.mean) / pooled_std
+    return np.where((n1 < 2) | (n2 < 2) | (pooled_std == 0), 0.0, d)
+
+def _welch_ci(diff: np.ndarray, se: np.ndarray, df: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
     t_crit = stats.t.ppf(1 - alpha/2, df)
-    
-    diff = m2 - m1
-    lower = diff - t_crit * se
-    upper = diff + t_crit * se
-    
-    return float(lower), float(upper)
+    lower = np.where(se == 0, 0.0, diff - t_crit * se)
+    upper = np.where(se == 0, 0.0, diff + t_crit * se)
+    return lower, upper
 
-def welch_ttest(control: List[float], treatment: List[float]) -> Dict:
-    """Welch's t-test (unequal variance)."""
-    if not control or not treatment:
-        raise ValueError("Groups cannot be empty")
-        
-    t_stat, p_val = stats.ttest_ind(control, treatment, equal_var=False)
-    d = cohens_d(control, treatment)
-    ci_lower, ci_upper = calculate_ci(control, treatment)
-    
-    conclusion = "Significant" if p_val < 0.05 else "Not Significant"
-    
+def welch_se_df(s1: SufficientStats, s2: SufficientStats) -> Tuple[np.ndarray, np.ndarray]:
+    """Standard error of the difference of means and Welch-Satterthwaite degrees of freedom.
+
+    Works element-wise when the statistics hold arrays.
+    """
+    n1 = np.asarray(s1.n, dtype=np.float64)
+    n2 = np.asarray(s2.n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a1 = _variance(s1) / n1
+        a2 = _variance(s2) / n2
+        se = np.sqrt(a1 + a2)
+        df = (a1 + a2)**2 / (a1**2 / (n1 - 1) + a2**2 / (n2 - 1))
+    return se, df
+
+def welch_arrays(control: SufficientStats, treatment: SufficientStats, alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Vectorized Welch's t-test over statistics whose fields are arrays (one entry per metric)."""
+    se, df = welch_se_df(control, treatment)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Same orientation as stats.ttest_ind(control, treatment)
+        t_stat = (np.asarray(control.mean, dtype=np.float64) - treatment.mean) / se
+    # Zero variance with distinct means gives an infinite statistic (scipy reports p = 0)
+    p_val = np.where(np.isinf(t_stat), 0.0, 2 * stats.t.sf(np.abs(t_stat), df))
+    ci_lower, ci_upper = _welch_ci(np.asarray(treatment.mean) - control.mean, se, df, alpha)
     return {
-        "t_statistic": float(t_stat),
-        "p_value": float(p_val),
-        "effect_size": d,
+        "t_statistic": t_stat,
+        "p_value": p_val,
+        "effect_size": _cohens_d(control, treatment),
         "ci_lower": ci_lower,
         "ci_upper": ci_upper,
-        "conclusion": conclusion
     }
 
+def cohens_d_from_stats(s1: SufficientStats, s2: SufficientStats) -> float:
+    """Cohen's d (group2 - group1) from per-arm sufficient statistics."""
+    return float(_cohens_d(s1, s2))
+
+def ci_from_stats(s1: SufficientStats, s2: SufficientStats, alpha: float = 0.05) -> Tuple[float, float]:
+    """Welch confidence interval for the difference of means (group2 - group1)."""
+    se, df = welch_se_df(s1, s2)
+    lower, upper = _welch_ci(np.float64(s2.mean - s1.mean), se, df, alpha)
+    return float(lower), float(upper)
+
+def welch_ttest_from_stats(control: SufficientStats, treatment: SufficientStats, alpha: float = 0.05) -> Dict:
+    """Welch's t-test, Cohen's d and CI derived from per-arm sufficient statistics."""
+    if control.n == 0 or treatment.n == 0:
+        raise ValueError("Groups cannot be empty")
+
+    result = {k: float(v) for k, v in welch_arrays(control, treatment, alpha).items()}
+    result["conclusion"] = "Significant" if result["p_value"] < alpha else "Not Significant"
+    return result
+
+def welch_ttest_batch(control: ArrayLike, treatment: ArrayLike, alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """Welch's t-test for every row of two metrics x observations matrices in one vectorized pass."""
+    control_stats = sufficient_statistics_matrix(control)
+    treatment_stats = sufficient_statistics_matrix(treatment)
+    if control_stats.n.shape != treatment_stats.n.shape:
+        raise ValueError("Control and treatment must have the same number of metrics")
+    if np.any(control_stats.n == 0) or np.any(treatment_stats.n == 0):
+        raise ValueError("Groups cannot be empty")
+    return welch_arrays(control_stats, treatment_stats, alpha)
+
+def cohens_d(group1: ArrayLike, group2: ArrayLike) -> float:
+    """Calculate Cohen's d effect size."""
+    return cohens_d_from_stats(sufficient_statistics(group1), sufficient_statistics(group2))
+
+def calculate_ci(group1: ArrayLike, group2: ArrayLike, alpha: float = 0.05) -> Tuple[float, float]:
+    """95% confidence interval for the difference of means (treatment - control)."""
+    return ci_from_stats(sufficient_statistics(group1), sufficient_statistics(group2), alpha)
+
+def welch_ttest(control: ArrayLike, treatment: ArrayLike) -> Dict:
+    """Welch's t-test (unequal variance)."""
+    if len(control) == 0 or len(treatment) == 0:
+        raise ValueError("Groups cannot be empty")
+
+    return welch_ttest_from_stats(sufficient_statistics(control), sufficient_statistics(treatment))
+
 def mannwhitneyu_test(group1: List[float], group2: List[float]) -> Dict:
     """Mann-Whitney U test."""
     u_stat, p_val = stats.mannwhitneyu(group1, group2)
@@ -86,11 +216,211 @@ def chisquare_test(observed: List[int], expected: List[int] = None) -> Dict:
     }
 
 def summary_statistics(data: List[float]) -> Dict:
-    """Mean, std, min, max, count."""
+    """Mean, std, min, max, count, median, p95 and p99."""
+    median, p95, p99 = np.quantile(data, [0.5, 0.95, 0.99])
     return {
         "mean": float(np.mean(data)),
         "std": float(np.std(data, ddof=1)) if len(data) > 1 else 0.0,
         "min": float(np.min(data)),
         "max": float(np.max(data)),
-        "count": len(data)
+        "count": len(data),
+        "median": float(median),
+        "p95": float(p95),
+        "p99": float(p99)
+    }
+
+BOOTSTRAP_STATISTICS = ("mean", "median", "trimmed_mean")
+BOOTSTRAP_EFFECTS = ("difference", "ratio")
+BOOTSTRAP_METHODS = ("percentile", "bca")
+RESAMPLING_SCHEMES = ("poisson", "multinomial")
+
+# Upper bound on resample weights held in memory per chunk (resamples x unique values)
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+# Cap on resamples per chunk so work splits across workers even for small arms
+BOOTSTRAP_CHUNK_RESAMPLES = 500
+# Below this many resample weights a process pool costs more to start than it saves
+BOOTSTRAP_PARALLEL_ELEMENTS = 50_000_000
+# Number of delete-a-group jackknife replicates used for the BCa acceleration
+JACKKNIFE_GROUPS = 100
+
+def compress(data: ArrayLike, decimals: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted unique values and their counts (float64).
+
+    Resampling a sample is the same as reweighting its distinct values, so
+    the bootstrap costs O(unique values) per resample instead of O(n).
+    Rounding to the metric's reporting precision with decimals shrinks the
+    support of continuous metrics further.
+    """
+    arr = as_float64(data)
+    if decimals is not None:
+        arr = np.round(arr, decimals)
+    values, counts = np.unique(arr, return_counts=True)
+    return values, counts.astype(np.float64)
+
+def weighted_statistic(values: np.ndarray, weights: np.ndarray, statistic: str, trim: float = 0.1) -> np.ndarray:
+    """Statistic of sorted distinct values under each row of an integer weight matrix.
+
+    For integer weights the results equal np.mean, np.median and
+    scipy.stats.trim_mean on the expanded sample. Rows with zero total
+    weight give NaN.
+    """
+    weights = np.atleast_2d(weights)
+    total = weights.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if statistic == "mean":
+            return weights @ values / total
+        cum = np.cumsum(weights, axis=1)
+        if statistic == "median":
+            # 1-based ranks of the two middle order statistics (equal for odd totals)
+            lower = (cum < np.floor((total + 1) / 2)[:, None]).sum(axis=1)
+            upper = (cum < (np.floor(total / 2) + 1)[:, None]).sum(axis=1)
+            last = values.size - 1
+            median = (values[np.minimum(lower, last)] + values[np.minimum(upper, last)]) / 2
+            return np.where(total > 0, median, np.nan)
+        if statistic == "trimmed_mean":
+            # Cut floor(trim * n) observations from each end, as scipy's trim_mean does
+            cut = np.floor(trim * total)[:, None]
+            keep_to = total[:, None] - cut
+            kept = np.clip(cum, cut, keep_to) - np.clip(cum - weights, cut, keep_to)
+            return kept @ values / (keep_to[:, 0] - cut[:, 0])
+    raise ValueError(f"Unknown statistic '{statistic}'. Expected one of {', '.join(BOOTSTRAP_STATISTICS)}")
+
+def _effect(treatment: np.ndarray, control: np.ndarray, effect: str) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return treatment - control if effect == "difference" else treatment / control
+
+def _resample_weights(rng: np.random.Generator, counts: np.ndarray, size: int, resampling: str) -> np.ndarray:
+    if resampling == "poisson":
+        # Each observation appears Poisson(1) times, so a value seen c times gets Poisson(c)
+        return rng.poisson(counts, size=(size, counts.size)).astype(np.float64)
+    n = int(counts.sum())
+    return rng.multinomial(n, counts / n, size=size).astype(np.float64)
+
+def _bootstrap_chunk(arms, statistic: str, trim: float, resampling: str,
+                     size: int, seed_seq: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed_seq)
+    return tuple(
+        weighted_statistic(values, _resample_weights(rng, counts, size, resampling), statistic, trim)
+        for values, counts in arms
+    )
+
+# Set once per worker process so the compressed arms are not re-pickled for every chunk
+_worker_arms = None
+
+def _init_bootstrap_worker(arms):
+    global _worker_arms
+    _worker_arms = arms
+
+def _bootstrap_worker_chunk(args) -> Tuple[np.ndarray, np.ndarray]:
+    return _bootstrap_chunk(_worker_arms, *args)
+
+def _jackknife(values: np.ndarray, counts: np.ndarray, statistic: str, trim: float,
+               rng: np.random.Generator) -> np.ndarray:
+    """Delete-a-group jackknife replicates of the statistic.
+
+    Observations are split at random into JACKKNIFE_GROUPS groups (one per
+    observation for small samples), so the cost stays bounded for
+    multi-million-row arms.
+    """
+    n = int(counts.sum())
+    n_groups = min(n, JACKKNIFE_GROUPS)
+    value_index = np.repeat(np.arange(values.size), counts.astype(np.int64))
+    group = rng.permutation(n) % n_groups
+    step = max(1, BOOTSTRAP_CHUNK_ELEMENTS // values.size)
+    replicates = []
+    for start in range(0, n_groups, step):
+        stop = min(n_groups, start + step)
+        in_chunk = (group >= start) & (group < stop)
+        flat = (group[in_chunk] - start) * values.size + value_index[in_chunk]
+        removed = np.bincount(flat, minlength=(stop - start) * values.size).reshape(stop - start, values.size)
+        replicates.append(weighted_statistic(values, counts - removed, statistic, trim))
+    return np.concatenate(replicates)
+
+def _acceleration(*replicates: np.ndarray) -> float:
+    """BCa acceleration from jackknife replicates of the effect, pooled over both arms."""
+    influence = np.concatenate([r.mean() - r for r in replicates])
+    denom = 6 * np.sum(influence**2)**1.5
+    return float(np.sum(influence**3) / denom) if denom > 0 else 0.0
+
+def bootstrap_ci(control: ArrayLike, treatment: ArrayLike, statistic: str = "mean", effect: str = "difference",
+                 method: str = "bca", resampling: str = "poisson", n_resamples: int = 10_000, alpha: float = 0.05,
+                 trim: float = 0.1, seed: Optional[int] = None, n_jobs: int = 1,
+                 decimals: Optional[int] = None) -> Dict:
+    """Bootstrap CI for treatment vs control on the mean, median or trimmed mean.
+
+    effect is the treatment minus control statistic ("difference") or their
+    quotient ("ratio"). Arms are compressed to distinct values and resampled
+    in chunks of weight matrices bounded by BOOTSTRAP_CHUNK_ELEMENTS, either
+    with Poisson(1) weights per observation or multinomially (the classic
+    index-resampling bootstrap). Every chunk gets its own child SeedSequence,
+    so a given seed reproduces the same interval for any n_jobs.
+    """
+    if statistic not in BOOTSTRAP_STATISTICS:
+        raise ValueError(f"Unknown statistic '{statistic}'. Expected one of {', '.join(BOOTSTRAP_STATISTICS)}")
+    if effect not in BOOTSTRAP_EFFECTS:
+        raise ValueError(f"Unknown effect '{effect}'. Expected one of {', '.join(BOOTSTRAP_EFFECTS)}")
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown method '{method}'. Expected one of {', '.join(BOOTSTRAP_METHODS)}")
+    if resampling not in RESAMPLING_SCHEMES:
+        raise ValueError(f"Unknown resampling '{resampling}'. Expected one of {', '.join(RESAMPLING_SCHEMES)}")
+    if not 0 <= trim < 0.5:
+        raise ValueError("trim must be in [0, 0.5)")
+    if n_resamples < 2:
+        raise ValueError("Need at least two resamples")
+
+    arms = (compress(control, decimals), compress(treatment, decimals))
+    if any(values.size == 0 for values, _ in arms):
+        raise ValueError("Groups cannot be empty")
+
+    control_stat, treatment_stat = (float(weighted_statistic(values, counts, statistic, trim)[0]) for values, counts in arms)
+    estimate = float(_effect(treatment_stat, control_stat, effect))
+
+    support = max(values.size for values, _ in arms)
+    per_chunk = max(1, min(n_resamples, BOOTSTRAP_CHUNK_RESAMPLES, BOOTSTRAP_CHUNK_ELEMENTS // support))
+    sizes = [per_chunk] * (n_resamples // per_chunk)
+    if n_resamples % per_chunk:
+        sizes.append(n_resamples % per_chunk)
+    root = np.random.SeedSequence(seed)
+    jackknife_seq, *chunk_seqs = root.spawn(len(sizes) + 1)
+    tasks = [(statistic, trim, resampling, size, seq) for size, seq in zip(sizes, chunk_seqs)]
+
+    if n_jobs > 1 and len(tasks) > 1 and n_resamples * support >= BOOTSTRAP_PARALLEL_ELEMENTS:
+        # spawn rather than fork: the API server process is multi-threaded
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=ctx,
+                                 initializer=_init_bootstrap_worker, initargs=(arms,)) as pool:
+            chunks = list(pool.map(_bootstrap_worker_chunk, tasks))
+    else:
+        chunks = [_bootstrap_chunk(arms, *task) for task in tasks]
+
+    boot = _effect(np.concatenate([t for _, t in chunks]), np.concatenate([c for c, _ in chunks]), effect)
+    # Poisson resamples can come out empty for tiny arms; ratios can divide by zero
+    boot = boot[np.isfinite(boot)]
+    if boot.size < 2:
+        raise ValueError("Too few valid bootstrap resamples")
+
+    quantiles = np.array([alpha / 2, 1 - alpha / 2])
+    if method == "bca":
+        below = (np.count_nonzero(boot < estimate) + 0.5 * np.count_nonzero(boot == estimate)) / boot.size
+        z0 = special.ndtri(np.clip(below, 0.5 / boot.size, 1 - 0.5 / boot.size))
+        rng = np.random.default_rng(jackknife_seq)
+        control_jack, treatment_jack = (_jackknife(values, counts, statistic, trim, rng) for values, counts in arms)
+        a = _acceleration(_effect(treatment_stat, control_jack, effect), _effect(treatment_jack, control_stat, effect))
+        z = z0 + special.ndtri(quantiles)
+        quantiles = special.ndtr(z0 + z / (1 - a * z))
+    ci_lower, ci_upper = np.quantile(boot, quantiles)
+
+    null = 0.0 if effect == "difference" else 1.0
+    return {
+        "statistic": statistic,
+        "effect": effect,
+        "method": method,
+        "estimate": estimate,
+        "control_statistic": control_stat,
+        "treatment_statistic": treatment_stat,
+        "ci_lower": float(ci_lower),
+        "ci_upper": float(ci_upper),
+        "standard_error": float(np.std(boot, ddof=1)),
+        "n_resamples": int(boot.size),
+        "conclusion": "Significant" if not ci_lower <= null <= ci_upper else "Not Significant",
     }
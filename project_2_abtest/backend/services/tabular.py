@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+# Response media types of the tabular output formats
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Arrow and Parquet output require the 'pyarrow' package")
+    return pa, pq
+
+def rows_to_columns(names: Sequence[str], rows: Sequence[Tuple]) -> Dict[str, List]:
+    """Transpose result rows into {column: values}."""
+    columns = list(zip(*rows)) if rows else [()] * len(names)
+    return {name: list(values) for name, values in zip(names, columns)}
+
+def arrow_schema(fields: Sequence[Tuple[str, type]]):
+    """Arrow schema for (name, python type) pairs, e.g. from SQLAlchemy column.type.python_type."""
+    pa, _ = _pyarrow()
+    types = {int: pa.int64(), float: pa.float64(), str: pa.string(), bool: pa.bool_(), datetime: pa.timestamp("us")}
+    return pa.schema([(name, types.get(python_type, pa.string())) for name, python_type in fields])
+
+def encode_arrow(columns: Dict[str, List], schema=None) -> bytes:
+    """Columns as one Arrow IPC stream."""
+    pa, _ = _pyarrow()
+    table = pa.table(columns, schema=schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def encode_csv(rows: Sequence[Tuple], header: Sequence[str] = None) -> bytes:
+    """CSV bytes for a chunk of rows, with an optional header line first."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header is not None:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buf.getvalue().encode()
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def encode_ndjson(rows: Sequence[Tuple], names: Sequence[str]) -> bytes:
+    """Newline-delimited JSON objects for a chunk of rows."""
+    dumps = json.JSONEncoder(default=_json_default, separators=(",", ":")).encode
+    return "".join(dumps(dict(zip(names, row))) + "\n" for row in rows).encode()
+
+class _ChunkSink:
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet footers record absolute offsets, so report the total written
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+class ParquetStream:
+    """Incremental Parquet encoder: each write() adds a row group and returns the bytes to send.
+
+    Only one row group is held in memory at a time, so a table of any size
+    can be streamed; close() returns the footer.
+    """
+
+    def __init__(self, schema):
+        pa, pq = _pyarrow()
+        self._pa = pa
+        self.schema = schema
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(pa.PythonFile(self._sink, mode="w"), schema)
+
+    def write(self, rows: Sequence[Tuple]) -> bytes:
+        if rows:
+            self._writer.write_table(self._pa.table(rows_to_columns(self.schema.names, rows), schema=self.schema))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
@@ -0,0 +1,122 @@
+import numpy as np
+from typing import Dict, NamedTuple
+from services.statistics import ArrayLike, SufficientStats, welch_arrays
+
+class BivariateStats(NamedTuple):
+    """Mergeable statistics of a metric y and a pre-period covariate x.
+
+    m2_y and m2_x are sums of squared deviations from the means and c_xy
+    the co-moment sum((x - mean_x) * (y - mean_y)). Fields may be arrays
+    (one entry per metric).
+    """
+    n: int
+    mean_y: float
+    mean_x: float
+    m2_y: float
+    m2_x: float
+    c_xy: float
+
+    @classmethod
+    def from_sums(cls, n, sum_y, sum_x, sum_yy, sum_xx, sum_xy) -> "BivariateStats":
+        """Build from raw power sums, e.g. pre-aggregated in a warehouse query.
+
+        Raw sums lose precision when the mean is large relative to the
+        spread; prefer bivariate_statistics when the values are at hand.
+        """
+        n = np.asarray(n, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_y = np.asarray(sum_y, dtype=np.float64) / n
+            mean_x = np.asarray(sum_x, dtype=np.float64) / n
+            return cls(n, mean_y, mean_x, sum_yy - n * mean_y**2, sum_xx - n * mean_x**2, sum_xy - n * mean_x * mean_y)
+
+    @property
+    def metric(self) -> SufficientStats:
+        return SufficientStats(self.n, self.mean_y, self.m2_y)
+
+def bivariate_statistics(y: ArrayLike, x: ArrayLike) -> BivariateStats:
+    """Compute BivariateStats along the last axis in one vectorized pass.
+
+    1-D inputs give scalar fields; metrics x observations matrices give one
+    entry per row.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    if y.shape != x.shape:
+        raise ValueError("Metric and covariate must have the same shape")
+    n = y.shape[-1]
+    if n == 0:
+        return BivariateStats(0, float("nan"), float("nan"), 0.0, 0.0, 0.0)
+    mean_y = y.mean(axis=-1)
+    mean_x = x.mean(axis=-1)
+    dy = y - mean_y[..., None]
+    dx = x - mean_x[..., None]
+    fields = (mean_y, mean_x, np.einsum("...i,...i->...", dy, dy),
+              np.einsum("...i,...i->...", dx, dx), np.einsum("...i,...i->...", dx, dy))
+    if y.ndim == 1:
+        return BivariateStats(n, *(float(f) for f in fields))
+    return BivariateStats(np.full(y.shape[:-1], n), *fields)
+
+def merge_bivariate(a: BivariateStats, b: BivariateStats) -> BivariateStats:
+    """Combine the statistics of two disjoint samples (Chan et al. update with a co-moment term)."""
+    if np.all(np.asarray(a.n) == 0):
+        return b
+    if np.all(np.asarray(b.n) == 0):
+        return a
+    n = a.n + b.n
+    dy = b.mean_y - a.mean_y
+    dx = b.mean_x - a.mean_x
+    w = a.n * b.n / n
+    return BivariateStats(
+        n,
+        a.mean_y + dy * b.n / n,
+        a.mean_x + dx * b.n / n,
+        a.m2_y + b.m2_y + dy**2 * w,
+        a.m2_x + b.m2_x + dx**2 * w,
+        a.c_xy + b.c_xy + dx * dy * w,
+    )
+
+def cuped_arrays(control: BivariateStats, treatment: BivariateStats, alpha: float = 0.05) -> Dict[str, np.ndarray]:
+    """CUPED-adjusted Welch's t-test, vectorized like welch_arrays.
+
+    theta is the within-arm pooled regression slope of y on x, so a true
+    treatment effect does not leak into it. Each arm's metric is replaced by
+    y - theta * (x - overall mean of x), whose mean and M2 follow directly
+    from the bivariate statistics.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m2_x = np.asarray(control.m2_x, dtype=np.float64) + treatment.m2_x
+        theta = np.where(m2_x > 0, (np.asarray(control.c_xy, dtype=np.float64) + treatment.c_xy) / m2_x, 0.0)
+        n = np.asarray(control.n, dtype=np.float64) + treatment.n
+        mean_x = (control.n * np.asarray(control.mean_x) + treatment.n * np.asarray(treatment.mean_x)) / n
+
+        adjusted = [
+            SufficientStats(
+                s.n,
+                s.mean_y - theta * (s.mean_x - mean_x),
+                np.maximum(s.m2_y - 2 * theta * s.c_xy + theta**2 * s.m2_x, 0.0),
+            )
+            for s in (control, treatment)
+        ]
+        raw_m2 = np.asarray(control.m2_y, dtype=np.float64) + treatment.m2_y
+        variance_reduction = np.where(raw_m2 > 0, 1 - (adjusted[0].m2 + adjusted[1].m2) / raw_m2, 0.0)
+
+    result = welch_arrays(adjusted[0], adjusted[1], alpha)
+    result["estimate"] = np.asarray(adjusted[1].mean) - adjusted[0].mean
+    result["theta"] = theta
+    result["variance_reduction"] = variance_reduction
+    return result
+
+def cuped_from_stats(control: BivariateStats, treatment: BivariateStats, alpha: float = 0.05) -> Dict:
+    """Scalar CUPED analysis with the same fields as welch_ttest_from_stats, plus theta and variance_reduction."""
+    if control.n == 0 or treatment.n == 0:
+        raise ValueError("Groups cannot be empty")
+
+    result = {k: float(v) for k, v in cuped_arrays(control, treatment, alpha).items()}
+    result["conclusion"] = "Significant" if result["p_value"] < alpha else "Not Significant"
+    return result
+
+def cuped_ttest(control: ArrayLike, control_covariate: ArrayLike, treatment: ArrayLike,
+                treatment_covariate: ArrayLike, alpha: float = 0.05) -> Dict:
+    """CUPED-adjusted Welch's t-test from paired (metric, covariate) arrays per arm."""
+    return cuped_from_stats(bivariate_statistics(control, control_covariate),
+                            bivariate_statistics(treatment, treatment_covariate), alpha)
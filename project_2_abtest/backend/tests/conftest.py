@@ -0,0 +1,25 @@
+import os
+import tempfile
+import pytest
+
+# Route tests run against a throwaway SQLite file through aiosqlite
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/abtest_test.db")
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def experiment(client):
+    response = client.post("/api/experiments/", json={
+        "name": "Checkout button",
+        "control_group_name": "Control",
+        "treatment_group_name": "Treatment",
+        "metric_name": "revenue",
+        "metric_type": "continuous"
+    })
+    assert response.status_code == 200
+    return response.json()
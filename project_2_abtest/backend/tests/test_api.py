@@ -0,0 +1,380 @@
+import pytest
+import numpy as np
+from services.statistics import welch_ttest
+
+def test_run_experiment(client, experiment):
+    control = [1.0, 1.2, 1.1, 1.3, 1.0] * 10
+    treatment = [2.0, 2.2, 2.1, 2.3, 2.0] * 10
+    response = client.post(f"/api/experiments/{experiment['id']}/run", json={"control_data": control, "treatment_data": treatment})
+    assert response.status_code == 200
+    assert response.json()["conclusion"] == "Significant"
+    assert response.json()["test_name"] == "welch"
+    assert client.get(f"/api/experiments/{experiment['id']}").json()["status"] == "completed"
+    assert len(client.get(f"/api/results/{experiment['id']}", params={"test_name": "welch"}).json()) == 1
+
+def test_repeated_run_is_served_from_cache(client, experiment):
+    payload = {"control_data": [1.0, 1.2, 1.1, 1.3], "treatment_data": [2.0, 2.2, 2.1, 2.4]}
+    url = f"/api/experiments/{experiment['id']}/run"
+    first = client.post(url, json=payload)
+    second = client.post(url, json=payload)
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("miss", "hit")
+    assert second.json() == first.json()
+    assert len(client.get(f"/api/results/{experiment['id']}").json()) == 1
+
+    forced = client.post(url, json=payload, params={"force": True})
+    assert forced.headers["x-cache"] == "miss" and forced.json()["id"] != first.json()["id"]
+    assert client.get(url.replace(f"experiments/{experiment['id']}/run", "cache/stats")).json()["hits"] >= 1
+
+def test_unknown_experiment(client):
+    assert client.get("/api/experiments/999999").status_code == 404
+    response = client.post("/api/experiments/999999/run", json={"control_data": [1.0], "treatment_data": [2.0]})
+    assert response.status_code == 404
+
+def test_results_keyset_pagination_filters_and_projection(client, experiment):
+    for shift in (0.0, 5.0, 0.0, 5.0, 5.0):
+        client.post(f"/api/experiments/{experiment['id']}/run", params={"force": True},
+                    json={"control_data": [1.0, 1.1, 0.9, 1.05], "treatment_data": [1.0 + shift, 1.1 + shift, 0.9 + shift, 1.0 + shift]})
+    url = f"/api/results/{experiment['id']}"
+    first = client.get(url, params={"limit": 2})
+    second = client.get(url, params={"limit": 2, "cursor": first.headers["x-next-cursor"]})
+    ids = [r["id"] for r in first.json() + second.json()]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 4
+    assert len(client.get(url, params={"significant": True}).json()) == 3
+
+    projected = client.get(url, params={"fields": ["p_value", "conclusion"]}).json()
+    assert set(projected[0]) == {"id", "p_value", "conclusion"}
+    assert client.get(url, params={"fields": ["password"]}).status_code == 400
+
+    summaries = client.get("/api/experiments/summary", params={"status": "completed"}).json()
+    summary = next(s for s in summaries if s["id"] == experiment["id"])
+    assert summary["result_count"] == 5
+    assert summary["latest_result"]["id"] == ids[0]
+    experiments = client.get("/api/experiments/", params={"metric_type": "continuous", "fields": ["name"]}).json()
+    assert all(set(e) == {"id", "name"} for e in experiments)
+
+def test_get_responses_carry_etags_and_compress(client, experiment):
+    url = f"/api/experiments/{experiment['id']}"
+    first = client.get(url)
+    assert first.headers["etag"].startswith('W/"')
+    assert client.get(url, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    listing = client.get("/api/power/curve", params={"sample_sizes": list(range(100, 5000, 10)), "effect_size": 0.2},
+                         headers={"Accept-Encoding": "gzip"})
+    assert listing.status_code == 200
+    assert listing.headers["content-encoding"] == "gzip"
+
+def test_incremental_observations_match_full_run(client, experiment):
+    rng = np.random.default_rng(0)
+    control, treatment = rng.normal(0, 1, 300), rng.normal(0.2, 1, 400)
+    for c, t in zip(np.array_split(control, 3), np.array_split(treatment, 3)):
+        response = client.post(f"/api/experiments/{experiment['id']}/observations",
+                               json={"control_data": c.tolist(), "treatment_data": t.tolist()})
+        assert response.status_code == 200
+    assert [arm["count"] for arm in response.json()] == [300, 400]
+
+    result = client.post(f"/api/experiments/{experiment['id']}/observations/analyze").json()
+    assert result["p_value"] == pytest.approx(welch_ttest(control, treatment)["p_value"], rel=1e-9)
+    assert result["test_name"] == "welch"
+    assert client.get(f"/api/experiments/{experiment['id']}").json()["status"] == "completed"
+
+def test_streamed_quantiles_from_sketches(client, experiment):
+    rng = np.random.default_rng(5)
+    control, treatment = rng.lognormal(0, 1, 3000), rng.lognormal(0.3, 1, 3000)
+    for c, t in zip(np.array_split(control, 3), np.array_split(treatment, 3)):
+        client.post(f"/api/experiments/{experiment['id']}/observations",
+                    json={"control_data": c.tolist(), "treatment_data": t.tolist()})
+
+    response = client.get(f"/api/experiments/{experiment['id']}/observations/quantiles", params={"q": [0.5, 0.99]})
+    assert response.status_code == 200
+    summaries = response.json()
+    assert [arm["count"] for arm in summaries] == [3000, 3000]
+    median = summaries[0]["quantiles"][0]
+    assert median["value"] == pytest.approx(np.quantile(control, 0.5), rel=0.02)
+    assert median["ci_lower"] <= median["value"] <= median["ci_upper"]
+
+    result = client.post(f"/api/experiments/{experiment['id']}/observations/analyze/quantile", params={"q": 0.5}).json()
+    assert result["test_name"] == "quantile_difference"
+    assert result["ci_lower"] < result["estimate"] < result["ci_upper"]
+    assert result["conclusion"] == "Significant"
+
+def test_multi_arm_experiment(client):
+    experiment = client.post("/api/experiments/", json={
+        "name": "Pricing page", "control_group_name": "Current", "treatment_group_name": "New",
+        "metric_name": "revenue", "metric_type": "continuous",
+        "variants": [{"name": "A"}, {"name": "B"}, {"name": "C"}, {"name": "D"}],
+    }).json()
+    variants = client.get(f"/api/experiments/{experiment['id']}/variants").json()
+    assert [(v["name"], v["is_control"]) for v in variants] == [("A", True), ("B", False), ("C", False), ("D", False)]
+
+    rng = np.random.default_rng(6)
+    data = {name: rng.normal(shift, 1, 200).tolist() for name, shift in zip("ABCD", (0, 0, 0, 1))}
+    results = client.post(f"/api/experiments/{experiment['id']}/run/variants", json={"data": data}).json()
+    assert results[0]["test_name"] == "welch_anova" and results[0]["conclusion"] == "Significant"
+    assert [(r["baseline"], r["variant"]) for r in results[1:]] == [("A", "B"), ("A", "C"), ("A", "D")]
+    assert results[3]["conclusion"] == "Significant"
+
+    for half in (0, 1):
+        client.post(f"/api/experiments/{experiment['id']}/variants/observations",
+                    json={"data": {name: values[half * 100:(half + 1) * 100] for name, values in data.items()}})
+    streamed = client.post(f"/api/experiments/{experiment['id']}/variants/analyze").json()
+    assert streamed[3]["p_value"] == pytest.approx(results[3]["p_value"], rel=1e-9)
+
+    response = client.post(f"/api/experiments/{experiment['id']}/run/variants", json={"data": {"Z": [1.0, 2.0]}})
+    assert response.status_code == 400
+
+def test_variant_accumulators_are_separate_from_arm_accumulators(client):
+    experiment = client.post("/api/experiments/", json={
+        "name": "Colliding names", "control_group_name": "A", "treatment_group_name": "B",
+        "metric_name": "revenue", "metric_type": "continuous",
+        "variants": [{"name": "control"}, {"name": "treatment"}, {"name": "other"}],
+    }).json()
+    client.post(f"/api/experiments/{experiment['id']}/observations",
+                json={"control_data": [1.0, 2.0, 3.0], "treatment_data": [2.0, 3.0, 4.0, 5.0]})
+    variants = client.post(f"/api/experiments/{experiment['id']}/variants/observations",
+                           json={"data": {"control": [10.0] * 5 + [11.0] * 5, "treatment": [12.0] * 6}}).json()
+    assert [(v["arm"], v["count"]) for v in variants] == [("control", 10), ("treatment", 6)]
+
+    arms = client.get(f"/api/experiments/{experiment['id']}/observations").json()
+    assert [(a["arm"], a["count"], a["mean"]) for a in arms] == [("control", 3, 2.0), ("treatment", 4, 3.5)]
+
+def test_segmented_run_bulk_writes_results(client, experiment):
+    rng = np.random.default_rng(7)
+    control, treatment = rng.normal(0, 1, 600), rng.normal(0, 1, 600)
+    control_keys, treatment_keys = ["DE", "FR", "US"] * 200, ["DE", "FR", "US"] * 200
+    treatment[0::3] += 1.0
+    response = client.post(f"/api/experiments/{experiment['id']}/run/segments", json={
+        "control_data": control.tolist(), "treatment_data": treatment.tolist(),
+        "control_segments": {"country": control_keys}, "treatment_segments": {"country": treatment_keys},
+    })
+    assert response.status_code == 200
+    results = response.json()
+    assert [(r["segment_dimension"], r["segment"]) for r in results] == [
+        ("country", "DE"), ("country", "FR"), ("country", "US"), ("country", None)]
+    assert results[0]["conclusion"] == "Significant"
+    assert results[3]["test_name"] == "cochran_q" and results[3]["conclusion"] == "Significant"
+
+def test_bootstrap_run_stores_interval(client, experiment):
+    rng = np.random.default_rng(4)
+    response = client.post(f"/api/experiments/{experiment['id']}/run/bootstrap", json={
+        "control_data": rng.exponential(1.0, 400).tolist(),
+        "treatment_data": rng.exponential(2.0, 400).tolist(),
+        "statistic": "median",
+        "n_resamples": 1000,
+        "seed": 1,
+    })
+    assert response.status_code == 200
+    result = response.json()
+    assert result["test_name"] == "bootstrap_median_difference"
+    assert result["ci_method"] == "bca"
+    assert 0 < result["ci_lower"] < result["estimate"] < result["ci_upper"]
+    assert result["conclusion"] == "Significant"
+
+def test_sequential_looks_stop_early(client, experiment):
+    rng = np.random.default_rng(5)
+    statuses = []
+    for _ in range(5):
+        response = client.post(f"/api/experiments/{experiment['id']}/sequential", json={
+            "control_data": rng.normal(0, 1, 200).tolist(),
+            "treatment_data": rng.normal(0.5, 1, 200).tolist(),
+            "method": "group_sequential",
+            "max_sample_size": 1000,
+        })
+        if response.status_code != 200:
+            break
+        statuses.append(response.json())
+    assert [look["look"] for look in statuses] == list(range(1, len(statuses) + 1))
+    assert statuses[-1]["conclusion"] == "Significant"
+    assert client.get(f"/api/experiments/{experiment['id']}").json()["status"] == "stopped_early"
+    assert response.status_code == 400
+
+def test_failed_look_does_not_fold_in_its_batch(client, experiment):
+    look = {"control_data": [0.0, 1.0, 2.0, 1.0] * 25, "treatment_data": [1.0, 0.0, 2.0, 1.0] * 25,
+            "method": "group_sequential", "max_sample_size": 1000}
+    assert client.post(f"/api/experiments/{experiment['id']}/sequential", json=look).status_code == 200
+    # A larger horizon makes the information fraction go backwards, so the look is rejected
+    response = client.post(f"/api/experiments/{experiment['id']}/sequential", json={**look, "max_sample_size": 100_000})
+    assert response.status_code == 400
+    arms = client.get(f"/api/experiments/{experiment['id']}/observations").json()
+    assert [arm["count"] for arm in arms] == [100, 100]
+    assert client.post(f"/api/experiments/{experiment['id']}/sequential", json=look).json()["look"] == 2
+
+def test_msprt_mixture_scale_is_fixed_at_first_look(client, experiment):
+    rng = np.random.default_rng(8)
+    looks = []
+    for scale in (1.0, 5.0):
+        response = client.post(f"/api/experiments/{experiment['id']}/sequential", json={
+            "control_data": rng.normal(0, scale, 100).tolist(), "treatment_data": rng.normal(0, scale, 100).tolist(),
+            "stop_on_reject": False,
+        })
+        assert response.status_code == 200
+        looks.append(response.json())
+    assert looks[0]["mixture_scale"] == pytest.approx(0.1, rel=0.3)
+    assert looks[1]["mixture_scale"] == looks[0]["mixture_scale"]
+
+def test_streamed_cuped_matches_single_run(client, experiment):
+    rng = np.random.default_rng(6)
+    xc, xt = rng.normal(5, 1, 600), rng.normal(5, 1, 600)
+    yc, yt = xc + rng.normal(0, 0.5, 600), xt + 0.1 + rng.normal(0, 0.5, 600)
+    for idx in np.array_split(np.arange(600), 3):
+        response = client.post(f"/api/experiments/{experiment['id']}/observations", json={
+            "control_data": yc[idx].tolist(), "control_covariate": xc[idx].tolist(),
+            "treatment_data": yt[idx].tolist(), "treatment_covariate": xt[idx].tolist(),
+        })
+        assert response.status_code == 200
+    response = client.post(f"/api/experiments/{experiment['id']}/observations", json={"control_data": [1.0]})
+    assert response.status_code == 400
+
+    streamed = client.post(f"/api/experiments/{experiment['id']}/observations/analyze/cuped").json()
+    single = client.post(f"/api/experiments/{experiment['id']}/run/cuped", json={
+        "control_data": yc.tolist(), "control_covariate": xc.tolist(),
+        "treatment_data": yt.tolist(), "treatment_covariate": xt.tolist(),
+    }).json()
+    assert streamed["test_name"] == single["test_name"] == "cuped"
+    assert streamed["p_value"] == pytest.approx(single["p_value"], rel=1e-9)
+    assert streamed["estimate"] == pytest.approx(single["estimate"], rel=1e-9)
+
+def test_ratio_run_from_sums(client, experiment):
+    rng = np.random.default_rng(7)
+    arms = {}
+    for arm, p in (("control", 0.1), ("treatment", 0.14)):
+        sessions = rng.poisson(4, 2000) + 1.0
+        clicks = rng.binomial(sessions.astype(int), p).astype(float)
+        arms[arm] = {
+            "n": sessions.size, "sum_numerator": clicks.sum(), "sum_denominator": sessions.sum(),
+            "sum_numerator_sq": clicks @ clicks, "sum_denominator_sq": sessions @ sessions, "sum_cross": clicks @ sessions,
+        }
+    response = client.post(f"/api/experiments/{experiment['id']}/run/ratio",
+                           json={"control_sums": arms["control"], "treatment_sums": arms["treatment"]})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["test_name"] == "ratio_delta"
+    assert result["conclusion"] == "Significant"
+    assert result["ci_lower"] < result["estimate"] < result["ci_upper"]
+
+    response = client.post(f"/api/experiments/{experiment['id']}/run/ratio", json={"control_sums": arms["control"]})
+    assert response.status_code == 400
+
+def test_binary_metric_runs_from_counts(client):
+    experiment = client.post("/api/experiments/", json={
+        "name": "Signup", "control_group_name": "Control", "treatment_group_name": "Treatment",
+        "metric_name": "converted", "metric_type": "binary"
+    }).json()
+    response = client.post(f"/api/experiments/{experiment['id']}/run/counts", json={
+        "control_successes": 2_000_000, "control_trials": 20_000_000,
+        "treatment_successes": 2_010_000, "treatment_trials": 20_000_000,
+    })
+    assert response.status_code == 200
+    result = response.json()
+    assert result["test_name"] == "two_proportion_z"
+    assert result["estimate"] == pytest.approx(0.0005)
+
+    # Raw 0/1 runs on a binary experiment are reduced to counts
+    result = client.post(f"/api/experiments/{experiment['id']}/run",
+                         json={"control_data": [0, 1, 0, 0], "treatment_data": [1, 1, 0, 1]}).json()
+    assert result["test_name"] == "two_proportion_z"
+    assert result["estimate"] == pytest.approx(0.5)
+
+    # Segmented runs hold binary metrics to 0/1 values as well
+    response = client.post(f"/api/experiments/{experiment['id']}/run/segments", json={
+        "control_data": [0, 1, 2, 0], "treatment_data": [1, 1, 0, 1],
+        "control_segments": {"country": ["DE"] * 4}, "treatment_segments": {"country": ["DE"] * 4},
+    })
+    assert response.status_code == 400 and "0/1" in response.json()["detail"]
+
+def test_rank_tests(client, experiment):
+    payload = {"control_data": [1.0, 2.0, 2.0, 3.0, 4.0], "treatment_data": [3.0, 5.0, 6.0, 7.0]}
+    for test, name in (("mannwhitney", "mann_whitney"), ("mannwhitney_sketch", "mann_whitney_sketch")):
+        response = client.post(f"/api/experiments/{experiment['id']}/run", params={"test": test}, json=payload)
+        assert response.status_code == 200
+        assert response.json()["test_name"] == name
+    response = client.post(f"/api/experiments/{experiment['id']}/run", params={"test": "median"}, json=payload)
+    assert response.status_code == 400
+
+    response = client.post(f"/api/experiments/{experiment['id']}/run/histogram",
+                           json={"control_counts": [50, 30, 20], "treatment_counts": [30, 30, 40]})
+    assert response.status_code == 200
+    assert response.json()["test_name"] == "mann_whitney_binned"
+
+def test_counts_rejected_for_continuous_metric(client, experiment):
+    response = client.post(f"/api/experiments/{experiment['id']}/run/counts", json={
+        "control_successes": 1, "control_trials": 2, "treatment_successes": 1, "treatment_trials": 2,
+    })
+    assert response.status_code == 400
+
+def test_bulk_create_update_and_run(client):
+    base = {"control_group_name": "A", "treatment_group_name": "B", "metric_name": "revenue", "metric_type": "continuous"}
+    created = client.post("/api/experiments/bulk", json=[
+        {**base, "name": "bulk one"},
+        {**base, "name": "bulk two", "variants": [{"name": "A"}, {"name": "B"}, {"name": "C"}]},
+        {**base, "name": "bad", "variants": [{"name": "A"}]},
+        {**base, "name": "bulk binary", "metric_type": "binary"},
+    ]).json()
+    assert [item["status"] for item in created] == ["created", "created", "failed", "created"]
+    assert "two variants" in created[2]["error"]
+    one, two, binary = (created[i]["experiment"]["id"] for i in (0, 1, 3))
+    assert [v["is_control"] for v in client.get(f"/api/experiments/{two}/variants").json()] == [True, False, False]
+
+    updated = client.patch("/api/experiments/bulk", json=[
+        {"id": one, "status": "paused"}, {"id": two, "name": "renamed"}, {"id": 10**9, "status": "paused"},
+        {"id": binary, "name": None}]).json()
+    assert [item["status"] for item in updated] == ["updated", "updated", "failed", "failed"]
+    assert updated[3]["error"].startswith("name:")
+    assert client.get(f"/api/experiments/{binary}").json()["name"] == "bulk binary"
+    assert updated[0]["experiment"]["status"] == "paused" and updated[0]["experiment"]["name"] == "bulk one"
+    assert updated[1]["experiment"]["name"] == "renamed"
+
+    control, treatment = [1.0, 2.0, 3.0, 4.0], [3.0, 4.0, 5.0, 6.5]
+    runs = client.post("/api/experiments/bulk/run", json={"runs": [
+        {"experiment_id": one, "control_data": control, "treatment_data": treatment},
+        {"experiment_id": two, "control_data": control, "treatment_data": treatment, "test": "mannwhitney"},
+        {"experiment_id": one, "control_data": [], "treatment_data": treatment},
+        {"experiment_id": binary, "control_data": [0, 1, 0, 0], "treatment_data": [1, 1, 0, 1]},
+        {"experiment_id": 10**9, "control_data": control, "treatment_data": treatment},
+    ]}).json()
+    assert [item["status"] for item in runs] == ["completed", "completed", "failed", "completed", "failed"]
+    single = client.post(f"/api/experiments/{one}/run", params={"force": True},
+                         json={"control_data": control, "treatment_data": treatment}).json()
+    assert runs[0]["result"]["p_value"] == pytest.approx(single["p_value"])
+    assert runs[1]["result"]["test_name"] == "mann_whitney"
+    assert runs[3]["result"]["test_name"] == "two_proportion_z"
+    assert client.get(f"/api/experiments/{one}").json()["status"] == "completed"
+
+def test_simulation_rejects_unknown_fitted_distribution(client):
+    response = client.post("/api/power/simulate", json={
+        "sample_sizes": [50], "lift": 0.1, "baseline": [1.0, 2.0, 3.5, 4.0], "distribution": "not_a_distribution",
+        "fit_distribution": True, "n_simulations": 10})
+    assert response.status_code == 400
+
+def test_simulation_bounds_sample_sizes(client):
+    base = {"lift": 0.1, "distribution": "norm", "n_simulations": 10}
+    for sample_sizes in ([10**9], [], [50] * 101, [1]):
+        assert client.post("/api/power/simulate", json={**base, "sample_sizes": sample_sizes}).status_code == 422
+        assert client.post("/api/power/simulate/jobs", json={**base, "sample_sizes": sample_sizes}).status_code == 422
+
+def test_power_endpoints_reject_probabilities_outside_unit_interval(client):
+    assert client.post("/api/power/sample-size/batch", json={"effect_size": [0.2, 0.5], "alpha": 1.5}).status_code == 422
+    assert client.post("/api/power/mde/batch", json={"n": [100], "power": [0.8, 0.0]}).status_code == 422
+    assert client.post("/api/power/power/batch", json={"n": 100, "effect_size": "NaN"}).status_code == 422
+    assert client.get("/api/power/sample-size", params={"effect_size": 0.3, "power": 1.0}).status_code == 422
+    grid = client.get("/api/power/grid", params={"sample_sizes": [100], "effect_sizes": [0.2], "powers": [0.8, 1.2]})
+    assert grid.status_code == 400
+    assert client.post("/api/power/sample-size/batch", json={"effect_size": [0.2], "alpha": [0.05]}).status_code == 200
+
+def test_batch_run_ignores_nan_p_values_in_correction(client, experiment):
+    response = client.post(f"/api/experiments/{experiment['id']}/run/batch", json={
+        "metric_names": ["constant", "revenue", "clicks"],
+        "control_data": [[1, 1, 1, 1], [1.0, 1.1, 0.9, 1.0, 1.05], [2.0, 2.1, 1.9, 2.0, 2.05]],
+        "treatment_data": [[1, 1, 1, 1], [3.0, 3.1, 2.9, 3.0, 3.05], [5.0, 5.1, 4.9, 5.0, 5.05]],
+    })
+    assert response.status_code == 200
+    constant, revenue, clicks = response.json()
+    assert constant["adjusted_p_value"] is None and constant["conclusion"] == "Not Significant"
+    assert revenue["conclusion"] == clicks["conclusion"] == "Significant"
+    assert revenue["adjusted_p_value"] < 0.05
+
+def test_bulk_analysis_reports_unexpected_errors_per_item():
+    from routes.experiments import analyse_runs
+    tasks = [("continuous", "welch", [1.0, 2.0, 3.0], [2.0, 3.0, 4.0]), ("continuous", "welch", None, [1.0, 2.0])]
+    ok, bad = analyse_runs(tasks, workers=2)
+    assert ok["fields"]["test_name"] == "welch"
+    assert "NoneType" in bad["error"]
@@ -0,0 +1,23 @@
+import numpy as np
+from services.cache import AnalysisCache, fingerprint
+
+def test_fingerprint_covers_buffers_and_parameters():
+    data = np.arange(10, dtype=np.float64)
+    assert fingerprint(data, data[:3], test="welch") == fingerprint(data.tolist(), [0.0, 1.0, 2.0], test="welch")
+    assert fingerprint(data[:2], data[2:]) != fingerprint(data[:3], data[3:])
+    assert fingerprint(data, data, test="welch") != fingerprint(data, data, test="mannwhitney")
+
+def test_lru_and_ttl_eviction(monkeypatch):
+    cache = AnalysisCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" was least recently used
+    assert cache.get("b") is None and cache.get("c") == 3
+
+    now = __import__("time").monotonic()
+    monkeypatch.setattr("services.cache.time.monotonic", lambda: now + 11)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 2)
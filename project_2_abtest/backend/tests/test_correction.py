@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from services.correction import MultipleTestingCorrection
 
 def test_bonferroni():
@@ -29,3 +30,43 @@ def test_empty_correction():
     assert res["p_values"] == []
     res_fdr = MultipleTestingCorrection.fdr([])
     assert res_fdr["p_values"] == []
+
+def test_holm_and_hochberg():
+    p_values = [0.01, 0.04, 0.03, 0.2]
+    holm = MultipleTestingCorrection.holm(p_values)
+    # Sorted: 0.01*4=0.04, 0.03*3=0.09, 0.04*2=0.08 -> max so far 0.09, 0.2*1 -> 0.2
+    assert holm["adjusted_p_values"] == pytest.approx([0.04, 0.09, 0.09, 0.2])
+    hochberg = MultipleTestingCorrection.hochberg(p_values)
+    assert hochberg["adjusted_p_values"] == pytest.approx([0.04, 0.08, 0.08, 0.2])
+
+def test_by_is_more_conservative_than_bh():
+    p_values = [0.001, 0.01, 0.02, 0.5]
+    bh = MultipleTestingCorrection.fdr(p_values)["adjusted_p_values"]
+    by = MultipleTestingCorrection.by(p_values)["adjusted_p_values"]
+    c_n = 1 + 1/2 + 1/3 + 1/4
+    assert by == pytest.approx([min(x * c_n, 1.0) for x in bh])
+
+def test_storey_qvalues():
+    rng = np.random.default_rng(0)
+    p_values = np.concatenate([rng.uniform(size=900), rng.uniform(0, 1e-3, size=100)])
+    res = MultipleTestingCorrection.storey(p_values)
+    assert isinstance(res["adjusted_p_values"], np.ndarray)
+    assert 0.8 < res["pi0"] <= 1.0
+    bh = MultipleTestingCorrection.fdr(p_values)["adjusted_p_values"]
+    assert np.all(res["adjusted_p_values"] <= bh + 1e-15)
+
+def test_adjust_dispatch():
+    res = MultipleTestingCorrection.adjust([0.01, 0.02], method="bonferroni")
+    assert res["adjusted_p_values"] == pytest.approx([0.02, 0.04])
+    with pytest.raises(ValueError):
+        MultipleTestingCorrection.adjust([0.01], method="unknown")
+
+def test_nan_p_values_are_left_out():
+    p_values = [3.4e-5, float("nan"), 3.1e-6, 0.2]
+    for method in MultipleTestingCorrection.METHODS:
+        res = MultipleTestingCorrection.adjust(p_values, method)
+        expected = MultipleTestingCorrection.adjust([3.4e-5, 3.1e-6, 0.2], method)["adjusted_p_values"]
+        adjusted = res["adjusted_p_values"]
+        assert np.isnan(adjusted[1]) and res["significant"][1] == False
+        assert [adjusted[0], adjusted[2], adjusted[3]] == pytest.approx(expected)
+        assert res["significant"][0] and res["significant"][2]
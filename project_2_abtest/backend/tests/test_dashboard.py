@@ -0,0 +1,41 @@
+import sqlite3
+import pyarrow as pa
+import pytest
+from sqlalchemy import literal, select
+from sqlalchemy.dialects import sqlite
+
+@pytest.fixture
+def history(client, experiment):
+    for shift in (0.0, 5.0, 6.0):
+        client.post(f"/api/experiments/{experiment['id']}/run", params={"force": True},
+                    json={"control_data": [1.0, 1.1, 0.9, 1.05], "treatment_data": [1.0 + shift, 1.1 + shift, 0.9 + shift, 0.95 + shift]})
+    return experiment
+
+def test_counts_and_latest_are_column_oriented(client, history):
+    counts = client.get("/api/dashboard/counts").json()
+    assert set(counts) == {"status", "metric_type", "count"}
+    assert sum(counts["count"]) == len(client.get("/api/experiments/", params={"limit": 10_000}).json())
+
+    latest = client.get("/api/dashboard/latest").json()
+    row = latest["experiment_id"].index(history["id"])
+    assert latest["result_count"][row] == 3
+    assert latest["conclusion"][row] == "Significant"
+
+    arrow = client.get("/api/dashboard/latest", params={"format": "arrow"})
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.num_rows == len(latest["experiment_id"])
+
+def test_significance_rates(client, history):
+    rates = client.get("/api/dashboard/significance", params={"period": "month"}).json()
+    assert len(rates["period"]) >= 1
+    assert all(0 <= rate <= 1 for rate in rates["significance_rate"])
+    assert sum(rates["results"]) >= 3
+
+def test_weeks_are_bucketed_on_their_monday(client):
+    from routes.dashboard import period_bucket
+    # Sunday 2021-01-03 belongs to ISO week 2020-W53, which starts on Monday 2020-12-28
+    days = {"2021-01-03 12:00:00": "2020-12-28", "2021-01-04 00:00:00": "2021-01-04", "2024-12-31 23:59:59": "2024-12-30"}
+    for day, monday in days.items():
+        query = select(period_bucket(literal(day), "week"))
+        sql = str(query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        assert sqlite3.connect(":memory:").execute(sql).fetchone()[0] == monday
@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine, inspect, text
+import models
+from database import add_missing_columns
+
+def test_existing_tables_gain_new_columns_and_indexes():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        # results as created before the later columns were added
+        conn.execute(text("CREATE TABLE results (id INTEGER PRIMARY KEY, experiment_id INTEGER, p_value FLOAT, "
+                          "conclusion VARCHAR(255), computed_at DATETIME)"))
+        conn.execute(text("INSERT INTO results (experiment_id, p_value) VALUES (1, 0.01)"))
+        added = add_missing_columns(conn)
+
+    assert {"results.test_name", "results.adjusted_p_value", "results.segment"} <= set(added)
+    assert not any(name.startswith("experiments.") for name in added)
+    inspector = inspect(engine)
+    assert {c["name"] for c in inspector.get_columns("results")} == set(models.Result.__table__.columns.keys())
+    assert "ix_results_experiment_id_id" in {index["name"] for index in inspector.get_indexes("results")}
+    with engine.begin() as conn:
+        assert add_missing_columns(conn) == []
+        assert conn.execute(text("SELECT p_value, test_name FROM results")).one() == (0.01, None)
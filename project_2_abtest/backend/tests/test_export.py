@@ -0,0 +1,55 @@
+import io
+import json
+import pyarrow.parquet as pq
+from services.tabular import encode_ndjson, ParquetStream, arrow_schema
+from datetime import datetime
+
+def test_encoders_chunk_by_chunk():
+    fields = [("id", int), ("p_value", float), ("computed_at", datetime)]
+    rows = [(1, 0.5, datetime(2024, 1, 2)), (2, None, None)]
+    lines = encode_ndjson(rows, [name for name, _ in fields]).decode().splitlines()
+    assert json.loads(lines[0]) == {"id": 1, "p_value": 0.5, "computed_at": "2024-01-02T00:00:00"}
+    assert json.loads(lines[1])["p_value"] is None
+
+    stream = ParquetStream(arrow_schema(fields))
+    data = stream.write(rows[:1]) + stream.write(rows[1:]) + stream.close()
+    table = pq.read_table(io.BytesIO(data))
+    assert table.column("id").to_pylist() == [1, 2]
+    assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == 2
+
+def test_incremental_results_export(client, experiment):
+    run = lambda: client.post(f"/api/experiments/{experiment['id']}/run", params={"force": True},
+                              json={"control_data": [1.0, 2.0, 3.0], "treatment_data": [2.0, 3.0, 4.5]})
+    run()
+    first = client.get("/api/export/results", params={"experiment_id": experiment["id"]})
+    assert first.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in first.text.splitlines()]
+    watermark = int(first.headers["X-Export-Watermark"])
+    assert len(rows) == 1 and rows[0]["id"] == watermark
+
+    empty = client.get("/api/export/results", params={"experiment_id": experiment["id"], "since_id": watermark})
+    assert empty.text == "" and int(empty.headers["X-Export-Watermark"]) == watermark
+
+    run()
+    run()
+    parquet = client.get("/api/export/results", params={"experiment_id": experiment["id"], "since_id": watermark,
+                                                        "format": "parquet"})
+    ids = pq.read_table(io.BytesIO(parquet.content)).column("id").to_pylist()
+    assert len(ids) == 2 and min(ids) > watermark
+    assert max(ids) == int(parquet.headers["X-Export-Watermark"])
+
+def test_experiments_export(client, experiment):
+    csv = client.get("/api/export/experiments", params={"format": "csv", "metric_type": "continuous"})
+    header, *lines = csv.text.strip().splitlines()
+    assert header.startswith("id,name") and len(lines) >= 1
+    assert all(",continuous," in line for line in lines)
+
+def test_results_csv_export(client, experiment):
+    for shift in (0.0, 5.0):
+        client.post(f"/api/experiments/{experiment['id']}/run", params={"force": True},
+                    json={"control_data": [1.0, 1.1, 0.9], "treatment_data": [1.0 + shift, 1.1 + shift, 0.9 + shift]})
+    csv = client.get("/api/export/results", params={"experiment_id": experiment["id"], "format": "csv"})
+    assert csv.headers["content-type"].startswith("text/csv")
+    assert 'filename="results_' in csv.headers["content-disposition"]
+    header, *lines = csv.text.strip().splitlines()
+    assert header.startswith("id,experiment_id") and len(lines) == 2
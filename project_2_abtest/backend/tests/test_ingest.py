@@ -0,0 +1,45 @@
+import io
+import pytest
+import numpy as np
+from services.ingest import decode_array, detect_format
+
+def test_decode_raw_float64_is_zero_copy():
+    data = np.array([1.5, 2.5, 3.5], dtype="<f8")
+    payload = data.tobytes()
+    arr = decode_array(payload, "f8")
+    np.testing.assert_array_equal(arr, data)
+    assert not arr.flags.owndata
+
+def test_decode_npy():
+    data = np.arange(10, dtype=np.float32)
+    buf = io.BytesIO()
+    np.save(buf, data)
+    payload = buf.getvalue()
+    assert detect_format(payload) == "npy"
+    arr = decode_array(payload)
+    assert arr.dtype == np.float64
+    np.testing.assert_array_equal(arr, data)
+
+def test_decode_rejects_bad_payloads():
+    with pytest.raises(ValueError):
+        decode_array(b"abc", "f8")
+    with pytest.raises(ValueError):
+        decode_array(np.array([1.0, np.nan]).tobytes(), "f8")
+
+def test_decode_arrow_and_parquet():
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    table = pa.table({"value": [1.0, 2.0, 3.0]})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    arrow_payload = sink.getvalue().to_pybytes()
+    assert detect_format(arrow_payload) == "arrow"
+    np.testing.assert_array_equal(decode_array(arrow_payload), [1.0, 2.0, 3.0])
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    parquet_payload = sink.getvalue().to_pybytes()
+    assert detect_format(parquet_payload) == "parquet"
+    np.testing.assert_array_equal(decode_array(parquet_payload, column="value"), [1.0, 2.0, 3.0])
@@ -0,0 +1,128 @@
+import asyncio
+import gc
+import time
+import pytest
+from services.jobs import JobManager, QueueFullError, COMPLETED, FAILED, CANCELLED
+
+def _fail():
+    raise ValueError("boom")
+
+async def _wait(job, timeout=60):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        await asyncio.sleep(0.05)
+    return job
+
+def _poll(client, job, timeout=60):
+    deadline = time.time() + timeout
+    while job["status"] not in ("completed", "failed", "cancelled") and time.time() < deadline:
+        time.sleep(0.1)
+        job = client.get(f"/api/jobs/{job['id']}").json()
+    return job
+
+def test_job_lifecycle_and_metrics():
+    async def scenario():
+        manager = JobManager(max_workers=1, max_pending=2)
+        try:
+            ok = manager.submit("sum", sum, ([1, 2, 3],))
+            bad = manager.submit("fail", _fail, ())
+            with pytest.raises(QueueFullError):
+                manager.submit("sum", sum, ([1],))
+            await _wait(ok)
+            await _wait(bad)
+            return manager, ok, bad
+        finally:
+            manager.shutdown()
+
+    manager, ok, bad = asyncio.run(scenario())
+    assert ok.status == COMPLETED and ok.result == 6
+    assert ok.run_seconds >= 0 and ok.queue_seconds >= 0
+    assert bad.status == FAILED and bad.error == "boom"
+    metrics = manager.metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["counts"][COMPLETED] == 1 and metrics["counts"][FAILED] == 1
+
+def test_watchers_are_held_until_jobs_finish():
+    async def scenario():
+        manager = JobManager(max_workers=1, max_pending=2)
+        try:
+            job = manager.submit("sleep", time.sleep, (0.2,))
+            gc.collect()
+            held = len(manager._watchers)
+            await _wait(job)
+            await asyncio.sleep(0)
+            return job, held, len(manager._watchers)
+        finally:
+            manager.shutdown()
+
+    job, held, left = asyncio.run(scenario())
+    assert job.status == COMPLETED
+    assert held == 1 and left == 0
+
+def test_cancel_queued_job():
+    async def scenario():
+        manager = JobManager(max_workers=1, max_pending=10)
+        try:
+            blocker = manager.submit("sleep", time.sleep, (1.0,))
+            queued = [manager.submit("sum", sum, ([i],)) for i in range(5)]
+            manager.cancel(queued[-1].id)
+            await _wait(blocker)
+            for job in queued:
+                await _wait(job)
+            return queued
+        finally:
+            manager.shutdown()
+
+    queued = asyncio.run(scenario())
+    assert queued[-1].status == CANCELLED
+    assert queued[-1].result is None
+
+def test_run_job_persists_result(client, experiment):
+    response = client.post(f"/api/experiments/{experiment['id']}/run/jobs", json={
+        "control_data": [10.0, 12.0, 11.0, 13.0, 12.5],
+        "treatment_data": [14.0, 15.0, 13.5, 16.0, 15.5],
+    })
+    assert response.status_code == 202
+    job = _poll(client, response.json())
+    assert job["status"] == "completed"
+    assert job["kind"] == "welch" and job["result"]["test_name"] == "welch"
+    assert job["result"]["experiment_id"] == experiment["id"]
+    assert job["result"]["p_value"] < 0.05
+
+    results = client.get(f"/api/results/{experiment['id']}").json()
+    assert [r["id"] for r in results] == [job["result"]["id"]]
+    assert client.get("/api/jobs/missing").status_code == 404
+
+def test_job_honours_test(client, experiment):
+    data = {"control_data": [10.0, 12.0, 11.0, 13.0, 12.5], "treatment_data": [14.0, 15.0, 13.5, 16.0, 15.5]}
+    url = f"/api/experiments/{experiment['id']}/run/jobs"
+    job = _poll(client, client.post(url, params={"test": "mannwhitney"}, json=data).json())
+    assert job["kind"] == "mannwhitney"
+    assert job["status"] == "completed" and job["result"]["test_name"] == "mann_whitney"
+    assert client.post(url, params={"test": "anova"}, json=data).status_code == 400
+
+def test_bootstrap_job_persists_result(client, experiment):
+    response = client.post(f"/api/experiments/{experiment['id']}/run/bootstrap/jobs", json={
+        "control_data": [10.0, 12.0, 11.0, 13.0, 12.5, 11.5],
+        "treatment_data": [14.0, 15.0, 13.5, 16.0, 15.5, 14.5],
+        "statistic": "mean", "n_resamples": 500, "seed": 1,
+    })
+    assert response.status_code == 202
+    job = _poll(client, response.json())
+    assert job["kind"] == "bootstrap" and job["status"] == "completed"
+    assert job["result"]["test_name"] == "bootstrap_mean_difference"
+    assert job["result"]["ci_lower"] > 0
+    results = client.get(f"/api/results/{experiment['id']}").json()
+    assert [r["id"] for r in results] == [job["result"]["id"]]
+
+def test_simulation_job_returns_curve(client):
+    response = client.post("/api/power/simulate/jobs", json={
+        "sample_sizes": [50, 200], "lift": 0.2, "distribution": "lognorm", "params": {"s": 1.0},
+        "n_simulations": 200, "seed": 3,
+    })
+    assert response.status_code == 202
+    job = _poll(client, response.json())
+    assert job["kind"] == "simulation" and job["status"] == "completed"
+    assert job["experiment_id"] is None
+    assert [row["n"] for row in job["result"]["results"]] == [50, 200]
+    assert client.post("/api/power/simulate/jobs", json={"sample_sizes": [50], "lift": 0.2}).status_code == 400
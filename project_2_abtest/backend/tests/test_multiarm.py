@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from scipy import stats as scipy_stats
+from services.multiarm import anova_oneway, comparison_pairs, multiarm_test, stack_stats, welch_anova
+from services.statistics import sufficient_statistics, welch_ttest
+
+@pytest.fixture
+def arms():
+    rng = np.random.default_rng(0)
+    return [rng.normal(mean, sd, n) for mean, sd, n in ((0, 1, 100), (0.2, 2, 150), (0.5, 1.5, 80), (0, 1, 120))]
+
+def test_omnibus_tests_match_references(arms):
+    s = stack_stats([sufficient_statistics(a) for a in arms])
+    reference = scipy_stats.f_oneway(*arms)
+    assert anova_oneway(s)["statistic"] == pytest.approx(reference.statistic)
+    assert anova_oneway(s)["p_value"] == pytest.approx(reference.pvalue)
+    # statsmodels.stats.oneway.anova_oneway(arms, use_var="unequal") on the same data
+    welch = welch_anova(s)
+    assert welch["statistic"] == pytest.approx(0.4426166486)
+    assert welch["df_within"] == pytest.approx(225.7261260076)
+    assert welch["p_value"] == pytest.approx(0.7227589779)
+
+def test_pairwise_comparisons_are_corrected(arms):
+    names = ["A", "B", "C", "D"]
+    result = multiarm_test(names, [sufficient_statistics(a) for a in arms], "B", comparisons="control", correction="bonferroni")
+    comparisons = result["comparisons"]
+    assert [(c["baseline"], c["variant"]) for c in comparisons] == [("B", "A"), ("B", "C"), ("B", "D")]
+    raw = welch_ttest(arms[1], arms[2])["p_value"]
+    assert comparisons[1]["p_value"] == pytest.approx(raw)
+    assert comparisons[1]["adjusted_p_value"] == pytest.approx(min(1.0, 3 * raw))
+    assert comparisons[1]["estimate"] == pytest.approx(arms[2].mean() - arms[1].mean())
+
+    assert len(comparison_pairs(10, "all")[0]) == 45
+    with pytest.raises(ValueError):
+        multiarm_test(names, [sufficient_statistics(a) for a in arms], "E")
@@ -1,5 +1,6 @@
 import pytest
-from services.power import PowerAnalyzer
+import numpy as np
+from services.power import PowerAnalyzer, z_quantile
 
 def test_sample_size_calculation():
     n = PowerAnalyzer.sample_size(effect_size=0.5, alpha=0.05, power=0.8)
@@ -19,3 +20,32 @@ def test_power_curve():
     curve = PowerAnalyzer.power_curve(sizes, effect_size=0.5)
     assert len(curve) == 3
     assert all(0 <= p <= 1 for p in curve)
+
+def test_vectorized_matches_scalar():
+    sizes = [0, 10, 100, 1000]
+    effects = [0.0, 0.2, 0.5]
+    grid = PowerAnalyzer.grid(sizes, effects, alphas=[0.01, 0.05], powers=[0.8, 0.9])
+    assert grid["power"].shape == (4, 3, 2)
+    assert grid["sample_size"].shape == (3, 2, 2)
+    assert grid["mde"].shape == (4, 2, 2)
+    for i, n in enumerate(sizes):
+        for j, es in enumerate(effects):
+            assert grid["power"][i, j, 1] == pytest.approx(PowerAnalyzer.power(n, es, 0.05), abs=1e-15)
+    assert grid["sample_size"][1, 1, 0] == PowerAnalyzer.sample_size(0.2, 0.05, 0.8)
+    assert grid["mde"][2, 0, 1] == pytest.approx(PowerAnalyzer.minimum_detectable_effect(100, 0.9, 0.01))
+
+def test_z_quantile_cache():
+    z_quantile.cache_clear()
+    PowerAnalyzer.power_curve(list(range(10, 1000, 10)), effect_size=0.3)
+    assert z_quantile.cache_info().misses == 1
+
+def test_array_functions_broadcast_scenarios():
+    n = [100, 200, 400]
+    effect_sizes = [0.2, 0.3, 0.5]
+    alphas = np.linspace(0.01, 0.1, 300)  # many distinct values bypass the per-value cache
+    power = PowerAnalyzer.power_array(n, effect_sizes, 0.05)
+    assert power.tolist() == pytest.approx([PowerAnalyzer.power(a, b) for a, b in zip(n, effect_sizes)], abs=1e-15)
+    sizes = PowerAnalyzer.sample_size_array(0.3, alphas, 0.8)
+    assert sizes.shape == (300,)
+    assert sizes[0] == PowerAnalyzer.sample_size(0.3, alphas[0], 0.8)
+    assert sizes[-1] == PowerAnalyzer.sample_size(0.3, alphas[-1], 0.8)
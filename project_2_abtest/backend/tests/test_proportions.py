@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from scipy import stats as scipy_stats
+from services.proportions import proportion_arrays, proportion_test, proportion_test_from_samples, wilson_interval
+
+def test_wilson_interval_reference():
+    # Newcombe (1998), example with 81/263
+    lower, upper = wilson_interval(81, 263)
+    assert lower == pytest.approx(0.2553, abs=1e-4)
+    assert upper == pytest.approx(0.3662, abs=1e-4)
+
+def test_newcombe_interval_reference():
+    # Newcombe (1998), 56/70 vs 48/80: difference 0.2 with hybrid score interval 0.0524 to 0.3339
+    result = proportion_test(48, 80, 56, 70)
+    assert result["estimate"] == pytest.approx(0.2)
+    assert result["ci_lower"] == pytest.approx(0.0524, abs=1e-4)
+    assert result["ci_upper"] == pytest.approx(0.3339, abs=1e-4)
+
+def test_ztest_matches_uncorrected_chisquare():
+    table = np.array([[120, 880], [150, 850]])
+    result = proportion_test(120, 1000, 150, 1000)
+    chi2 = scipy_stats.chi2_contingency(table, correction=False)
+    assert result["t_statistic"]**2 == pytest.approx(chi2.statistic)
+    assert result["p_value"] == pytest.approx(chi2.pvalue)
+
+    assert proportion_test(120, 1000, 150, 1000, "chisquare")["p_value"] == pytest.approx(scipy_stats.chi2_contingency(table).pvalue)
+    assert proportion_test(120, 1000, 150, 1000, "fisher")["p_value"] == pytest.approx(scipy_stats.fisher_exact(table)[1])
+
+def test_proportion_arrays_vectorized_and_samples():
+    batch = proportion_arrays([10, 200], [100, 1000], [15, 260], [100, 1000])
+    assert batch["p_value"][1] == pytest.approx(proportion_test(200, 1000, 260, 1000)["p_value"])
+    samples = proportion_test_from_samples([0, 1, 1, 0, 0], [1, 1, 1, 0, 1])
+    assert samples["estimate"] == pytest.approx(0.8 - 0.4)
+    with pytest.raises(ValueError):
+        proportion_test_from_samples([0, 0.5], [1, 0])
+    with pytest.raises(ValueError):
+        proportion_test(11, 10, 5, 10)
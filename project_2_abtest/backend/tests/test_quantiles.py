@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from services.quantiles import quantile_difference_arrays, quantile_interval, quantile_test
+from services.sketch import QuantileSketch
+
+def test_order_statistic_interval_brackets_sample_quantile():
+    rng = np.random.default_rng(0)
+    data = rng.exponential(1.0, 10_000)
+    values, lower, upper = quantile_interval(QuantileSketch.from_data(data), [0.5, 0.95, 0.99])
+    np.testing.assert_allclose(values, np.quantile(data, [0.5, 0.95, 0.99], method="lower"), rtol=0.011)
+    assert np.all(lower <= values) and np.all(values <= upper)
+    # Exponential(1) quantiles are -log(1 - q)
+    truth = -np.log1p(-np.array([0.5, 0.95, 0.99]))
+    assert np.all((lower <= truth * 1.01) & (truth * 0.99 <= upper))
+
+def test_quantile_difference_detects_shift_and_is_vectorized():
+    rng = np.random.default_rng(1)
+    control, treatment = rng.lognormal(0, 1, 5000), rng.lognormal(0.2, 1, 5000)
+    result = quantile_test(control, treatment, q=0.5)
+    assert result["conclusion"] == "Significant"
+    assert result["estimate"] == pytest.approx(np.median(treatment) - np.median(control), rel=0.1)
+    assert result["t_statistic"] < 0
+
+    batch = quantile_difference_arrays(QuantileSketch.from_data(control), QuantileSketch.from_data(treatment), [0.5, 0.9])
+    assert batch["p_value"][0] == pytest.approx(result["p_value"])
+
+    same = quantile_test(control, control, q=0.9)
+    assert same["estimate"] == 0 and same["p_value"] == 1.0
+    with pytest.raises(ValueError):
+        quantile_test(control, treatment, q=1.0)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from scipy import stats as scipy_stats
+from services.ranks import mann_whitney, mann_whitney_from_histograms, mann_whitney_from_sketches, value_counts
+from services.sketch import QuantileSketch
+
+def test_mann_whitney_matches_scipy_with_ties():
+    rng = np.random.default_rng(0)
+    control = np.round(rng.lognormal(0, 1, 3000), 1)
+    treatment = np.round(rng.lognormal(0.05, 1, 2500), 1)
+    result = mann_whitney(control, treatment)
+    reference = scipy_stats.mannwhitneyu(control, treatment, method="asymptotic")
+    assert result["u_statistic"] == pytest.approx(reference.statistic)
+    assert result["p_value"] == pytest.approx(reference.pvalue)
+    assert result["estimate"] == pytest.approx(1 - reference.statistic / (control.size * treatment.size))
+
+    presorted = mann_whitney(np.sort(control), np.sort(treatment), presorted=True)
+    assert presorted["p_value"] == pytest.approx(result["p_value"])
+    with pytest.raises(ValueError):
+        value_counts([2.0, 1.0], presorted=True)
+
+def test_histogram_counts_as_ties():
+    control_counts, treatment_counts = [5, 10, 3, 0], [2, 8, 9, 4]
+    expand = lambda counts: np.repeat(np.arange(4), counts)
+    reference = scipy_stats.mannwhitneyu(expand(control_counts), expand(treatment_counts), method="asymptotic")
+    result = mann_whitney_from_histograms(control_counts, treatment_counts)
+    assert result["p_value"] == pytest.approx(reference.pvalue)
+    # Treatment sits in higher bins: negative statistic, positive rank-biserial effect
+    assert result["z_statistic"] < 0 < result["effect_size"]
+    with pytest.raises(ValueError):
+        mann_whitney_from_histograms([1, 2], [1, 2, 3])
+
+def test_sketch_quantiles_and_merge():
+    rng = np.random.default_rng(1)
+    data = np.concatenate([rng.lognormal(3, 1, 20_000), -rng.exponential(1, 1000), np.zeros(10)])
+    sketch = QuantileSketch.from_data(data, 0.01)
+    for q in (0.01, 0.5, 0.99):
+        exact = np.quantile(data, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+    merged = QuantileSketch.from_data(data[:5000], 0.01).merge(QuantileSketch.from_data(data[5000:], 0.01))
+    restored = QuantileSketch.from_dict(merged.to_dict())
+    for a, b in zip(restored.buckets(), sketch.buckets()):
+        np.testing.assert_array_equal(a, b)
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(0.05))
+
+def test_sketch_rank_test_within_error_bound():
+    rng = np.random.default_rng(2)
+    control = rng.lognormal(0, 1, 50_000)
+    treatment = rng.lognormal(0.02, 1, 40_000)
+    exact = mann_whitney(control, treatment)
+    approx = mann_whitney_from_sketches(QuantileSketch.from_data(control), QuantileSketch.from_data(treatment))
+    assert abs(approx["u_statistic"] - exact["u_statistic"]) <= approx["u_error_bound"]
+    assert approx["p_value"] == pytest.approx(exact["p_value"], rel=0.05, abs=1e-3)
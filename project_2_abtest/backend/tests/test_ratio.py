@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from services.ratio import ratio_arrays, ratio_test, ratio_test_from_stats
+from services.variance_reduction import BivariateStats, bivariate_statistics
+
+def _sessions(rng, p, n):
+    sessions = rng.poisson(5, n) + 1.0
+    return rng.binomial(sessions.astype(int), p).astype(float), sessions
+
+def test_delta_method_se_matches_unit_bootstrap():
+    rng = np.random.default_rng(0)
+    yc, xc = _sessions(rng, 0.10, 5000)
+    yt, xt = _sessions(rng, 0.11, 5000)
+    result = ratio_test(yc, xc, yt, xt)
+    assert result["estimate"] == pytest.approx(yt.sum() / xt.sum() - yc.sum() / xc.sum())
+
+    draws = []
+    for _ in range(1000):
+        i, j = rng.integers(0, yc.size, yc.size), rng.integers(0, yt.size, yt.size)
+        draws.append(yt[j].sum() / xt[j].sum() - yc[i].sum() / xc[i].sum())
+    delta_se = (result["ci_upper"] - result["ci_lower"]) / (2 * 1.959964)
+    assert delta_se == pytest.approx(np.std(draws), rel=0.1)
+
+def test_sums_match_per_unit_arrays():
+    rng = np.random.default_rng(1)
+    yc, xc = _sessions(rng, 0.2, 800)
+    yt, xt = _sessions(rng, 0.2, 900)
+    sums = [BivariateStats.from_sums(y.size, y.sum(), x.sum(), y @ y, x @ x, x @ y) for y, x in ((yc, xc), (yt, xt))]
+    from_sums = ratio_test_from_stats(*sums)
+    from_arrays = ratio_test(yc, xc, yt, xt)
+    for key in ("t_statistic", "p_value", "ci_lower", "ci_upper", "relative_lift"):
+        assert from_sums[key] == pytest.approx(from_arrays[key], rel=1e-7)
+
+def test_ratio_arrays_vectorized_and_validation():
+    rng = np.random.default_rng(2)
+    arms = [(_sessions(rng, 0.1, 300), _sessions(rng, 0.12, 300)) for _ in range(4)]
+    control = bivariate_statistics(np.vstack([c[0] for c, _ in arms]), np.vstack([c[1] for c, _ in arms]))
+    treatment = bivariate_statistics(np.vstack([t[0] for _, t in arms]), np.vstack([t[1] for _, t in arms]))
+    batch = ratio_arrays(control, treatment)
+    for i, (c, t) in enumerate(arms):
+        assert batch["p_value"][i] == pytest.approx(ratio_test(*c, *t)["p_value"], rel=1e-12)
+    with pytest.raises(ValueError):
+        ratio_test([1.0], [2.0], [1.0, 2.0], [3.0, 4.0])
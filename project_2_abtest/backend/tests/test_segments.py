@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from services.correction import MultipleTestingCorrection
+from services.segments import cochran_q, grouped_statistics, segmented_analysis
+from services.statistics import sufficient_statistics, welch_ttest
+
+def test_grouped_statistics_match_per_group():
+    rng = np.random.default_rng(0)
+    data, codes = rng.normal(size=1000), rng.integers(0, 5, 1000)
+    grouped = grouped_statistics(data, codes, 6)
+    for g in range(5):
+        expected = sufficient_statistics(data[codes == g])
+        assert grouped.n[g] == expected.n
+        assert grouped.mean[g] == pytest.approx(expected.mean)
+        assert grouped.m2[g] == pytest.approx(expected.m2)
+    assert grouped.n[5] == 0
+
+def test_segmented_analysis_corrects_across_dimensions():
+    rng = np.random.default_rng(1)
+    n = 4000
+    control, treatment = rng.normal(0, 1, n), rng.normal(0, 1, n)
+    countries = np.array(["DE", "FR", "US"])
+    control_country, treatment_country = countries[rng.integers(0, 3, n)], countries[rng.integers(0, 3, n)]
+    treatment[treatment_country == "DE"] += 0.5
+    control_platform, treatment_platform = np.where(rng.random(n) < 0.5, "ios", "web"), np.where(rng.random(n) < 0.5, "ios", "web")
+
+    result = segmented_analysis(control, treatment,
+                                {"country": control_country.tolist(), "platform": control_platform.tolist()},
+                                {"country": treatment_country.tolist(), "platform": treatment_platform.tolist()})
+    segments = {(s["dimension"], s["segment"]): s for s in result["segments"]}
+    assert len(segments) == 5
+    de = segments[("country", "DE")]
+    assert de["p_value"] == pytest.approx(welch_ttest(control[control_country == "DE"], treatment[treatment_country == "DE"])["p_value"])
+    assert de["conclusion"] == "Significant"
+    raw = [s["p_value"] for s in result["segments"]]
+    expected = MultipleTestingCorrection.adjust(np.array(raw), "fdr")["adjusted_p_values"]
+    np.testing.assert_allclose([s["adjusted_p_value"] for s in result["segments"]], expected)
+
+    heterogeneity = {h["dimension"]: h for h in result["heterogeneity"]}
+    assert heterogeneity["country"]["conclusion"] == "Significant"
+    assert heterogeneity["country"]["df"] == 2
+
+def test_cochran_q_is_zero_for_equal_effects():
+    q = cochran_q(np.array([0.1, 0.1, 0.1]), np.array([0.05, 0.02, 0.1]))
+    assert q["statistic"] == pytest.approx(0.0) and q["p_value"] == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        segmented_analysis([1.0, 2.0], [1.0, 2.0], {"country": ["DE"]}, {"country": ["DE", "FR"]})
+
+def test_binary_segments_reject_non_binary_values():
+    with pytest.raises(ValueError, match="0/1"):
+        segmented_analysis([0, 1, 2], [1, 1, 0], {"country": ["DE"] * 3}, {"country": ["DE"] * 3}, binary=True)
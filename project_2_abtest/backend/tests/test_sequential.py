@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from services.sequential import alpha_spent, group_sequential_bounds, group_sequential_look, information_fraction, msprt
+from services.statistics import sufficient_statistics, sufficient_statistics_matrix
+
+def test_obrien_fleming_bounds_spend_alpha():
+    fractions = (0.2, 0.4, 0.6, 0.8, 1.0)
+    bounds = group_sequential_bounds(fractions, 0.05, "obrien_fleming")
+    # Reference values from the k-variate normal integrals
+    np.testing.assert_allclose(bounds, [4.3826, 3.0997, 2.5534, 2.2538, 2.0635], atol=2e-4)
+
+    rng = np.random.default_rng(0)
+    score = rng.normal(0, np.sqrt(0.2), (200_000, 5)).cumsum(axis=1)
+    z = score / np.sqrt(np.array(fractions))
+    crossed = np.cumsum(np.abs(z) >= np.array(bounds), axis=1) > 0
+    np.testing.assert_allclose(crossed.mean(axis=0), alpha_spent(fractions), atol=1.5e-3)
+
+def test_pocock_bounds_are_nearly_flat():
+    bounds = group_sequential_bounds((0.25, 0.5, 0.75, 1.0), 0.05, "pocock")
+    assert max(bounds) - min(bounds) < 0.1
+    assert bounds[-1] > 1.96
+
+def test_bounds_validate_fractions():
+    with pytest.raises(ValueError):
+        group_sequential_bounds((0.5, 0.4), 0.05, "obrien_fleming")
+
+def test_msprt_controls_error_under_peeking():
+    rng = np.random.default_rng(1)
+    control, treatment = rng.normal(0, 1, (1000, 2000)), rng.normal(0, 1, (1000, 2000))
+    rejected = np.zeros(1000, dtype=bool)
+    for n in range(100, 2001, 100):
+        look = msprt(sufficient_statistics_matrix(control[:, :n]), sufficient_statistics_matrix(treatment[:, :n]), tau=0.1)
+        rejected |= look["p_value"] < 0.05
+    assert rejected.mean() <= 0.05
+
+def test_group_sequential_look_and_fraction():
+    rng = np.random.default_rng(2)
+    control = sufficient_statistics(rng.normal(0, 1, 500))
+    treatment = sufficient_statistics(rng.normal(0.5, 1, 500))
+    fraction = information_fraction(control, treatment, 1000)
+    assert fraction == pytest.approx(0.5, abs=0.05)
+    look = group_sequential_look(control, treatment, [fraction])
+    assert look["reject"]
+    assert look["ci_lower"] < look["estimate"] < look["ci_upper"]
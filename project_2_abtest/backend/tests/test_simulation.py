@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+from services.power import PowerAnalyzer
+from services import simulation
+from services.simulation import BaselineSampler, SimulationPowerAnalyzer
+
+def test_normal_simulation_matches_analytic_power():
+    sampler = BaselineSampler(distribution="norm", params={"loc": 0, "scale": 1})
+    res = SimulationPowerAnalyzer.power(sampler, n=100, lift=0.4, lift_type="absolute", n_simulations=4000, seed=1)
+    analytic = PowerAnalyzer.power(100, 0.4)
+    assert abs(res["power"] - analytic) < 4 * res["mc_standard_error"]
+
+def test_seeded_results_do_not_depend_on_workers():
+    rng = np.random.default_rng(0)
+    baseline = np.where(rng.random(2000) < 0.8, 0.0, rng.lognormal(2, 1, 2000))
+    sampler = BaselineSampler(baseline=baseline)
+    serial = SimulationPowerAnalyzer.power_curve(sampler, [100, 300], lift=0.3, n_simulations=1500, seed=7)
+    parallel = SimulationPowerAnalyzer.power_curve(sampler, [100, 300], lift=0.3, n_simulations=1500, seed=7, n_jobs=2)
+    assert serial == parallel
+
+def test_mannwhitney_and_zero_inflated_fit():
+    rng = np.random.default_rng(1)
+    data = np.where(rng.random(5000) < 0.5, 0.0, rng.lognormal(1, 0.5, 5000))
+    sampler = BaselineSampler.fit(data, "lognorm", zero_inflated=True)
+    assert sampler.zero_inflation == pytest.approx(0.5, abs=0.03)
+    res = SimulationPowerAnalyzer.power(sampler, n=500, lift=0.0, test="mannwhitney", n_simulations=500, seed=3)
+    # No lift: rejection rate is the type I error rate
+    assert res["power"] < 0.1
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        BaselineSampler()
+    with pytest.raises(ValueError):
+        BaselineSampler(distribution="not_a_distribution")
+    sampler = BaselineSampler(baseline=[1.0, 2.0, 3.0])
+    with pytest.raises(ValueError):
+        SimulationPowerAnalyzer.power(sampler, n=10, lift=0.1, test="ttest")
+    with pytest.raises(ValueError):
+        BaselineSampler.fit([1.0, 2.0, 3.0], "not_a_distribution")
+    with pytest.raises(ValueError):
+        BaselineSampler.fit([1.0, 2.0, 3.0], "poisson")
+
+def test_worker_pool_is_reused():
+    sampler = BaselineSampler(baseline=np.random.default_rng(0).normal(size=100))
+    SimulationPowerAnalyzer.power(sampler, n=20, lift=0.1, n_simulations=2000, seed=1, n_jobs=2)
+    pool = simulation._pool
+    SimulationPowerAnalyzer.power(sampler, n=30, lift=0.1, n_simulations=2000, seed=1, n_jobs=2)
+    assert pool is not None and simulation._pool is pool
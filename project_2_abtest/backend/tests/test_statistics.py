@@ -1,6 +1,11 @@
 import pytest
 import numpy as np
-from services.statistics import welch_ttest, cohens_d, calculate_ci, mannwhitneyu_test, chisquare_test, summary_statistics
+from scipy import stats as scipy_stats
+from services.statistics import (
+    welch_ttest, cohens_d, calculate_ci, mannwhitneyu_test, chisquare_test, summary_statistics,
+    sufficient_statistics, welch_ttest_from_stats, merge_stats, welch_ttest_batch,
+    compress, weighted_statistic, bootstrap_ci
+)
 
 def test_welch_ttest_significant():
     control = [1.0, 1.2, 1.1, 1.3, 1.0] * 10
@@ -46,3 +51,87 @@ def test_summary_statistics():
     stats = summary_statistics(data)
     assert stats["mean"] == 3.0
     assert stats["count"] == 5
+    assert stats["median"] == 3.0
+
+def test_sufficient_statistics():
+    data = [1.0, 2.0, 3.0, 4.0, 5.0]
+    s = sufficient_statistics(data)
+    assert s.n == 5
+    assert s.mean == pytest.approx(3.0)
+    assert s.m2 == pytest.approx(10.0)
+    assert s.variance == pytest.approx(np.var(data, ddof=1))
+
+def test_welch_from_stats_matches_scipy():
+    rng = np.random.default_rng(42)
+    control = rng.normal(10, 2, 500)
+    treatment = rng.normal(10.3, 3, 700)
+    result = welch_ttest_from_stats(sufficient_statistics(control), sufficient_statistics(treatment))
+    t_stat, p_val = scipy_stats.ttest_ind(control, treatment, equal_var=False)
+    assert result["t_statistic"] == pytest.approx(t_stat, rel=1e-12)
+    assert result["p_value"] == pytest.approx(p_val, rel=1e-12)
+    assert result == welch_ttest(list(control), list(treatment))
+
+def test_merge_stats_matches_full_pass():
+    rng = np.random.default_rng(7)
+    data = rng.exponential(3.0, 1000) + 1e6
+    acc = sufficient_statistics([], higher_moments=True)
+    for chunk in np.array_split(data, 7):
+        acc = merge_stats(acc, sufficient_statistics(chunk, higher_moments=True))
+    full = sufficient_statistics(data, higher_moments=True)
+    assert acc.n == full.n
+    assert acc.mean == pytest.approx(full.mean, rel=1e-12)
+    assert acc.m2 == pytest.approx(full.m2, rel=1e-9)
+    assert acc.m3 == pytest.approx(full.m3, rel=1e-6)
+    assert acc.m4 == pytest.approx(full.m4, rel=1e-6)
+
+def test_merge_stats_drops_untracked_moments():
+    merged = merge_stats(sufficient_statistics([1.0, 2.0]), sufficient_statistics([3.0, 4.0], higher_moments=True))
+    assert merged.m2 == pytest.approx(5.0)
+    assert merged.m3 is None
+
+def test_welch_ttest_batch_matches_per_metric():
+    rng = np.random.default_rng(3)
+    control = rng.normal(0, 1, (4, 200))
+    treatment = rng.normal(0.2, 1.5, (4, 150))
+    control[2, :20] = np.nan
+    batch = welch_ttest_batch(control, treatment)
+    for i in range(4):
+        row = control[i][~np.isnan(control[i])]
+        single = welch_ttest(row, treatment[i])
+        for key in ("t_statistic", "p_value", "effect_size", "ci_lower", "ci_upper"):
+            assert batch[key][i] == pytest.approx(single[key], rel=1e-12)
+
+def test_weighted_statistic_matches_expanded_sample():
+    rng = np.random.default_rng(0)
+    values, counts = compress(rng.integers(0, 20, 101).astype(float))
+    weights = rng.poisson(counts, size=(30, values.size)).astype(float)
+    expanded = [np.repeat(values, w.astype(int)) for w in weights]
+    np.testing.assert_allclose(weighted_statistic(values, weights, "mean"), [np.mean(x) for x in expanded])
+    np.testing.assert_allclose(weighted_statistic(values, weights, "median"), [np.median(x) for x in expanded])
+    np.testing.assert_allclose(weighted_statistic(values, weights, "trimmed_mean", 0.1),
+                               [scipy_stats.trim_mean(x, 0.1) for x in expanded])
+
+@pytest.mark.parametrize("method", ["percentile", "bca"])
+def test_bootstrap_ci_close_to_scipy(method):
+    rng = np.random.default_rng(1)
+    control = rng.lognormal(0, 1, 300)
+    treatment = rng.lognormal(0.3, 1, 300)
+    result = bootstrap_ci(control, treatment, "median", method=method, resampling="multinomial", n_resamples=4000, seed=2)
+    reference = scipy_stats.bootstrap(
+        (treatment, control), lambda t, c, axis: np.median(t, axis=axis) - np.median(c, axis=axis),
+        method="BCa" if method == "bca" else "percentile", n_resamples=4000, random_state=2
+    ).confidence_interval
+    assert result["estimate"] == pytest.approx(np.median(treatment) - np.median(control))
+    assert result["ci_lower"] == pytest.approx(reference.low, abs=0.05)
+    assert result["ci_upper"] == pytest.approx(reference.high, abs=0.05)
+
+def test_bootstrap_ci_reproducible_and_validates():
+    rng = np.random.default_rng(3)
+    control, treatment = rng.exponential(1.0, 500), rng.exponential(1.2, 500)
+    first = bootstrap_ci(control, treatment, "trimmed_mean", effect="ratio", n_resamples=1200, seed=7)
+    assert first == bootstrap_ci(control, treatment, "trimmed_mean", effect="ratio", n_resamples=1200, seed=7)
+    assert first["ci_lower"] < first["estimate"] < first["ci_upper"]
+    with pytest.raises(ValueError):
+        bootstrap_ci(control, treatment, "mode")
+    with pytest.raises(ValueError):
+        bootstrap_ci([], treatment)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from scipy import stats as scipy_stats
+from services.variance_reduction import (
+    BivariateStats, bivariate_statistics, merge_bivariate, cuped_arrays, cuped_ttest
+)
+
+def _arms(seed=0, n=2000, lift=0.1):
+    rng = np.random.default_rng(seed)
+    xc, xt = rng.normal(10, 2, n), rng.normal(10, 2, n)
+    yc = 2 + 0.8 * xc + rng.normal(0, 1, n)
+    yt = 2 + lift + 0.8 * xt + rng.normal(0, 1, n)
+    return yc, xc, yt, xt
+
+def test_cuped_matches_ancova_and_adjusted_welch():
+    yc, xc, yt, xt = _arms()
+    result = cuped_ttest(yc, xc, yt, xt)
+
+    # Treatment coefficient of y ~ 1 + treatment + x
+    design = np.column_stack([np.ones(yc.size + yt.size), np.r_[np.zeros(yc.size), np.ones(yt.size)], np.r_[xc, xt]])
+    coef = np.linalg.lstsq(design, np.r_[yc, yt], rcond=None)[0]
+    assert result["estimate"] == pytest.approx(coef[1], rel=1e-9)
+    assert result["theta"] == pytest.approx(coef[2], rel=1e-9)
+
+    x_mean = np.r_[xc, xt].mean()
+    reference = scipy_stats.ttest_ind(yc - result["theta"] * (xc - x_mean), yt - result["theta"] * (xt - x_mean), equal_var=False)
+    assert result["t_statistic"] == pytest.approx(reference.statistic, rel=1e-9)
+    assert result["p_value"] == pytest.approx(reference.pvalue, rel=1e-9)
+    assert result["variance_reduction"] > 0.5
+
+def test_bivariate_merge_and_sums_match_single_pass():
+    yc, xc, _, _ = _arms(1)
+    full = bivariate_statistics(yc, xc)
+    merged = merge_bivariate(bivariate_statistics(yc[:300], xc[:300]), bivariate_statistics(yc[300:], xc[300:]))
+    np.testing.assert_allclose(merged, full)
+    from_sums = BivariateStats.from_sums(yc.size, yc.sum(), xc.sum(), yc @ yc, xc @ xc, xc @ yc)
+    np.testing.assert_allclose(from_sums, full, rtol=1e-8)
+
+def test_cuped_arrays_vectorized_over_metrics():
+    arms = [_arms(seed) for seed in range(3)]
+    control = bivariate_statistics(np.vstack([a[0] for a in arms]), np.vstack([a[1] for a in arms]))
+    treatment = bivariate_statistics(np.vstack([a[2] for a in arms]), np.vstack([a[3] for a in arms]))
+    batch = cuped_arrays(control, treatment)
+    for i, a in enumerate(arms):
+        assert batch["p_value"][i] == pytest.approx(cuped_ttest(*a)["p_value"], rel=1e-12)
@@ -1,51 +1,394 @@
+import io
+import time
 import requests
 import os
-from typing import List, Dict, Any, Optional
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from urllib3.util.retry import Retry
+
+ArrayLike = Union[np.ndarray, pd.Series, List[float]]
+
+UPLOAD_CONTENT_TYPES = {
+    "f8": "application/octet-stream",
+    "npy": "application/x-npy",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def encode_array(data: ArrayLike, fmt: str = "npy") -> bytes:
+    """Serialize a NumPy array or pandas Series for the binary upload endpoints."""
+    arr = np.ascontiguousarray(np.asarray(data, dtype=np.float64).ravel())
+    if fmt == "f8":
+        return arr.astype("<f8", copy=False).tobytes()
+    if fmt == "npy":
+        buf = io.BytesIO()
+        np.save(buf, arr, allow_pickle=False)
+        return buf.getvalue()
+    if fmt in ("arrow", "parquet"):
+        import pyarrow as pa
+        table = pa.table({"value": arr})
+        sink = pa.BufferOutputStream()
+        if fmt == "arrow":
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(table, sink)
+        return sink.getvalue().to_pybytes()
+    raise ValueError(f"Unsupported upload format '{fmt}'")
+
+# (connect, read) timeouts in seconds; reads allow for large analyses
+DEFAULT_TIMEOUT = (3.05, 120.0)
+# Transient statuses retried with exponential backoff (Retry-After is honoured)
+RETRY_STATUSES = (429, 502, 503, 504)
+# Responses kept for conditional GETs
+ETAG_CACHE_SIZE = 256
 
 class APIClient:
-    def __init__(self):
-        self.base_url = os.getenv("API_URL", "http://localhost:8000/api")
+    """Blocking client over one pooled requests.Session.
+
+    Connections are kept alive and reused, every call has a timeout,
+    idempotent requests are retried with backoff on connection errors and
+    transient statuses, responses are gzip-compressed, and GETs revalidate
+    with If-None-Match so unchanged data comes back as an empty 304.
+    """
 
-    def get_experiments(self) -> List[Dict[str, Any]]:
-        response = requests.get(f"{self.base_url}/experiments")
+    def __init__(self, base_url: Optional[str] = None, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 retries: int = 3, backoff_factor: float = 0.3, pool_maxsize: int = 10):
+        self.base_url = base_url or os.getenv("API_URL", "http://localhost:8000/api")
+        self.timeout = timeout
+        self.session = requests.Session()
+        # POSTs are only retried when the connection failed before the request was sent
+        retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "DELETE"}), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip", "Accept": "application/json"})
+        self._etags: "OrderedDict[str, Tuple[str, Any, Dict[str, str]]]" = OrderedDict()
+        self._etag_lock = threading.Lock()
+
+    def _request(self, method: str, path: str, **kwargs) -> Any:
+        response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
         response.raise_for_status()
         return response.json()
 
-    def create_experiment(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        response = requests.post(f"{self.base_url}/experiments/", json=data)
+    def _get_response(self, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, str]]:
+        """Conditional GET: returns (json, headers), reusing the cached body on 304 Not Modified."""
+        request = requests.Request("GET", f"{self.base_url}{path}", params=params).prepare()
+        with self._etag_lock:
+            cached = self._etags.get(request.url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self.session.get(request.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            with self._etag_lock:
+                self._etags.move_to_end(request.url)
+            return cached[1], cached[2]
         response.raise_for_status()
-        return response.json()
+        body = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._etags[request.url] = (etag, body, dict(response.headers))
+                self._etags.move_to_end(request.url)
+                while len(self._etags) > ETAG_CACHE_SIZE:
+                    self._etags.popitem(last=False)
+        return body, response.headers
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return self._get_response(path, params)[0]
+
+    def _get_all_pages(self, path: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Follow the X-Next-Cursor header until the last page."""
+        rows: List[Dict[str, Any]] = []
+        params = {k: v for k, v in params.items() if v is not None}
+        while True:
+            body, headers = self._get_response(path, params)
+            rows.extend(body)
+            cursor = headers.get("X-Next-Cursor")
+            if cursor is None:
+                return rows
+            params["cursor"] = cursor
+
+    def close(self) -> None:
+        self.session.close()
+
+    def get_experiments(self, status: Optional[str] = None, metric_type: Optional[str] = None,
+                        fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return self._get_all_pages("/experiments/",
+                                   {"status": status, "metric_type": metric_type, "fields": fields, "limit": 1000})
+
+    def get_experiment_summaries(self, status: Optional[str] = None, metric_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every experiment with its result count and latest result."""
+        return self._get_all_pages("/experiments/summary",
+                                   {"status": status, "metric_type": metric_type, "limit": 1000})
+
+    def create_experiment(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request("POST", "/experiments/", json=data)
+
+    def create_experiments(self, experiments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many experiments in one request; returns a status per item."""
+        return self._request("POST", "/experiments/bulk", json=experiments)
+
+    def update_experiments(self, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Update many experiments by id in one request; returns a status per item."""
+        return self._request("PATCH", "/experiments/bulk", json=updates)
+
+    def run_experiments(self, runs: List[Dict[str, Any]], relative_accuracy: float = 0.01) -> List[Dict[str, Any]]:
+        """Analyse many experiments' datasets in one request; each run has experiment_id, control_data and treatment_data."""
+        return self._request("POST", "/experiments/bulk/run", json={"runs": runs, "relative_accuracy": relative_accuracy})
 
-    def run_experiment(self, experiment_id: int, control: List[float], treatment: List[float]) -> Dict[str, Any]:
+    def run_experiment(self, experiment_id: int, control: List[float], treatment: List[float], test: str = "welch",
+                       force: bool = False) -> Dict[str, Any]:
+        """test: welch, mannwhitney or mannwhitney_sketch (binary metrics always use counts).
+
+        Repeated identical runs are served from the backend cache unless force=True.
+        """
         params = {
             "control_data": control,
             "treatment_data": treatment
         }
-        response = requests.post(f"{self.base_url}/experiments/{experiment_id}/run", json=params)
-        response.raise_for_status()
-        return response.json()
+        return self._request("POST", f"/experiments/{experiment_id}/run", json=params, params={"test": test, "force": force})
+
+    def run_experiment_counts(self, experiment_id: int, control_successes: int, control_trials: int,
+                              treatment_successes: int, treatment_trials: int, test: str = "ztest",
+                              alpha: float = 0.05) -> Dict[str, Any]:
+        """Binary metric from conversion counts per arm (test: ztest, chisquare or fisher)."""
+        body = {
+            "control_successes": control_successes,
+            "control_trials": control_trials,
+            "treatment_successes": treatment_successes,
+            "treatment_trials": treatment_trials,
+            "test": test,
+            "alpha": alpha
+        }
+        return self._request("POST", f"/experiments/{experiment_id}/run/counts", json=body)
+
+    def _upload_files(self, fmt: str, **arms: Optional[ArrayLike]) -> Dict[str, Any]:
+        return {
+            arm: (f"{arm}.{fmt}", encode_array(data, fmt), UPLOAD_CONTENT_TYPES[fmt])
+            for arm, data in arms.items() if data is not None
+        }
+
+    def run_experiment_arrays(self, experiment_id: int, control: ArrayLike, treatment: ArrayLike, fmt: str = "npy",
+                              test: str = "welch", presorted: bool = False, force: bool = False) -> Dict[str, Any]:
+        """Run an analysis from NumPy arrays or pandas Series using a binary upload."""
+        files = self._upload_files(fmt, control=control, treatment=treatment)
+        return self._request("POST", f"/experiments/{experiment_id}/run/upload", files=files,
+                             params={"format": fmt, "test": test, "presorted": presorted, "force": force})
+
+    def run_histogram(self, experiment_id: int, control_counts: List[float], treatment_counts: List[float],
+                      alpha: float = 0.05) -> Dict[str, Any]:
+        """Mann-Whitney U test from per-arm counts over shared ordered bins."""
+        body = {"control_counts": control_counts, "treatment_counts": treatment_counts, "alpha": alpha}
+        return self._request("POST", f"/experiments/{experiment_id}/run/histogram", json=body)
+
+    def run_segments(self, experiment_id: int, control: List[float], treatment: List[float],
+                     control_segments: Dict[str, List[str]], treatment_segments: Dict[str, List[str]],
+                     correction: str = "fdr", alpha: float = 0.05) -> List[Dict[str, Any]]:
+        """Per-segment results (one key per observation for each dimension) plus a Cochran's Q row per dimension."""
+        body = {
+            "control_data": control,
+            "treatment_data": treatment,
+            "control_segments": control_segments,
+            "treatment_segments": treatment_segments,
+            "correction": correction,
+            "alpha": alpha
+        }
+        return self._request("POST", f"/experiments/{experiment_id}/run/segments", json=body)
+
+    def get_variants(self, experiment_id: int) -> List[Dict[str, Any]]:
+        return self._get(f"/experiments/{experiment_id}/variants")
+
+    def run_variants(self, experiment_id: int, data: Dict[str, List[float]], comparisons: str = "control",
+                     correction: str = "holm", omnibus: str = "welch", alpha: float = 0.05) -> List[Dict[str, Any]]:
+        """N-arm analysis: omnibus test first, then one corrected result per pairwise comparison."""
+        body = {"data": data, "comparisons": comparisons, "correction": correction, "omnibus": omnibus, "alpha": alpha}
+        return self._request("POST", f"/experiments/{experiment_id}/run/variants", json=body)
+
+    def append_variant_observations(self, experiment_id: int, data: Dict[str, List[float]]) -> List[Dict[str, Any]]:
+        return self._request("POST", f"/experiments/{experiment_id}/variants/observations", json={"data": data})
+
+    def analyze_variants(self, experiment_id: int, comparisons: str = "control", correction: str = "holm",
+                         omnibus: str = "welch", alpha: float = 0.05) -> List[Dict[str, Any]]:
+        """N-arm analysis from the streamed per-variant statistics."""
+        params = {"comparisons": comparisons, "correction": correction, "omnibus": omnibus, "alpha": alpha}
+        return self._request("POST", f"/experiments/{experiment_id}/variants/analyze", params=params)
+
+    def get_observation_quantiles(self, experiment_id: int, quantiles: List[float] = (0.5, 0.9, 0.95, 0.99),
+                                  alpha: float = 0.05) -> List[Dict[str, Any]]:
+        """Per-arm quantiles with confidence intervals from the streamed sketches."""
+        return self._get(f"/experiments/{experiment_id}/observations/quantiles",
+                         params={"q": list(quantiles), "alpha": alpha})
+
+    def analyze_observations_quantile(self, experiment_id: int, quantile: float = 0.5, alpha: float = 0.05) -> Dict[str, Any]:
+        """Quantile difference (treatment - control) from the streamed sketches."""
+        return self._request("POST", f"/experiments/{experiment_id}/observations/analyze/quantile",
+                             params={"q": quantile, "alpha": alpha})
 
-    def get_results(self, experiment_id: int) -> List[Dict[str, Any]]:
-        response = requests.get(f"{self.base_url}/results/{experiment_id}")
+    def run_quantile(self, experiment_id: int, control: List[float], treatment: List[float], quantile: float = 0.5,
+                     alpha: float = 0.05) -> Dict[str, Any]:
+        """Compare the arms at one quantile (median, p95, p99)."""
+        body = {"control_data": control, "treatment_data": treatment, "quantile": quantile, "alpha": alpha}
+        return self._request("POST", f"/experiments/{experiment_id}/run/quantile", json=body)
+
+    def append_observations_arrays(self, experiment_id: int, control: Optional[ArrayLike] = None,
+                                   treatment: Optional[ArrayLike] = None, fmt: str = "npy") -> List[Dict[str, Any]]:
+        """Fold a batch of NumPy/pandas observations into the experiment's running accumulators."""
+        files = self._upload_files(fmt, control=control, treatment=treatment)
+        return self._request("POST", f"/experiments/{experiment_id}/observations/upload", files=files, params={"format": fmt})
+
+    def run_cuped(self, experiment_id: int, control: List[float], control_covariate: List[float],
+                  treatment: List[float], treatment_covariate: List[float], alpha: float = 0.05) -> Dict[str, Any]:
+        body = {
+            "control_data": control,
+            "control_covariate": control_covariate,
+            "treatment_data": treatment,
+            "treatment_covariate": treatment_covariate,
+            "alpha": alpha
+        }
+        return self._request("POST", f"/experiments/{experiment_id}/run/cuped", json=body)
+
+    def run_ratio_sums(self, experiment_id: int, control_sums: Dict[str, float], treatment_sums: Dict[str, float],
+                       alpha: float = 0.05) -> Dict[str, Any]:
+        """Delta-method ratio test from pre-aggregated per-arm sums (n, sum_numerator, ..., sum_cross)."""
+        body = {"control_sums": control_sums, "treatment_sums": treatment_sums, "alpha": alpha}
+        return self._request("POST", f"/experiments/{experiment_id}/run/ratio", json=body)
+
+    def run_ratio_arrays(self, experiment_id: int, control_numerator: ArrayLike, control_denominator: ArrayLike,
+                         treatment_numerator: ArrayLike, treatment_denominator: ArrayLike, fmt: str = "npy",
+                         alpha: float = 0.05) -> Dict[str, Any]:
+        files = self._upload_files(fmt, control_numerator=control_numerator, control_denominator=control_denominator,
+                                   treatment_numerator=treatment_numerator, treatment_denominator=treatment_denominator)
+        return self._request("POST", f"/experiments/{experiment_id}/run/ratio/upload",
+                             files=files, params={"format": fmt, "alpha": alpha})
+
+    def run_bootstrap(self, experiment_id: int, control: ArrayLike, treatment: ArrayLike, fmt: str = "npy",
+                      **options: Any) -> Dict[str, Any]:
+        """Bootstrap CI (statistic, effect, method, n_resamples, ... as keyword options) on binary uploads."""
+        files = self._upload_files(fmt, control=control, treatment=treatment)
+        return self._request("POST", f"/experiments/{experiment_id}/run/bootstrap/upload",
+                             files=files, params={"format": fmt, **options})
+
+    def sequential_look(self, experiment_id: int, control: Optional[List[float]] = None,
+                        treatment: Optional[List[float]] = None, **options: Any) -> Dict[str, Any]:
+        """Fold in a batch and take an interim look (method, alpha, max_sample_size, ... as options)."""
+        body = {"control_data": control or [], "treatment_data": treatment or [], **options}
+        return self._request("POST", f"/experiments/{experiment_id}/sequential", json=body)
+
+    def submit_experiment_job(self, experiment_id: int, control: List[float], treatment: List[float]) -> Dict[str, Any]:
+        """Queue a run on the backend worker pool; poll get_job for the Result."""
+        params = {
+            "control_data": control,
+            "treatment_data": treatment
+        }
+        return self._request("POST", f"/experiments/{experiment_id}/run/jobs", json=params)
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        return self._get(f"/jobs/{job_id}")
+
+    def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def wait_for_job(self, job_id: str, timeout: float = 300.0, interval: float = 0.5) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        job = self.get_job(job_id)
+        while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+            time.sleep(interval)
+            job = self.get_job(job_id)
+        return job
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self._get("/cache/stats")
+
+    def get_results(self, experiment_id: int, significant: Optional[bool] = None, test_name: Optional[str] = None,
+                    fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return self._get_all_pages(f"/results/{experiment_id}",
+                                   {"significant": significant, "test_name": test_name, "fields": fields})
+
+    def get_dashboard_counts(self) -> pd.DataFrame:
+        """Experiment counts per status and metric type, aggregated by the server."""
+        return pd.DataFrame(self._get("/dashboard/counts"))
+
+    def get_dashboard_latest(self, status: Optional[str] = None, metric_type: Optional[str] = None) -> pd.DataFrame:
+        """One row per experiment with its result count and latest result, from column-oriented pages."""
+        params = {k: v for k, v in {"status": status, "metric_type": metric_type}.items() if v is not None}
+        pages = []
+        while True:
+            body, headers = self._get_response("/dashboard/latest", params)
+            pages.append(pd.DataFrame(body))
+            cursor = headers.get("X-Next-Cursor")
+            if cursor is None:
+                return pd.concat(pages, ignore_index=True)
+            params["cursor"] = cursor
+
+    def get_significance_rates(self, period: str = "day", test_name: Optional[str] = None) -> pd.DataFrame:
+        params = {"period": period}
+        if test_name is not None:
+            params["test_name"] = test_name
+        return pd.DataFrame(self._get("/dashboard/significance", params))
+
+    def export_results(self, experiment_id: Optional[int] = None, fmt: str = "csv", **filters: Any) -> bytes:
+        """Results from /export/results as NDJSON, CSV or Parquet, held in memory for a download button."""
+        params = {"format": fmt, "experiment_id": experiment_id, **filters}
+        params = {k: v for k, v in params.items() if v is not None}
+        response = self.session.get(f"{self.base_url}/export/results", params=params, timeout=self.timeout)
         response.raise_for_status()
-        return response.json()
+        return response.content
+
+    def export_table(self, table: str, path: str, fmt: str = "ndjson", since_id: Optional[int] = None,
+                     **filters: Any) -> int:
+        """Stream /export/{table} ("experiments" or "results") to a file; returns the watermark to pass as since_id next time."""
+        params = {"format": fmt, "since_id": since_id, **filters}
+        params = {k: v for k, v in params.items() if v is not None}
+        with self.session.get(f"{self.base_url}/export/{table}", params=params, timeout=self.timeout,
+                              stream=True) as response:
+            response.raise_for_status()
+            with open(path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+            return int(response.headers["X-Export-Watermark"])
 
     def calculate_sample_size(self, effect_size: float, alpha: float, power: float) -> Dict[str, Any]:
         params = {"effect_size": effect_size, "alpha": alpha, "power": power}
-        response = requests.get(f"{self.base_url}/power/sample-size", params=params)
-        response.raise_for_status()
-        return response.json()
+        return self._get("/power/sample-size", params=params)
 
     def calculate_power(self, n: int, effect_size: float, alpha: float) -> Dict[str, Any]:
         params = {"n": n, "effect_size": effect_size, "alpha": alpha}
-        response = requests.get(f"{self.base_url}/power/power", params=params)
-        response.raise_for_status()
-        return response.json()
+        return self._get("/power/power", params=params)
 
     def calculate_mde(self, n: int, power: float, alpha: float) -> Dict[str, Any]:
         params = {"n": n, "power": power, "alpha": alpha}
-        response = requests.get(f"{self.base_url}/power/mde", params=params)
-        response.raise_for_status()
-        return response.json()
+        return self._get("/power/mde", params=params)
+
+    def calculate_sample_size_batch(self, effect_size: Sequence[float], alpha: Any = 0.05, power: Any = 0.8) -> Dict[str, Any]:
+        """Column-oriented batch: each argument is a list (one value per scenario) or a shared scalar."""
+        body = {"effect_size": list(effect_size), "alpha": alpha, "power": power}
+        return self._request("POST", "/power/sample-size/batch", json=body)
+
+    def calculate_power_batch(self, n: Sequence[int], effect_size: Any, alpha: Any = 0.05) -> Dict[str, Any]:
+        body = {"n": list(n), "effect_size": effect_size, "alpha": alpha}
+        return self._request("POST", "/power/power/batch", json=body)
+
+    def calculate_mde_batch(self, n: Sequence[int], power: Any = 0.8, alpha: Any = 0.05) -> Dict[str, Any]:
+        body = {"n": list(n), "power": power, "alpha": alpha}
+        return self._request("POST", "/power/mde/batch", json=body)
+
+    def get_power_curve(self, sample_sizes: List[int], effect_size: float, alpha: float = 0.05) -> Dict[str, Any]:
+        params = {"sample_sizes": list(sample_sizes), "effect_size": effect_size, "alpha": alpha}
+        return self._get("/power/curve", params=params)
+
+    def simulate_power(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """Monte Carlo power from baseline data or a named scipy distribution (see /power/simulate)."""
+        return self._request("POST", "/power/simulate", json=scenario)
+
+    def get_power_grid(self, sample_sizes: List[int], effect_sizes: List[float],
+                       alphas: Sequence[float] = (0.05,), powers: Sequence[float] = (0.8,)) -> Dict[str, Any]:
+        params = {"sample_sizes": list(sample_sizes), "effect_sizes": list(effect_sizes), "alphas": list(alphas), "powers": list(powers)}
+        return self._get("/power/grid", params=params)
 
 api_client = APIClient()
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import httpx
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Sequence
+from components.api_client import DEFAULT_TIMEOUT, RETRY_STATUSES
+
+class AsyncAPIClient:
+    """httpx-based async client for fanning out many read queries at once.
+
+    One pooled AsyncClient is shared by all calls; at most max_concurrency
+    requests are in flight. Connection failures are retried by the transport,
+    and GETs also retry transient statuses with exponential backoff.
+    Use as an async context manager so the pool is closed; transport
+    replaces the network layer (e.g. httpx.MockTransport in tests).
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_concurrency: int = 10, retries: int = 3,
+                 backoff_factor: float = 0.3, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url or os.getenv("API_URL", "http://localhost:8000/api")
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        connect, read = DEFAULT_TIMEOUT
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            transport=transport or httpx.AsyncHTTPTransport(retries=retries),
+            headers={"Accept-Encoding": "gzip", "Accept": "application/json"},
+        )
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                response = await self.client.request(method, path, **kwargs)
+                if method != "GET" or response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    break
+                await asyncio.sleep(self.backoff_factor * 2**attempt)
+        response.raise_for_status()
+        return response
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return (await self._request("GET", path, params=params)).json()
+
+    async def _get_all_pages(self, path: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        params = {k: v for k, v in params.items() if v is not None}
+        while True:
+            response = await self._request("GET", path, params=params)
+            rows.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return rows
+            params["cursor"] = cursor
+
+    async def get_experiments(self, status: Optional[str] = None, metric_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._get_all_pages("/experiments/", {"status": status, "metric_type": metric_type, "limit": 1000})
+
+    async def get_experiment_summaries(self, status: Optional[str] = None, metric_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._get_all_pages("/experiments/summary", {"status": status, "metric_type": metric_type, "limit": 1000})
+
+    async def get_results(self, experiment_id: int, significant: Optional[bool] = None,
+                          fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return await self._get_all_pages(f"/results/{experiment_id}", {"significant": significant, "fields": fields})
+
+    async def get_results_many(self, experiment_ids: Iterable[int], **filters) -> Dict[int, List[Dict[str, Any]]]:
+        """Results of many experiments, fetched concurrently."""
+        experiment_ids = list(experiment_ids)
+        results = await asyncio.gather(*(self.get_results(experiment_id, **filters) for experiment_id in experiment_ids))
+        return dict(zip(experiment_ids, results))
+
+    async def calculate_power(self, n: int, effect_size: float, alpha: float = 0.05) -> Dict[str, Any]:
+        return await self._get("/power/power", {"n": n, "effect_size": effect_size, "alpha": alpha})
+
+    async def calculate_sample_size(self, effect_size: float, alpha: float = 0.05, power: float = 0.8) -> Dict[str, Any]:
+        return await self._get("/power/sample-size", {"effect_size": effect_size, "alpha": alpha, "power": power})
+
+    async def calculate_mde(self, n: int, power: float = 0.8, alpha: float = 0.05) -> Dict[str, Any]:
+        return await self._get("/power/mde", {"n": n, "power": power, "alpha": alpha})
+
+    async def get_power_curve(self, sample_sizes: Sequence[int], effect_size: float, alpha: float = 0.05) -> Dict[str, Any]:
+        return await self._get("/power/curve", {"sample_sizes": list(sample_sizes), "effect_size": effect_size, "alpha": alpha})
+
+    @staticmethod
+    async def gather(*calls: Awaitable) -> List[Any]:
+        """Await several client calls concurrently, e.g. gather(client.get_results(1), client.calculate_power(...))."""
+        return list(await asyncio.gather(*calls))
+
+def run_concurrently(fetch, *args, **kwargs) -> Any:
+    """Run fetch(client, *args, **kwargs) on a fresh AsyncAPIClient from synchronous code such as a Streamlit page."""
+    async def main():
+        async with AsyncAPIClient() as client:
+            return await fetch(client, *args, **kwargs)
+    return asyncio.run(main())
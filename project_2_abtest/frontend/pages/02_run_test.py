@@ -35,11 +35,53 @@ with st.expander("Step 1: Create Experiment", expanded=True):
             st.session_state['current_exp_id'] = exp['id']
             st.session_state['control_name'] = control_name
             st.session_state['treatment_name'] = treatment_name
+            st.session_state['metric_type'] = metric_type
         except Exception as e:
             st.error(f"Error initializing experiment: {e}")
 
 # Data Input and Analysis
-if 'current_exp_id' in st.session_state:
+if 'current_exp_id' in st.session_state and st.session_state.get('metric_type') == "binary":
+    st.divider()
+    st.subheader(f"Step 2: Input Conversion Counts for Experiment #{st.session_state['current_exp_id']}")
+
+    col_input1, col_input2 = st.columns(2)
+    with col_input1:
+        st.markdown(f"**{st.session_state.get('control_name', 'Control')}**")
+        c_trials = st.number_input("Users", min_value=1, value=10000, step=100, key="c_trials")
+        c_successes = st.number_input("Conversions", min_value=0, value=1000, step=10, key="c_successes")
+    with col_input2:
+        st.markdown(f"**{st.session_state.get('treatment_name', 'Treatment')}**")
+        t_trials = st.number_input("Users", min_value=1, value=10000, step=100, key="t_trials")
+        t_successes = st.number_input("Conversions", min_value=0, value=1080, step=10, key="t_successes")
+    test = st.selectbox("Test", ["ztest", "chisquare", "fisher"],
+                        format_func={"ztest": "Two-proportion z-test", "chisquare": "Chi-square", "fisher": "Fisher's exact"}.get)
+
+    if st.button("Run Statistical Analysis", type="primary"):
+        with st.spinner("Calculating..."):
+            try:
+                res = api_client.run_experiment_counts(st.session_state['current_exp_id'], int(c_successes), int(c_trials),
+                                                       int(t_successes), int(t_trials), test=test)
+                st.success(f"Analysis Complete! Conclusion: {res['conclusion']}")
+
+                st.subheader("Results Summary")
+                res_col1, res_col2, res_col3, res_col4 = st.columns(4)
+                res_col1.metric("P-Value", f"{res['p_value']:.4f}")
+                res_col2.metric("Effect Size (Cohen's h)", f"{res['effect_size']:.3f}")
+                res_col3.metric("Rate Difference", f"{res['estimate']:.2%}")
+                res_col4.metric("Status", res['conclusion'])
+
+                st.info(f"95% Newcombe interval for the rate difference: **[{res['ci_lower']:.2%}, {res['ci_upper']:.2%}]**")
+
+                rates = pd.DataFrame({
+                    'Group': [st.session_state['control_name'], st.session_state['treatment_name']],
+                    'Conversion Rate': [c_successes / c_trials, t_successes / t_trials]
+                })
+                fig_bar = px.bar(rates, x='Group', y='Conversion Rate', color='Group',
+                                 title="Conversion Rate by Group", template="plotly_white")
+                st.plotly_chart(fig_bar, use_container_width=True)
+            except Exception as e:
+                st.error(f"Analysis Error: {e}")
+elif 'current_exp_id' in st.session_state:
     st.divider()
     st.subheader(f"Step 2: Input Data for Experiment #{st.session_state['current_exp_id']}")
     
@@ -1,4 +1,6 @@
 import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
 from components.api_client import api_client
 
 st.set_page_config(page_title="Power Analysis", page_icon="⚡", layout="wide")
@@ -10,7 +12,7 @@ Use these tools to plan your experiment. Calculating the right sample size ensur
 enough data to detect meaningful effects without wasting resources.
 """)
 
-tab1, tab2, tab3 = st.tabs(["Sample Size Calculator", "Power Calculator", "MDE Calculator"])
+tab1, tab2, tab3, tab4 = st.tabs(["Sample Size Calculator", "Power Calculator", "MDE Calculator", "Power Heat Map"])
 
 with tab1:
     st.header("How many samples do I need?")
@@ -70,3 +72,39 @@ with tab3:
             st.info("Any effect size smaller than this might go undetected given your sample size.")
         except Exception as e:
             st.error(f"Error: {e}")
+
+with tab4:
+    st.header("How does power change across sample sizes and effects?")
+    col1, col2 = st.columns(2)
+    with col1:
+        n_range = st.slider("Sample size range (per group)", 10, 10000, (50, 2000), step=10, key="grid_n")
+        es_range = st.slider("Effect size range (d)", 0.01, 2.0, (0.05, 1.0), step=0.01, key="grid_es")
+    with col2:
+        alpha_grid_input = st.slider("Significance Level (Alpha)", 0.01, 0.10, 0.05, key="grid_a")
+        resolution = st.slider("Grid resolution", 10, 100, 50, key="grid_res")
+
+    if st.button("Draw Heat Map", type="primary"):
+        try:
+            sample_sizes = np.unique(np.linspace(n_range[0], n_range[1], resolution).astype(int)).tolist()
+            effect_sizes = np.round(np.linspace(es_range[0], es_range[1], resolution), 4).tolist()
+            res = api_client.get_power_grid(sample_sizes, effect_sizes, alphas=[alpha_grid_input])
+            # power is indexed [n][effect_size][alpha]; plot effect size on y, n on x
+            z = np.array(res["power"])[:, :, 0].T
+            fig = go.Figure(go.Heatmap(
+                z=z, x=res["sample_sizes"], y=res["effect_sizes"],
+                colorscale="Viridis", zmin=0, zmax=1, colorbar=dict(title="Power")
+            ))
+            fig.add_trace(go.Contour(
+                z=z, x=res["sample_sizes"], y=res["effect_sizes"],
+                contours=dict(start=0.8, end=0.8, coloring="none", showlabels=True),
+                line=dict(color="white", width=2), showscale=False, name="80% power"
+            ))
+            fig.update_layout(
+                title="Statistical Power by Sample Size and Effect Size",
+                xaxis_title="Sample size (per group)", yaxis_title="Effect size (d)",
+                template="plotly_white"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.info("The white contour marks the 80% power frontier.")
+        except Exception as e:
+            st.error(f"Error: {e}")
@@ -1,21 +1,33 @@
 import streamlit as st
 import pandas as pd
 from components.api_client import api_client
+from components.async_api_client import AsyncAPIClient, run_concurrently
 
 st.set_page_config(page_title="Results History", page_icon="📜", layout="wide")
 
 st.title("📜 Results History")
 
 try:
-    experiments = api_client.get_experiments()
+    # Aggregated by the backend: one row per experiment with its latest result
+    df = api_client.get_dashboard_latest()
     
-    if not experiments:
+    if df.empty:
         st.info("No experiments have been created yet. Go to 'Run Test' to start one!")
     else:
+        counts = api_client.get_dashboard_counts()
+        metric_cols = st.columns(3)
+        metric_cols[0].metric("Experiments", int(counts['count'].sum()))
+        metric_cols[1].metric("With results", int((df['result_count'] > 0).sum()))
+        metric_cols[2].metric("Significant (latest)", int((df['conclusion'] == "Significant").sum()))
+
+        rates = api_client.get_significance_rates(period="week")
+        if not rates.empty:
+            st.subheader("Significance rate per week")
+            st.bar_chart(rates.set_index('period')['significance_rate'])
+
         # Main Table
-        df = pd.DataFrame(experiments)
-        # Reorder and format columns
-        cols = ['id', 'name', 'status', 'metric_name', 'metric_type', 'created_at']
+        cols = ['experiment_id', 'name', 'status', 'metric_name', 'metric_type', 'created_at',
+                'result_count', 'test_name', 'p_value', 'conclusion']
         df_display = df[cols].copy()
         df_display['created_at'] = pd.to_datetime(df_display['created_at']).dt.strftime('%Y-%m-%d %H:%M')
         
@@ -26,27 +38,32 @@ try:
         st.divider()
         st.subheader("Detailed Results")
         
-        experiment_options = {f"{e['id']} - {e['name']}": e['id'] for e in experiments}
-        selected_label = st.selectbox("Select Experiment to view history", options=list(experiment_options.keys()))
-        selected_id = experiment_options[selected_label]
-        
-        if selected_id:
-            results = api_client.get_results(selected_id)
+        experiment_options = {f"{row.experiment_id} - {row.name}": row.experiment_id for row in df.itertuples()}
+        selected_labels = st.multiselect("Select experiments to view history", options=list(experiment_options.keys()),
+                                         default=list(experiment_options.keys())[:1])
+        selected_ids = [experiment_options[label] for label in selected_labels]
+
+        res_cols = ['id', 'p_value', 'effect_size', 't_statistic', 'ci_lower', 'ci_upper', 'conclusion', 'computed_at']
+        # One results query per experiment, sent concurrently rather than one after another
+        history = run_concurrently(AsyncAPIClient.get_results_many, selected_ids, fields=res_cols) if selected_ids else {}
+
+        for selected_label, selected_id in zip(selected_labels, selected_ids):
+            st.markdown(f"#### {selected_label}")
+            results = history[selected_id]
             if results:
-                res_df = pd.DataFrame(results)
-                res_cols = ['id', 'p_value', 'effect_size', 't_statistic', 'ci_lower', 'ci_upper', 'conclusion', 'computed_at']
-                res_display = res_df[res_cols].copy()
+                res_display = pd.DataFrame(results)[res_cols]
                 res_display['computed_at'] = pd.to_datetime(res_display['computed_at']).dt.strftime('%Y-%m-%d %H:%M')
                 
                 st.table(res_display)
                 
-                # CSV Export
-                csv = res_display.to_csv(index=False).encode('utf-8')
+                # Export streamed by the backend
+                fmt = st.radio("Export format", ["csv", "parquet"], horizontal=True, key=f"format_{selected_id}")
                 st.download_button(
-                    label="Download results as CSV",
-                    data=csv,
-                    file_name=f"experiment_{selected_id}_results.csv",
-                    mime="text/csv",
+                    label=f"Download results as {fmt.upper()}",
+                    data=api_client.export_results(selected_id, fmt),
+                    file_name=f"experiment_{selected_id}_results.{fmt}",
+                    mime="text/csv" if fmt == "csv" else "application/vnd.apache.parquet",
+                    key=f"download_{selected_id}",
                 )
             else:
                 st.warning("This experiment has been initialized but no test has been run yet.")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Pages import components as a top-level package, as when run by streamlit from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
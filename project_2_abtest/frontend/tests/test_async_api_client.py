@@ -0,0 +1,38 @@
+import asyncio
+import httpx
+from components.async_api_client import AsyncAPIClient
+
+def _run(handler, fetch, **options):
+    async def main():
+        async with AsyncAPIClient("http://api.test/api", transport=httpx.MockTransport(handler), **options) as client:
+            return await fetch(client)
+    return asyncio.run(main())
+
+def test_results_of_many_experiments_are_fetched_concurrently():
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        experiment_id = int(request.url.path.rsplit("/", 1)[1])
+        if "cursor" not in request.url.params:
+            return httpx.Response(200, json=[{"id": experiment_id * 10}], headers={"X-Next-Cursor": "1"})
+        return httpx.Response(200, json=[{"id": experiment_id * 10 + 1}])
+
+    results = _run(handler, lambda client: client.get_results_many([1, 2, 3], fields=["id"]), max_concurrency=3)
+    assert results == {1: [{"id": 10}, {"id": 11}], 2: [{"id": 20}, {"id": 21}], 3: [{"id": 30}, {"id": 31}]}
+    assert peak == 3
+
+def test_transient_statuses_are_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503) if len(calls) == 1 else httpx.Response(200, json={"power": 0.8})
+
+    result = _run(handler, lambda client: client.calculate_power(100, 0.4), backoff_factor=0)
+    assert result == {"power": 0.8} and len(calls) == 2
+    assert calls[0].url.params["n"] == "100"